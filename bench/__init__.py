@@ -0,0 +1 @@
+"""Servidor local de pruebas y benchmarks del scraper (fuera del módulo de producción)"""
@@ -0,0 +1,360 @@
+"""
+Benchmarks del scraper contra el servidor local (bench.fixture_server) y
+comparaciones con las implementaciones anteriores (parser de contadores, conteo
+de Benford, recolección del modal). Se ejecutan con los subcomandos bench-* de
+instagram_followers.py. Modifican la configuración del módulo del scraper
+(INSTAGRAM_URL, RATE_LIMIT_ENABLED...) durante la medición y la restauran al acabar.
+"""
+
+import asyncio
+import os
+import random
+import re
+import tracemalloc
+from time import sleep, perf_counter
+
+import numpy as np
+import pandas as pd
+from playwright.async_api import async_playwright
+
+import instagram_followers as scraper
+from instagram_followers import (
+    MAX_CONCURRENT_WORKERS, MODAL_SCROLL_JS, PROFILE_ENGINE,
+    compute_benford, drain_follower_links, harvest_follower_links_full, install_follower_collector,
+    launch_browser_context, logger, metrics, parse_follower_count, resource_stats, run_profile_workers,
+    setup_selenium_driver, username_from_href,
+)
+from benford import count_first_digits, first_digits
+from bench.fixture_server import FixtureServer
+
+
+def process_tree_rss_mb(root_pid=None):
+    """RSS (MB) del proceso y todos sus descendientes (navegadores incluidos); None fuera de Linux"""
+    root_pid = root_pid or os.getpid()
+    children, rss_pages = {}, {}
+    try:
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat', 'rb') as f:
+                    fields = f.read().rsplit(b')', 1)[1].split()
+            except OSError:
+                continue
+            pid = int(entry)
+            # Tras el nombre: estado, ppid... rss es el campo 24 (índice 21 aquí)
+            children.setdefault(int(fields[1]), []).append(pid)
+            rss_pages[pid] = int(fields[21])
+    except OSError:
+        return None
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, ()))
+    return total * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+async def benchmark_throughput(num_profiles=300, max_workers=MAX_CONCURRENT_WORKERS, latency_ms=150, jitter_ms=50,
+                               error_rate=0.02, missing_rate=0.05, rate_limit=False, sample_interval=0.5,
+                               engine=PROFILE_ENGINE, resource_blocking=True):
+    """
+    Benchmark de extremo a extremo de FASE 2 contra el servidor local con latencia,
+    tasa de 429 y perfiles inexistentes configurables. Mide perfiles/minuto, p50/p95
+    de profile_total, pico de RSS (proceso + navegador) y pico del heap de Python.
+    El control de ritmo se desactiva salvo rate_limit=True, para medir solo el motor.
+    Con resource_blocking=False se miden los bytes por perfil sin bloquear nada.
+    """
+    original_url, original_rate_limit, original_blocking = scraper.INSTAGRAM_URL, scraper.RATE_LIMIT_ENABLED, scraper.RESOURCE_BLOCKING
+    rng = random.Random(42)
+    usernames = [f"missing_{i}" if rng.random() < missing_rate else f"bench_user_{i}" for i in range(num_profiles)]
+    peak_rss = process_tree_rss_mb() or 0.0
+
+    async def sample_rss():
+        nonlocal peak_rss
+        while True:
+            peak_rss = max(peak_rss, process_tree_rss_mb() or 0.0)
+            await asyncio.sleep(sample_interval)
+
+    with FixtureServer(latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate) as server:
+        scraper.INSTAGRAM_URL = server.url
+        scraper.RATE_LIMIT_ENABLED = rate_limit
+        scraper.RESOURCE_BLOCKING = resource_blocking
+        metrics.reset()
+        tracemalloc.start()
+        sampler = asyncio.create_task(sample_rss())
+        try:
+            async with async_playwright() as p:
+                browser, context = await launch_browser_context(p)
+                try:
+                    results, elapsed, _ = await run_profile_workers(context, usernames, max_workers, engine=engine)
+                finally:
+                    await browser.close()
+        finally:
+            sampler.cancel()
+            await asyncio.gather(sampler, return_exceptions=True)
+            _, heap_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            scraper.INSTAGRAM_URL, scraper.RATE_LIMIT_ENABLED, scraper.RESOURCE_BLOCKING = original_url, original_rate_limit, original_blocking
+
+    profile_total = metrics.summary().get('profile_total', {})
+    resources = resource_stats.summary()
+    report = {
+        'engine': engine,
+        'profiles': len(results),
+        'ok': sum(1 for _, value in results if value is not None),
+        'elapsed_seconds': round(elapsed, 3),
+        'profiles_per_minute': round(len(results) / (elapsed / 60), 1) if elapsed > 0 else 0.0,
+        'profile_total_p50': profile_total.get('p50'),
+        'profile_total_p95': profile_total.get('p95'),
+        'peak_rss_mb': round(peak_rss, 1),
+        'python_heap_peak_mb': round(heap_peak / 1024 / 1024, 1),
+        'blocked_per_profile': resources['blocked']['mean'] if resources else None,
+        'kb_per_profile': round(resources['bytes']['mean'] / 1024, 1) if resources else None,
+        'server_requests': server.requests,
+        'server_429': server.errors,
+    }
+    logger.log(f"⏱  Motor {engine}: {num_profiles} perfiles, {max_workers} workers, latencia {latency_ms}±{jitter_ms}ms, "
+               f"429 {error_rate:.0%}, inexistentes {missing_rate:.0%}, ritmo {'on' if rate_limit else 'off'}, "
+               f"bloqueo de recursos {'on' if resource_blocking else 'off'}")
+    logger.success(f"🚀 {report['profiles_per_minute']:.1f} perfiles/min | {report['ok']}/{report['profiles']} OK | "
+                   f"{elapsed:.1f}s | p50={report['profile_total_p50'] or 0:.3f}s p95={report['profile_total_p95'] or 0:.3f}s")
+    logger.log(f"💾 Pico RSS (proceso + navegador): {report['peak_rss_mb']:.1f} MB | "
+               f"pico heap Python: {report['python_heap_peak_mb']:.1f} MB | "
+               f"peticiones al servidor: {report['server_requests']} ({report['server_429']} con 429)")
+    if resources:
+        logger.log(f"🧱 Por perfil en el navegador: {report['blocked_per_profile']:.1f} peticiones bloqueadas, "
+                   f"{report['kb_per_profile']:.1f} KB recibidos")
+    return report
+
+async def benchmark_profile_engines(num_profiles=300, max_workers=MAX_CONCURRENT_WORKERS, latency_ms=150, jitter_ms=50,
+                                    error_rate=0.02, missing_rate=0.05):
+    """Compara el motor HTTP con el de Playwright con la misma carga sobre el servidor local"""
+    reports = {}
+    for engine in ('playwright', 'http'):
+        reports[engine] = await benchmark_throughput(num_profiles, max_workers, latency_ms, jitter_ms,
+                                                     error_rate, missing_rate, engine=engine)
+    browser_rate = reports['playwright']['profiles_per_minute']
+    if browser_rate:
+        logger.success(f"🚀 Motor HTTP: x{reports['http']['profiles_per_minute'] / browser_rate:.2f} perfiles/min | "
+                       f"RSS {reports['http']['peak_rss_mb']:.0f} MB vs {reports['playwright']['peak_rss_mb']:.0f} MB")
+    return reports
+
+async def benchmark_page_pool(num_profiles=200, max_workers=MAX_CONCURRENT_WORKERS):
+    """
+    Compara perfiles/minuto con y sin pool de páginas contra el servidor local.
+    Desactiva el control de ritmo para medir solo el coste de navegación.
+    """
+    original_url, original_rate_limit = scraper.INSTAGRAM_URL, scraper.RATE_LIMIT_ENABLED
+    usernames = [f"bench_user_{i}" for i in range(num_profiles)]
+    rates = {}
+
+    with FixtureServer() as server:
+        scraper.INSTAGRAM_URL = server.url
+        scraper.RATE_LIMIT_ENABLED = False
+        try:
+            async with async_playwright() as p:
+                for label, use_pool in (("sin pool", False), ("con pool", True)):
+                    browser, context = await launch_browser_context(p)
+                    try:
+                        results, elapsed, _ = await run_profile_workers(
+                            context, usernames, max_workers, use_page_pool=use_pool, engine='playwright'
+                        )
+                    finally:
+                        await browser.close()
+                    ok = sum(1 for _, value in results if value is not None)
+                    rates[label] = len(results) / (elapsed / 60) if elapsed > 0 else 0.0
+                    logger.log(f"⏱  {label}: {elapsed:.1f}s | {rates[label]:.1f} perfiles/min | {ok}/{len(results)} OK")
+        finally:
+            scraper.INSTAGRAM_URL, scraper.RATE_LIMIT_ENABLED = original_url, original_rate_limit
+
+    if rates.get("sin pool"):
+        logger.success(f"🚀 Pool de páginas: x{rates['con pool'] / rates['sin pool']:.2f} perfiles/min")
+    return rates
+
+def benchmark_modal_harvest(total=1000, page_size=25):
+    """
+    Compara la recolección de enlaces del modal de followers contra una página
+    local con scroll infinito: método anterior (find_elements + get_attribute por
+    enlace en cada scroll) vs colector MutationObserver (un execute_script por scroll).
+    Solo se mide la recolección; el scroll es el mismo en ambos casos.
+    """
+    original_url = scraper.INSTAGRAM_URL
+    results = {}
+    with FixtureServer() as server:
+        scraper.INSTAGRAM_URL = server.url
+        driver = setup_selenium_driver(headless=True)
+        try:
+            for label in ("anterior", "colector"):
+                driver.get(f"{server.url}/__modal__/?total={total}&page_size={page_size}")
+                if label == "colector":
+                    install_follower_collector(driver)
+                seen = set()
+                harvest_seconds = 0.0
+                scrolls = 0
+                stalls = 0
+                while len(seen) < total and stalls < 5:
+                    t0 = perf_counter()
+                    hrefs = drain_follower_links(driver) if label == "colector" else harvest_follower_links_full(driver)
+                    harvest_seconds += perf_counter() - t0
+                    new = {username_from_href(h) for h in hrefs} - seen
+                    seen |= new
+                    stalls = 0 if new else stalls + 1
+                    driver.execute_script(MODAL_SCROLL_JS)
+                    scrolls += 1
+                    sleep(0.05)  # Deja que la página añada la siguiente tanda
+                results[label] = harvest_seconds
+                logger.log(f"⏱  {label}: {len(seen)} usuarios en {scrolls} scrolls | recolección {harvest_seconds:.2f}s "
+                           f"({harvest_seconds / max(scrolls, 1) * 1000:.1f} ms/scroll)")
+        finally:
+            driver.quit()
+            scraper.INSTAGRAM_URL = original_url
+
+    if results.get("colector"):
+        logger.success(f"🚀 Colector incremental: x{results['anterior'] / results['colector']:.1f} más rápido en recolección")
+    return results
+
+def _benford_counts_legacy(series):
+    """Conteo original (regex por fila con .apply + list.count por dígito), solo para comparar"""
+    def normalize_digit(x):
+        try:
+            if pd.isna(x):
+                return None
+            sx = re.sub(r'[^0-9]', '', str(x).strip())
+            if sx == '':
+                return None
+            d = int(sx.lstrip('0')[0])
+            return d if 1 <= d <= 9 else None
+        except:
+            return None
+    digits_series = series.apply(normalize_digit).dropna().astype(int).tolist()
+    return [digits_series.count(d) for d in range(1, 10)]
+
+def benchmark_benford(n=10_000_000, legacy_limit=1_000_000, chunksize=1_000_000, with_csv=False):
+    """
+    Benchmark del motor de Benford sobre n conteos sintéticos (log-uniformes).
+    La ruta antigua se mide sobre legacy_limit valores y se extrapola a n.
+    Con with_csv también mide la lectura por bloques de un CSV temporal.
+    """
+    rng = np.random.default_rng(42)
+    values = np.floor(10 ** rng.uniform(1, 7, n)).astype(np.int64)
+    logger.log(f"🧪 Benchmark Benford con {n:,} conteos sintéticos")
+
+    t0 = perf_counter()
+    counts = count_first_digits(first_digits(values))
+    vectorized = perf_counter() - t0
+    logger.log(f"   - Vectorizado (NumPy, en memoria): {vectorized:.2f}s")
+
+    sample = pd.Series(values[:legacy_limit]).astype(str)
+    t0 = perf_counter()
+    legacy_counts = _benford_counts_legacy(sample)
+    legacy = (perf_counter() - t0) * n / len(sample)
+    expected_counts = count_first_digits(first_digits(values[:legacy_limit]))
+    logger.log(f"   - Ruta antigua (.apply + list.count): ~{legacy:.2f}s "
+               f"(medida con {len(sample):,} y extrapolada)")
+    if list(expected_counts) != legacy_counts:
+        logger.warning("⚠ Los conteos vectorizados no coinciden con la ruta antigua")
+    logger.success(f"🚀 Aceleración: x{legacy / vectorized:.1f}" if vectorized > 0 else "🚀 Aceleración: n/a")
+
+    if with_csv:
+        csv_path = os.path.join(logger.logs_dir, f"benford_bench_{logger.timestamp}.csv")
+        try:
+            pd.DataFrame({'Num_Followers': values}).to_csv(csv_path, index=False)
+            t0 = perf_counter()
+            result = compute_benford(csv_path, chunksize=chunksize)
+            logger.log(f"   - CSV por bloques ({chunksize:,} filas): {perf_counter() - t0:.2f}s")
+            if result is None or not np.array_equal(result.counts, counts):
+                logger.warning("⚠ El conteo por bloques no coincide con el conteo en memoria")
+        finally:
+            if os.path.exists(csv_path):
+                os.remove(csv_path)
+    return counts
+
+def _parse_follower_count_legacy(text):
+    """Parser original (tres regex sin compilar), solo para el fuzzing y el benchmark"""
+    if not text:
+        return None
+    text = text.lower().strip()
+    patterns = [
+        (r'([\d,\.]+)\s*m\s*followers?', 'M'),
+        (r'([\d,\.]+)\s*k\s*followers?', 'K'),
+        (r'([\d,\.]+)\s*followers?', None),
+    ]
+    for pattern, unit in patterns:
+        match = re.search(pattern, text)
+        if match:
+            num_str = match.group(1)
+            if unit == 'M':
+                return int(float(num_str.replace(',', '.')) * 1_000_000)
+            elif unit == 'K':
+                return int(float(num_str.replace(',', '.')) * 1_000)
+            else:
+                clean_num = num_str.replace(',', '').replace('.', '')
+                if clean_num.isdigit():
+                    return int(clean_num)
+                try:
+                    return int(float(clean_num))
+                except:
+                    continue
+    return None
+
+def fuzz_follower_texts(n, rng=None):
+    """
+    Genera n textos sintéticos de contadores con su valor esperado.
+    Devuelve tuplas (texto, esperado, compatible); compatible=True si el parser
+    original ya los resolvía bien (inglés, separador "," y K/M con punto decimal).
+    """
+    rng = rng or random.Random(42)
+    cases = []
+    for _ in range(n):
+        kind = rng.choice(('plain', 'comma', 'dot', 'space', 'k', 'm', 'mil', 'mill'))
+        word = rng.choice(('followers', 'Followers', 'seguidores') if kind not in ('mil', 'mill') else ('seguidores',))
+        prefix = rng.choice(('', '34 posts ', 'Posts\t', '• '))
+        if kind in ('plain', 'comma', 'dot', 'space'):
+            value = rng.randint(0, 999_999_999)
+            sep = {'plain': '', 'comma': ',', 'dot': '.', 'space': rng.choice((' ', '\u00a0', '\u202f'))}[kind]
+            number = f"{value:,}".replace(',', sep)
+            compatible = kind != 'space' and word != 'seguidores'
+        else:
+            multiplier = {'k': 1_000, 'mil': 1_000, 'm': 1_000_000, 'mill': 1_000_000}[kind]
+            whole, decimals = rng.randint(1, 999), rng.choice(('', str(rng.randint(0, 9)), f"{rng.randint(0, 99):02d}"))
+            value = whole * multiplier + (int(decimals) * multiplier // 10 ** len(decimals) if decimals else 0)
+            point = '.' if kind in ('k', 'm') else ','
+            suffix = {'k': rng.choice(('K', 'k')), 'm': rng.choice(('M', 'm')), 'mil': 'mil', 'mill': rng.choice(('mill.', 'millones de'))}[kind]
+            number = f"{whole}{point}{decimals}" if decimals else str(whole)
+            number += rng.choice(('', ' ')) + suffix
+            # El original multiplicaba en coma flotante (4.35K -> 4349), así que solo cuentan los exactos
+            compatible = kind in ('k', 'm') and word != 'seguidores' and int(float(number[:-1]) * multiplier) == value
+        cases.append((f"{prefix}{number} {word}", value, compatible))
+    return cases
+
+def benchmark_parse_follower_count(n=1_000_000, fuzz_cases=100_000):
+    """
+    Fuzzing del parser de contadores contra el valor esperado y contra el parser
+    original (solo en los formatos que este ya resolvía), y benchmark por n llamadas.
+    """
+    cases = fuzz_follower_texts(fuzz_cases)
+    wrong = [(text, expected, parse_follower_count(text)) for text, expected, _ in cases
+             if parse_follower_count(text) != expected]
+    compatible = [text for text, _, ok in cases if ok]
+    diverging = [text for text in compatible if parse_follower_count(text) != _parse_follower_count_legacy(text)]
+    logger.log(f"🧪 Fuzzing con {len(cases):,} textos: {len(cases) - len(wrong):,} correctos, "
+               f"{len(compatible) - len(diverging):,}/{len(compatible):,} iguales al parser original")
+    for text, expected, got in wrong[:5]:
+        logger.warning(f"⚠ {text!r}: esperado {expected}, obtenido {got}")
+    for text in diverging[:5]:
+        logger.warning(f"⚠ {text!r}: difiere del parser original")
+
+    # Mezcla realista: la mitad son líneas del body sin contador
+    texts = [text for text, _, _ in cases[:1000]] + ['See Instagram photos and videos', 'Follow', 'Message', '120 following'] * 250
+    rounds = max(n // len(texts), 1)
+    timings = {}
+    for label, parser in (("original", _parse_follower_count_legacy), ("compilado", parse_follower_count)):
+        t0 = perf_counter()
+        for _ in range(rounds):
+            for text in texts:
+                parser(text)
+        timings[label] = (perf_counter() - t0) * 1_000_000 / (rounds * len(texts))
+        logger.log(f"   - {label}: {timings[label]:.2f}s por millón de llamadas")
+    if timings['compilado'] > 0:
+        logger.success(f"🚀 Parser de contadores: x{timings['original'] / timings['compilado']:.1f} más rápido")
+    return not wrong and not diverging, timings
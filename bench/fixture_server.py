@@ -0,0 +1,180 @@
+"""
+Servidor HTTP local que imita perfiles de Instagram y el diálogo de followers.
+Lo usan los benchmarks (bench.benchmarks) y los tests del motor HTTP; no depende
+del scraper.
+"""
+
+import hashlib
+import random
+import threading
+from time import sleep
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def fixture_follower_count(username):
+    """Número de seguidores determinista para un usuario sintético"""
+    digest = hashlib.md5(username.encode('utf-8')).hexdigest()
+    # Distribución log-uniforme entre 10 y 10M (sigue aproximadamente Benford)
+    exponent = 1 + (int(digest[:8], 16) / 0xFFFFFFFF) * 6
+    return int(10 ** exponent)
+
+def fixture_modal_html(total, page_size):
+    """Diálogo de followers que añade page_size enlaces cada vez que se llega al fondo"""
+    return f"""<!DOCTYPE html>
+<html><body>
+<div role="dialog"><div id="list" style="height:400px; overflow-y:scroll"><div id="items"></div></div></div>
+<script>
+const total = {total}, pageSize = {page_size};
+let loaded = 0;
+function more() {{
+    const items = document.getElementById('items');
+    for (let i = 0; i < pageSize && loaded < total; i++, loaded++) {{
+        const row = document.createElement('div');
+        row.style.height = '60px';
+        row.innerHTML = `<a href="/fixture_user_${{loaded}}/">fixture_user_${{loaded}}</a>`;
+        items.appendChild(row);
+    }}
+}}
+more(); more();
+document.getElementById('list').addEventListener('scroll', (e) => {{
+    const el = e.target;
+    if (el.scrollTop + el.clientHeight >= el.scrollHeight - 5) more();
+}});
+</script>
+</body></html>"""
+
+# Subrecursos de cada perfil (/static/...): permiten medir los bytes que ahorra el bloqueo
+FIXTURE_STATIC_ASSETS = {
+    'profile.css': ('text/css', b'/* fixture */\n' + b'.x{color:#262626}\n' * 1000),
+    'avatar.jpg': ('image/jpeg', b'\xff\xd8\xff\xe0' + bytes(48 * 1024)),
+}
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    """
+    Sirve páginas de perfil que imitan los selectores que usan los workers
+    (meta description, a[href*="/followers/"], h2 "Sorry") y el diálogo de
+    followers con scroll en /<usuario>/followers/. La latencia, la tasa de error
+    y el tamaño de página los fija FixtureServer en self.server.
+    """
+
+    protocol_version = 'HTTP/1.1'  # Conexiones keep-alive (todas las respuestas llevan Content-Length)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_html(self, html, status=200):
+        self._send_body(html.encode('utf-8'), 'text/html; charset=utf-8', status)
+
+    def _send_body(self, body, content_type, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _simulate_network(self):
+        """Aplica la latencia configurada; True si esta petición se limita (HTTP 429)"""
+        server = self.server
+        if server.latency_ms or server.jitter_ms:
+            sleep(max(0.0, server.latency_ms + random.uniform(-server.jitter_ms, server.jitter_ms)) / 1000)
+        if server.error_rate and random.random() < server.error_rate:
+            server.errors += 1
+            self._send_html("<html><head><title>Instagram</title></head>"
+                            "<body><p>Please wait a few minutes before you try again.</p></body></html>", status=429)
+            return True
+        return False
+
+    def do_GET(self):
+        self.server.requests += 1
+        parsed = urlparse(self.path)
+        parts = [p for p in parsed.path.split('/') if p]
+        if not parts:
+            self._send_html("<html><body><h1>Instagram (fixture)</h1></body></html>")
+            return
+
+        if parts[0] == '__modal__':
+            query = parse_qs(parsed.query)
+            total = int(query.get('total', [str(self.server.modal_total)])[0])
+            page_size = int(query.get('page_size', [str(self.server.page_size)])[0])
+            self._send_html(fixture_modal_html(total, page_size))
+            return
+
+        if parts[0] == 'static' and len(parts) > 1 and parts[1] in FIXTURE_STATIC_ASSETS:
+            content_type, body = FIXTURE_STATIC_ASSETS[parts[1]]
+            self._send_body(body, content_type)
+            return
+
+        if self._simulate_network():
+            return
+
+        username = parts[0]
+        if len(parts) > 1 and parts[1] in ('followers', 'following'):
+            # Diálogo de la lista (lo que abre el clic de extract_followers_list_selenium)
+            self._send_html(fixture_modal_html(self.server.modal_total, self.server.page_size))
+            return
+
+        if username.startswith('missing'):
+            self._send_html("<html><head><title>Page not found</title></head>"
+                            "<body><h2>Sorry, this page isn't available.</h2></body></html>", status=404)
+            return
+
+        followers = fixture_follower_count(username)
+        self._send_html(f"""<!DOCTYPE html>
+<html><head>
+<meta name="description" content="{followers:,} Followers, 120 Following, 34 Posts - See Instagram photos and videos from {username.title()} (@{username})">
+<title>{username} • Instagram</title>
+<link rel="stylesheet" href="/static/profile.css">
+</head><body><main><header><section>
+<img src="/static/avatar.jpg" alt="">
+<h1>{username.title()}</h1>
+<ul>
+<li><span>34</span> posts</li>
+<li><a href="/{username}/followers/"><span title="{followers:,}">{followers:,}</span> followers</a></li>
+<li><a href="/{username}/following/"><span>120</span> following</a></li>
+</ul>
+</section></header>
+<div><span>Bio de prueba de {username}</span></div>
+</main></body></html>""")
+
+class FixtureServer:
+    """
+    Servidor HTTP local (hilo en segundo plano) que imita perfiles de Instagram.
+    latency_ms ± jitter_ms se aplica a cada perfil/diálogo; error_rate es la
+    fracción de esas peticiones que responde HTTP 429; page_size y modal_total
+    configuran el diálogo de followers con scroll infinito.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0, jitter_ms=0, error_rate=0.0, page_size=12, modal_total=1000):
+        self.httpd = ThreadingHTTPServer((host, port), FixtureRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency_ms = latency_ms
+        self.httpd.jitter_ms = jitter_ms
+        self.httpd.error_rate = error_rate
+        self.httpd.page_size = page_size
+        self.httpd.modal_total = modal_total
+        self.httpd.requests = 0
+        self.httpd.errors = 0
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    @property
+    def errors(self):
+        return self.httpd.errors
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
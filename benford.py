@@ -0,0 +1,223 @@
+"""
+Ley de Benford sobre primeros dígitos: cálculo puro con NumPy/pandas (conteos,
+chi-cuadrado, MAD, KS, Z por dígito y filas resumen para el análisis en lote).
+No depende del scraper: se puede importar sin Selenium ni Playwright instalados.
+"""
+
+import os
+import glob
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+BENFORD_DIGITS = np.arange(1, 10)
+BENFORD_EXPECTED = np.log10(1 + 1 / BENFORD_DIGITS)  # Proporciones teóricas
+
+# Bandas MAD de Nigrini para el primer dígito: (límite superior, etiqueta)
+BENFORD_MAD_BANDS = (
+    (0.006, 'close_conformity'),
+    (0.012, 'acceptable_conformity'),
+    (0.015, 'marginally_acceptable_conformity'),
+    (float('inf'), 'nonconformity'),
+)
+BENFORD_Z_CRITICAL = 1.96       # |z| > 1.96 -> desviación significativa al 5%
+BENFORD_KS_COEFFICIENT = 1.36   # Valor crítico KS al 5%: 1.36 / sqrt(n)
+
+# Columnas reconocidas (soportar español/inglés)
+NUM_FOLLOWERS_COLUMNS = ('Num_Followers', 'NumFollowers', 'Num Seguidores')
+FIRST_DIGIT_COLUMNS = ('Primer_Dígito', 'First_Digit', 'Primer_Digito', 'Primer Digito')
+
+@dataclass
+class BenfordResult:
+    """Resultado puro (sin gráficos) del análisis de Benford sobre primeros dígitos"""
+    source: str
+    counts: np.ndarray  # Frecuencia de los dígitos 1..9
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    @property
+    def observed(self):
+        return self.counts / self.total if self.total else np.zeros(9)
+
+    @property
+    def expected(self):
+        return BENFORD_EXPECTED
+
+    def conformity(self):
+        """Pruebas de conformidad calculadas de forma vectorizada sobre los conteos"""
+        return benford_conformity(self.counts)
+
+    def as_dict(self):
+        return {
+            'source': self.source,
+            'total': self.total,
+            'tests': self.conformity(),
+            'digits': {
+                int(d): {
+                    'count': int(self.counts[i]),
+                    'observed_pct': float(self.observed[i] * 100),
+                    'benford_pct': float(BENFORD_EXPECTED[i] * 100),
+                }
+                for i, d in enumerate(BENFORD_DIGITS)
+            },
+        }
+
+def chi2_sf_8dof(x):
+    """P(X >= x) de una chi-cuadrado con 8 grados de libertad (forma cerrada, grados pares)"""
+    half = x / 2.0
+    return float(np.exp(-half) * sum(half ** k / math.factorial(k) for k in range(4)))
+
+def benford_conformity(counts):
+    """
+    Chi-cuadrado (8 g.l.), MAD de Nigrini con bandas de conformidad, estadístico
+    KS sobre las proporciones acumuladas y Z por dígito (con corrección de continuidad).
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    n = counts.sum()
+    if n == 0:
+        return None
+    observed = counts / n
+    expected = BENFORD_EXPECTED
+    diff = observed - expected
+
+    chi_square = float(((counts - n * expected) ** 2 / (n * expected)).sum())
+
+    mad = float(np.abs(diff).mean())
+    mad_conformity = next(label for limit, label in BENFORD_MAD_BANDS if mad <= limit)
+
+    ks = float(np.abs(np.cumsum(observed) - np.cumsum(expected)).max())
+    ks_critical = BENFORD_KS_COEFFICIENT / math.sqrt(n)
+
+    correction = 1 / (2 * n)
+    abs_diff = np.abs(diff)
+    numerator = np.where(abs_diff > correction, abs_diff - correction, abs_diff)
+    z = numerator / np.sqrt(expected * (1 - expected) / n)
+
+    return {
+        'n': int(n),
+        'chi_square': {'statistic': chi_square, 'dof': 8, 'p_value': chi2_sf_8dof(chi_square)},
+        'mad': {'value': mad, 'conformity': mad_conformity},
+        'ks': {'statistic': ks, 'critical_5pct': ks_critical, 'conforms': ks <= ks_critical},
+        'z_scores': {
+            int(d): {'z': float(z[i]), 'deviation': float(diff[i]), 'significant': bool(z[i] > BENFORD_Z_CRITICAL)}
+            for i, d in enumerate(BENFORD_DIGITS)
+        },
+    }
+
+def first_digits(values):
+    """Primer dígito (1-9) de cada entero positivo de values (vectorizado; <=0 se descarta)"""
+    v = np.asarray(values, dtype=np.int64)
+    v = v[v > 0]
+    if v.size == 0:
+        return np.empty(0, dtype=np.int64)
+    powers = np.power(10, np.floor(np.log10(v)).astype(np.int64))
+    # Corregir el redondeo de log10 justo en las potencias de 10 (999.. / 1000..)
+    powers = np.where(powers > v, powers // 10, powers)
+    powers = np.where(v // powers >= 10, powers * 10, powers)
+    return v // powers
+
+def count_first_digits(digits):
+    """Frecuencia de los dígitos 1..9 con una sola pasada (np.bincount)"""
+    digits = np.asarray(digits, dtype=np.int64)
+    digits = digits[(digits >= 1) & (digits <= 9)]
+    return np.bincount(digits, minlength=10)[1:10]
+
+def _digits_from_chunk(series, numeric):
+    """Primeros dígitos de una columna (numérica directa o texto a limpiar)"""
+    if pd.api.types.is_numeric_dtype(series):
+        # Camino rápido: pandas ya la parseó como número ("N/A" y vacíos -> NaN)
+        values = series.dropna().to_numpy(dtype=np.float64).astype(np.int64)
+        return first_digits(values) if numeric else values
+    cleaned = series.dropna().astype(str).str.replace(r'[^0-9]', '', regex=True)
+    if not numeric:
+        # Columna de primer dígito: primer carácter numérico, solo 1-9
+        return pd.to_numeric(cleaned.str[:1], errors='coerce').dropna().to_numpy(dtype=np.int64)
+    values = pd.to_numeric(cleaned, errors='coerce').dropna()
+    return first_digits(values.to_numpy(dtype=np.float64).astype(np.int64))
+
+class BenfordError(ValueError):
+    """El CSV no se puede leer o no tiene primeros dígitos válidos"""
+
+def read_benford_counts(csv_path, chunksize=None):
+    """
+    Cuenta primeros dígitos de un CSV de resultados con NumPy.
+    Usa la columna de seguidores (enteros) o, si no existe, la de primer dígito.
+    Con chunksize lee el CSV por bloques (memoria acotada en archivos de varios GB).
+    Devuelve BenfordResult; lanza BenfordError si no hay datos válidos.
+    """
+    try:
+        columns = pd.read_csv(csv_path, nrows=0).columns
+    except Exception as e:
+        raise BenfordError(f"No se pudo leer CSV para Benford: {e}") from e
+
+    col = next((c for c in NUM_FOLLOWERS_COLUMNS if c in columns), None)
+    numeric = col is not None
+    if col is None:
+        col = next((c for c in FIRST_DIGIT_COLUMNS if c in columns), None)
+    if col is None:
+        raise BenfordError("CSV no contiene 'Primer_Dígito' ni 'Num_Followers'. No se puede aplicar Benford.")
+
+    counts = np.zeros(9, dtype=np.int64)
+    try:
+        reader = pd.read_csv(csv_path, usecols=[col], chunksize=chunksize)
+        chunks = reader if chunksize else [reader]
+        for chunk in chunks:
+            counts += count_first_digits(_digits_from_chunk(chunk[col], numeric))
+    except Exception as e:
+        raise BenfordError(f"No se pudo leer CSV para Benford: {e}") from e
+
+    if counts.sum() == 0:
+        raise BenfordError("No se encontraron primeros dígitos válidos para analizar.")
+    return BenfordResult(source=csv_path, counts=counts)
+
+# ====================== BENFORD EN LOTE ======================
+BENFORD_BATCH_PATTERN = "*stats_hybrid*.csv"
+BENFORD_SUMMARY_HEADER = ['File', 'Account', 'Layout', 'N', 'Chi_Square', 'P_Value', 'MAD',
+                          'MAD_Conformity', 'KS', 'KS_Critical', 'KS_Conforms', 'Significant_Digits']
+
+def resolve_benford_inputs(paths):
+    """Expande directorios (con BENFORD_BATCH_PATTERN) y patrones glob a una lista de CSV sin duplicados"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = glob.glob(os.path.join(path, BENFORD_BATCH_PATTERN))
+        else:
+            matches = glob.glob(path)
+        files.extend(m for m in sorted(matches) if m.lower().endswith('.csv'))
+    return list(dict.fromkeys(os.path.abspath(f) for f in files))
+
+def benford_summary_row(csv_path, chunksize=None):
+    """
+    Fila resumen (picklable) de un CSV para benford-batch: pruebas de conformidad y
+    conteos. Los errores se devuelven en la clave Error en lugar de lanzarse.
+    """
+    try:
+        columns = pd.read_csv(csv_path, nrows=0).columns
+    except Exception as e:
+        return {'File': csv_path, 'Error': str(e)}
+    # Formato extendido (following) u original (followers) de ResultStreamWriter
+    layout = 'extended' if 'Account' in columns else 'original'
+    try:
+        result = read_benford_counts(csv_path, chunksize=chunksize)
+    except BenfordError as e:
+        return {'File': csv_path, 'Layout': layout, 'Error': str(e)}
+    tests = result.conformity()
+    return {
+        'File': csv_path,
+        'Account': os.path.basename(csv_path).split('stats_hybrid')[0],
+        'Layout': layout,
+        'N': tests['n'],
+        'Chi_Square': round(tests['chi_square']['statistic'], 4),
+        'P_Value': round(tests['chi_square']['p_value'], 6),
+        'MAD': round(tests['mad']['value'], 6),
+        'MAD_Conformity': tests['mad']['conformity'],
+        'KS': round(tests['ks']['statistic'], 6),
+        'KS_Critical': round(tests['ks']['critical_5pct'], 6),
+        'KS_Conforms': tests['ks']['conforms'],
+        'Significant_Digits': ' '.join(str(d) for d, z in tests['z_scores'].items() if z['significant']),
+        'counts': result.counts.tolist(),
+    }
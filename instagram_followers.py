@@ -13,35 +13,46 @@ from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 import asyncio
-from time import sleep
+from time import sleep, perf_counter, time
 import os
+import sys
 import datetime
 import random
 import csv
 import re
+import sqlite3
+import importlib.util
 import json
+import html
+import argparse
+import socket
+import threading
+import queue as queue_module
+import multiprocessing
+import atexit
+import weakref
+from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
 from dotenv import load_dotenv, find_dotenv
-# --- Imports para análisis de Benford ---
-import pandas as pd
-import matplotlib.pyplot as plt
+# --- Imports para análisis de Benford (matplotlib se importa solo al graficar) ---
 import numpy as np
 import math
+from benford import (
+    BENFORD_DIGITS, BENFORD_EXPECTED, BENFORD_BATCH_PATTERN, BENFORD_SUMMARY_HEADER,
+    BenfordResult, BenfordError, read_benford_counts,
+    resolve_benford_inputs, benford_summary_row,
+)
 
 dotenv_path = find_dotenv()
-if not dotenv_path:
-    print("❌ ERROR: No se encontró un archivo .env en el directorio del script.")
-    print("Copia el archivo .env.example a .env y completa las variables necesarias:")
-    print("  IG_USERNAME=tu_usuario")
-    print("  IG_PASSWORD=tu_contraseña")
-    print("  TARGET_ACCOUNT=cuenta_a_scrapear")
-    print("  FOLLOWER_COUNT=50")
-    print("  PAGE_TYPE=followers  # o following")
-    exit(1)
-
-# Cargar el .env detectado
-load_dotenv(dotenv_path)
+
+# Cargar el .env detectado (la validación se hace en validate_config, así los
+# benchmarks locales pueden ejecutarse sin credenciales)
+if dotenv_path:
+    load_dotenv(dotenv_path)
 
 # ====================== CONFIGURACIÓN ======================
 # Cargar variables desde .env (sin valores por defecto "peligrosos")
@@ -52,57 +63,282 @@ count_str = os.getenv("FOLLOWER_COUNT", "20").strip()
 count = int(count_str)
 page = os.getenv("PAGE_TYPE", "followers").strip().lower()
 
+# URL base de Instagram (se puede apuntar a un servidor local para benchmarks)
+INSTAGRAM_URL = os.getenv("IG_BASE_URL", "https://www.instagram.com").strip().rstrip('/')
+
 # Configuración de paralelización
-MAX_CONCURRENT_WORKERS = 15  # Número de perfiles que se analizarán simultáneamente
-# Recomendado: 5-10 (seguro), 15-20 (arriesgado pero rápido)
+# Techo de workers simultáneos; el controlador de ritmo decide cuántos están activos
+MAX_CONCURRENT_WORKERS = int(os.getenv("MAX_WORKERS", "15").strip())
+
+# Pipeline FASE 1/FASE 2: analizar perfiles mientras el modal aún hace scroll
+# (también con --pipeline)
+PIPELINE_PHASES = os.getenv("PIPELINE", "0").strip().lower() in ("1", "true", "yes")
+
+# Motor de FASE 1: "selenium" (por defecto) o "playwright" (login, modal y análisis
+# en un único navegador; si el login con Playwright falla se usa Selenium)
+LOGIN_ENGINE = os.getenv("LOGIN_ENGINE", "selenium").strip().lower()
+
+# Sesión persistente (opcional, SESSION_REUSE=1): reutilizar las cookies del último login
+# (logs/session_<usuario>.json) mientras sigan vigentes; solo se hace login con
+# credenciales si la validación falla. Desactivada por defecto: guarda la sesión en disco
+SESSION_REUSE = os.getenv("SESSION_REUSE", "0").strip().lower() in ("1", "true", "yes")
+
+# Shards de FASE 2: N procesos del SO, cada uno con su propio Chromium y contexto
+# (también con --shards). SHARD_WORKERS: workers por shard, "8" o una lista "8,8,4";
+# vacío reparte MAX_CONCURRENT_WORKERS entre los shards
+PROFILE_SHARDS = int(os.getenv("SHARDS", "1").strip())
+SHARD_WORKERS = os.getenv("SHARD_WORKERS", "").strip()
+
+# Cola distribuida de FASE 2 (también con --queue): sqlite:///ruta (archivo compartido
+# entre nodos) o redis://host:6379/0. Vacío = análisis local. Un job reclamado sin
+# resultado tras JOB_LEASE_SECONDS vuelve a estar disponible para otro worker.
+# La cola solo guarda la ruta del archivo de cookies (los workers la leen de un disco
+# compartido o de worker --cookies); JOB_QUEUE_SHARE_COOKIES=1 copia las cookies de la
+# sesión en los metadatos de la ejecución para nodos sin disco compartido
+JOB_QUEUE_URL = os.getenv("JOB_QUEUE", "").strip()
+JOB_QUEUE_SHARE_COOKIES = os.getenv("JOB_QUEUE_SHARE_COOKIES", "0").strip().lower() in ("1", "true", "yes")
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120").strip())
+JOB_POLL_INTERVAL = 1.0
+
+# Reintentos de perfiles con fallo transitorio (timeout, navegación, 429...): hasta
+# RETRY_MAX_ATTEMPTS con backoff exponencial con jitter entre RETRY_BASE_DELAY y
+# RETRY_MAX_DELAY segundos; los agotados van a logs/dead_letter_<ts>.txt
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3").strip())
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "2").strip())
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "60").strip())
+RETRY_POLL_INTERVAL = 0.2
+
+# Política de recursos de las páginas de perfil (una sola ruta por contexto): se abortan
+# los tipos de RESOURCE_BLOCKED_TYPES, cualquier host fuera de RESOURCE_ALLOWED_HOSTS
+# (analítica, píxeles de terceros) y la telemetría/polling de RESOURCE_BLOCKED_URL_RE.
+# RESOURCE_BLOCKING=0 no bloquea nada pero sigue contando peticiones y bytes por perfil
+RESOURCE_BLOCKING = os.getenv("RESOURCE_BLOCKING", "1").strip().lower() not in ("0", "false", "no")
+RESOURCE_ALLOWED_HOSTS = tuple(h.strip().lower() for h in os.getenv("RESOURCE_ALLOWED_HOSTS", "instagram.com,cdninstagram.com").split(",") if h.strip())
+RESOURCE_BLOCKED_TYPES = frozenset(('image', 'media', 'font', 'stylesheet', 'texttrack', 'manifest', 'eventsource', 'websocket', 'other'))
+RESOURCE_BLOCKED_URL_RE = re.compile(r'/(?:ajax/bz|logging/|api/v1/direct_v2/)')
+RESOURCE_SIZES_TIMEOUT = 2.0  # Segundos que end() espera a los sizes() pendientes del perfil
+
+# Pool de páginas Playwright: cada página se recicla tras N perfiles o tras un fallo
+PAGE_POOL_MAX_USES = int(os.getenv("PAGE_POOL_MAX_USES", "50").strip())
+
+# Filas por lote que el escritor en streaming vuelca al CSV/TXT
+RESULT_FLUSH_BATCH = int(os.getenv("RESULT_FLUSH_BATCH", "100").strip())
+
+# Control de ritmo de FASE 2 (sustituye a la pausa aleatoria entre perfiles): token
+# bucket global de RATE_INITIAL perfiles/s (entre RATE_MIN y RATE_MAX) y control AIMD
+# de concurrencia que arranca en RATE_INITIAL_CONCURRENCY workers activos (máximo
+# MAX_CONCURRENT_WORKERS). Activo por defecto: RATE_LIMIT=0 deja FASE 2 sin ninguna pausa
+# (solo para benchmarks contra el servidor local)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT", "1").strip().lower() not in ("0", "false", "no")
+RATE_INITIAL = float(os.getenv("RATE_INITIAL", "2.0").strip())
+RATE_MIN = float(os.getenv("RATE_MIN", "0.2").strip())
+RATE_MAX = float(os.getenv("RATE_MAX", "10").strip())
+RATE_INITIAL_CONCURRENCY = int(os.getenv("RATE_INITIAL_CONCURRENCY", "5").strip())
+RATE_STEP = 0.25              # Perfiles/s que se suman tras una ventana limpia
+RATE_BURST = 2.0              # Tokens acumulables (ráfaga máxima)
+RATE_WINDOW = 20              # Perfiles por ventana de evaluación
+RATE_BAD_FRACTION = 0.2       # Fracción de sorry/error/lento en la ventana que provoca backoff
+RATE_LATENCY_FACTOR = 2.0     # goto "lento": EWMA de latencia > 2x la mejor EWMA observada
+RATE_BACKOFF_COOLDOWN = 10.0  # Segundos mínimos entre dos backoffs
+
+# Motor de FASE 2: "playwright" (por defecto) o "http". Con "http" el HTML de cada perfil
+# se descarga con un cliente asíncrono (httpx, keep-alive y HTTP/2 si está h2) con las
+# cookies de la sesión y se parsea con extract_profile_from_html; Playwright solo se
+# abre para los perfiles sin valor exacto en el HTML. PAGE_TYPE=following usa siempre
+# Playwright (bio y categoría necesitan el DOM renderizado)
+PROFILE_ENGINE = os.getenv("PROFILE_ENGINE", "playwright").strip().lower()
+HTTP_ENGINE_HTTP2 = os.getenv("HTTP2", "1").strip().lower() not in ("0", "false", "no")
+HTTP_ENGINE_TIMEOUT = 15.0
+
+# Plazo máximo (ms) para que un perfil muestre alguna señal de carga
+# (enlace de followers, "Sorry" o meta description)
+PROFILE_READY_TIMEOUT_MS = int(os.getenv("PROFILE_READY_TIMEOUT_MS", "8000").strip())
+
+# Caché persistente de perfiles (opcional, PROFILE_CACHE=1; SQLite en logs/): TTL en horas
+# y tamaño máximo. Desactivada por defecto: un acierto devuelve datos de hasta TTL horas
+PROFILE_CACHE_ENABLED = os.getenv("PROFILE_CACHE", "0").strip().lower() in ("1", "true", "yes")
+PROFILE_CACHE_TTL_HOURS = float(os.getenv("PROFILE_CACHE_TTL_HOURS", "24").strip())
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "100000").strip())
+
+# Logging: carpeta de logs, diarios, cookies y caché (relativa al script o absoluta),
+# nivel mínimo (DEBUG, INFO, SUCCESS, WARNING, ERROR), sink JSONL opcional y cada
+# cuánto (s) el hilo escritor vuelca el buffer a disco
+LOG_DIR = os.getenv("LOG_DIR", "logs").strip() or "logs"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").strip().upper()
+LOG_JSONL = os.getenv("LOG_JSONL", "0").strip().lower() in ("1", "true", "yes")
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0").strip())
+
+# Métricas de tiempos: exportar también en formato de texto de Prometheus
+METRICS_PROMETHEUS = os.getenv("METRICS_PROMETHEUS", "0").strip().lower() in ("1", "true", "yes")
 
 yourusername = os.getenv("IG_USERNAME")
 yourpassword = os.getenv("IG_PASSWORD")
 
-if not yourusername or not yourpassword:
-    print("❌ ERROR: Credenciales no configuradas")
-    print("Crea un archivo .env con:")
-    print("IG_USERNAME=tu_usuario")
-    print("IG_PASSWORD=tu_contraseña")
-    exit(1)
+def validate_config():
+    """Verifica que exista el .env y las credenciales antes de iniciar el scraping"""
+    if not dotenv_path:
+        print("❌ ERROR: No se encontró un archivo .env en el directorio del script.")
+        print("Copia el archivo .env.example a .env y completa las variables necesarias:")
+        print("  IG_USERNAME=tu_usuario")
+        print("  IG_PASSWORD=tu_contraseña")
+        print("  TARGET_ACCOUNT=cuenta_a_scrapear")
+        print("  FOLLOWER_COUNT=50")
+        print("  PAGE_TYPE=followers  # o following")
+        exit(1)
+
+    if not yourusername or not yourpassword:
+        print("❌ ERROR: Credenciales no configuradas")
+        print("Crea un archivo .env con:")
+        print("IG_USERNAME=tu_usuario")
+        print("IG_PASSWORD=tu_contraseña")
+        exit(1)
 
 # ====================== LOGGER ======================
+LOG_LEVELS = {'DEBUG': 10, 'INFO': 20, 'SUCCESS': 25, 'WARNING': 30, 'ERROR': 40}
+LOG_FLUSH_LEVELS = ('WARNING', 'ERROR')  # Se vuelcan a disco de inmediato
+LOG_BUFFER_LINES = 200
+
 class Logger:
-    def __init__(self, log_dir="logs"):
+    """
+    Logger de consola + archivo. La consola y el disco los atiende un hilo en
+    segundo plano: imprime cada línea al recibirla y agrupa las del archivo, que
+    vuelca cada LOG_FLUSH_INTERVAL segundos (o al instante en WARNING/ERROR), así
+    los workers async no escriben en stdout ni abren archivos en el hilo del event
+    loop. Opcionalmente escribe también un JSONL estructurado (worker_id, username,
+    phase, latency...). Los procesos hijos deben llamar a close() antes de salir.
+    """
+    def __init__(self, log_dir=LOG_DIR, level=LOG_LEVEL, structured=LOG_JSONL, flush_interval=LOG_FLUSH_INTERVAL):
         self.logs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), log_dir)
         if not os.path.exists(self.logs_dir):
             os.makedirs(self.logs_dir)
         
         self.timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
         self.log_file = os.path.join(self.logs_dir, f"hybrid_log_{self.timestamp}.txt")
-        self.csv_file = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), 
-            f"{account}stats_hybrid{self.timestamp}.csv"
-        )
-        self.txt_file = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), 
-            f"{account}stats_hybrid{self.timestamp}.txt"
-        )
+        self.jsonl_file = os.path.join(self.logs_dir, f"hybrid_log_{self.timestamp}.jsonl") if structured else None
+        self.set_account(account)
         self.cookies_file = os.path.join(self.logs_dir, f"cookies_{self.timestamp}.json")
+        self.dead_letter_file = os.path.join(self.logs_dir, f"dead_letter_{self.timestamp}.txt")
+        self.cache_file = os.path.join(self.logs_dir, "profile_cache.sqlite")
         
-    def log(self, message, level="INFO"):
-        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.min_level = LOG_LEVELS.get(level, LOG_LEVELS['DEBUG'])
+        self.flush_interval = flush_interval
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        atexit.register(self.close)
+    
+    def set_account(self, account_name):
+        """(Re)calcula los archivos de salida CSV/TXT para la cuenta analizada"""
+        self.csv_file, self.txt_file = self.result_files(account_name)
+    
+    def result_files(self, account_name):
+        """Rutas (csv, txt) de los resultados de una cuenta en esta ejecución"""
+        base = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{account_name}stats_hybrid{self.timestamp}")
+        return base + ".csv", base + ".txt"
+    
+    def journal_file(self, run_id):
+        return os.path.join(self.logs_dir, f"journal_{run_id}.jsonl")
+
+    def session_file(self, username):
+        safe = re.sub(r'[^A-Za-z0-9_.-]', '_', username or 'anon')
+        return os.path.join(self.logs_dir, f"session_{safe}.json")
+    
+    @property
+    def debug_enabled(self):
+        return self.min_level <= LOG_LEVELS['DEBUG']
+    
+    def _ensure_writer(self):
+        # Tras un fork (pool de procesos) el hilo no existe en el hijo: crear uno propio
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._queue = queue_module.SimpleQueue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._writer_loop, args=(self._queue,), daemon=True)
+            self._thread.start()
+    
+    def _writer_loop(self, q):
+        """Hilo escritor: acumula líneas y las vuelca por lotes"""
+        text_f = open(self.log_file, 'a', encoding='utf-8')
+        json_f = open(self.jsonl_file, 'a', encoding='utf-8') if self.jsonl_file else None
+        lines, records = [], []
+        last_flush = perf_counter()
+        running = True
+        try:
+            while running:
+                urgent = False
+                try:
+                    item = q.get(timeout=self.flush_interval)
+                    if item is None:
+                        running = False
+                    else:
+                        line, record, urgent = item
+                        if line is not None:
+                            print(line)
+                            lines.append(line)
+                        if record is not None:
+                            records.append(record)
+                except queue_module.Empty:
+                    pass
+                due = perf_counter() - last_flush >= self.flush_interval
+                pending = len(lines) + len(records)
+                if pending and (urgent or due or not running or pending >= LOG_BUFFER_LINES):
+                    if lines:
+                        text_f.write("\n".join(lines) + "\n")
+                        text_f.flush()
+                    if json_f and records:
+                        json_f.write("".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records))
+                        json_f.flush()
+                    lines, records = [], []
+                    last_flush = perf_counter()
+        finally:
+            text_f.close()
+            if json_f:
+                json_f.close()
+    
+    def log(self, message, level="INFO", **fields):
+        if LOG_LEVELS.get(level, LOG_LEVELS['INFO']) < self.min_level:
+            return
+        now = datetime.datetime.now()
+        timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
         formatted_message = f"[{timestamp}] [{level}] {message}"
-        print(formatted_message)
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(formatted_message + "\n")
+        record = None
+        if self.jsonl_file:
+            record = {'ts': now.isoformat(timespec='milliseconds'), 'level': level, 'message': message, **fields}
+        self._ensure_writer()
+        self._queue.put((formatted_message, record, level in LOG_FLUSH_LEVELS))
+    
+    def event(self, phase, **fields):
+        """Registro solo estructurado (sin consola ni TXT): métricas por perfil"""
+        if not self.jsonl_file:
+            return
+        record = {'ts': datetime.datetime.now().isoformat(timespec='milliseconds'), 'level': 'EVENT', 'phase': phase, **fields}
+        self._ensure_writer()
+        self._queue.put((None, record, False))
+    
+    def error(self, message, **fields):
+        self.log(message, "ERROR", **fields)
     
-    def error(self, message):
-        self.log(message, "ERROR")
+    def warning(self, message, **fields):
+        self.log(message, "WARNING", **fields)
     
-    def warning(self, message):
-        self.log(message, "WARNING")
+    def success(self, message, **fields):
+        self.log(message, "SUCCESS", **fields)
     
-    def success(self, message):
-        self.log(message, "SUCCESS")
+    def debug(self, message, **fields):
+        if self.min_level > LOG_LEVELS['DEBUG']:
+            return
+        self.log(message, "DEBUG", **fields)
     
-    def debug(self, message):
-        self.log(message, "DEBUG")
+    def close(self):
+        """Vacía el buffer y detiene el hilo escritor"""
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+        self._thread = None
 
 logger = Logger()
 
@@ -115,67 +351,398 @@ def type_like_human(element, text):
         element.send_keys(char)
         sleep(random.uniform(0.05, 0.15))
 
+def percentile(values, q):
+    """Percentil q (0-100) por interpolación lineal; None si no hay valores"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+# ====================== MÉTRICAS DE TIEMPOS ======================
+METRICS_MAX_SAMPLES = 50_000  # Muestras por span (reservoir sampling a partir de aquí)
+METRICS_QUANTILES = (50, 95, 99)
+
+class Metrics:
+    """
+    Spans de tiempo del camino caliente (login, scroll del modal, creación de
+    página, goto, resolución de selectores, fallback de body, parseo, escritura
+    CSV...) agregados en histogramas p50/p95/p99. count/sum son exactos; los
+    percentiles se calculan sobre una muestra acotada.
+    """
+    def __init__(self):
+        self.samples = {}
+        self.counts = Counter()
+        self.sums = Counter()
+
+    def reset(self):
+        self.__init__()
+
+    def observe(self, name, seconds):
+        self.counts[name] += 1
+        self.sums[name] += seconds
+        values = self.samples.setdefault(name, [])
+        if len(values) < METRICS_MAX_SAMPLES:
+            values.append(seconds)
+        else:
+            slot = random.randrange(self.counts[name])
+            if slot < METRICS_MAX_SAMPLES:
+                values[slot] = seconds
+
+    @contextmanager
+    def span(self, name):
+        """Mide el bloque (sirve también alrededor de un await)"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - start)
+
+    def summary(self):
+        result = {}
+        for name in sorted(self.counts):
+            values = self.samples.get(name, [])
+            entry = {
+                'count': self.counts[name],
+                'sum': round(self.sums[name], 6),
+                'mean': round(self.sums[name] / self.counts[name], 6),
+                'max': round(max(values), 6) if values else None,
+            }
+            for q in METRICS_QUANTILES:
+                entry[f'p{q}'] = round(percentile(values, q), 6) if values else None
+            result[name] = entry
+        return result
+
+    def snapshot(self):
+        """Estado picklable para fusionarlo en otro proceso (shards)"""
+        return {'samples': self.samples, 'counts': dict(self.counts), 'sums': dict(self.sums)}
+
+    def merge(self, snapshot):
+        """Suma count/sum exactos; las muestras se combinan y se recortan al máximo por span"""
+        self.counts.update(snapshot['counts'])
+        self.sums.update(snapshot['sums'])
+        for name, values in snapshot['samples'].items():
+            merged = self.samples.setdefault(name, [])
+            merged.extend(values)
+            if len(merged) > METRICS_MAX_SAMPLES:
+                self.samples[name] = random.sample(merged, METRICS_MAX_SAMPLES)
+
+    def write_json(self, path, extra=None):
+        data = {'spans_seconds': self.summary()}
+        if extra:
+            data.update(extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def write_prometheus(self, path):
+        lines = [
+            "# HELP scraper_span_seconds Duración de los spans del scraper",
+            "# TYPE scraper_span_seconds summary",
+        ]
+        for name, entry in self.summary().items():
+            for q in METRICS_QUANTILES:
+                if entry[f'p{q}'] is not None:
+                    lines.append(f'scraper_span_seconds{{span="{name}",quantile="{q / 100}"}} {entry[f"p{q}"]}')
+            lines.append(f'scraper_span_seconds_sum{{span="{name}"}} {entry["sum"]}')
+            lines.append(f'scraper_span_seconds_count{{span="{name}"}} {entry["count"]}')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+    def log_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        logger.log("⏱  Tiempos por fase (s):")
+        for name, e in summary.items():
+            logger.log(f"   - {name:<22} n={e['count']:<6} p50={e['p50']:.3f} p95={e['p95']:.3f} p99={e['p99']:.3f} total={e['sum']:.1f}")
+
+metrics = Metrics()
+# Resumen del controlador de ritmo de cada shard (FASE 2 en varios procesos)
+shard_rate_control = {}
+
+def export_metrics():
+    """Escribe logs/metrics_<ts>.json (y .prom si METRICS_PROMETHEUS) al final de la ejecución"""
+    if not metrics.counts:
+        return
+    metrics.log_summary()
+    json_path = os.path.join(logger.logs_dir, f"metrics_{logger.timestamp}.json")
+    try:
+        extra = {'extraction_tiers': dict(extraction_tiers),
+                 'rate_control': rate_controller.summary(),
+                 'resources': resource_stats.summary()}
+        if shard_rate_control:
+            extra['rate_control_shards'] = shard_rate_control
+        metrics.write_json(json_path, extra=extra)
+        logger.success(f"📈 Métricas guardadas: {json_path}")
+        if METRICS_PROMETHEUS:
+            prom_path = os.path.join(logger.logs_dir, f"metrics_{logger.timestamp}.prom")
+            metrics.write_prometheus(prom_path)
+            logger.success(f"📈 Métricas Prometheus: {prom_path}")
+    except Exception as e:
+        logger.warning(f"⚠ No se pudieron guardar las métricas: {e}")
+
+# ====================== PARSEO DE CONTADORES ======================
+# Sufijos de abreviatura (inglés/español) y su multiplicador: "mil" son miles
+# ("1,2 mil seguidores" -> 1200); "m", "mill." y "millones" son millones
+FOLLOWER_SUFFIX_MULTIPLIERS = {
+    'k': 1_000,
+    'mil': 1_000,
+    'm': 1_000_000,
+    'mill': 1_000_000,
+    'mln': 1_000_000,
+    'millón': 1_000_000,
+    'millones': 1_000_000,
+}
+# Alternativas más largas primero para que "millones" no se corte en "mil"
+FOLLOWER_SUFFIX_PATTERN = '|'.join(sorted(map(re.escape, FOLLOWER_SUFFIX_MULTIPLIERS), key=len, reverse=True))
+FOLLOWER_WORD_RE = re.compile(r'followers?|seguidor(?:es)?', re.IGNORECASE)
+# Una sola pasada: número + sufijo opcional + palabra clave. Los separadores de miles
+# pueden ser ",", "." o un espacio (normal, NBSP o estrecho) seguido de exactamente 3 dígitos
+FOLLOWER_COUNT_RE = re.compile(
+    r'(?<![\d.,])(\d(?:[\d.,]|[ \u00a0\u202f](?=\d{3}(?!\d)))*)'
+    r'\s*(?:(' + FOLLOWER_SUFFIX_PATTERN + r')\.?(?:\s+de)?\s*)?'
+    r'(?:followers?|seguidor(?:es)?)',
+    re.IGNORECASE
+)
+FOLLOWER_SEPARATORS = str.maketrans('', '', ',. \u00a0\u202f')
+
 def parse_follower_count(text):
     """
-    Extrae el número de seguidores de un texto con máxima precisión
-    Ejemplos: 
+    Extrae el número de seguidores de un texto (una única regex precompilada)
+    Ejemplos:
         "1,234 followers" -> 1234
-        "3,223 followers" -> 3223
+        "3.223 seguidores" -> 3223
+        "1 234 followers" -> 1234
         "1.2M followers" -> 1200000
-        "10.5K followers" -> 10500
-        "1333 followers" -> 1333
+        "12.3 k followers" -> 12300
+        "1,2 mil seguidores" -> 1200
+        "2,5 mill. seguidores" -> 2500000
     """
     if not text:
         return None
-    
-    text = text.lower().strip()
-    
-    # Patrones en orden de especificidad
-    patterns = [
-        (r'([\d,\.]+)\s*m\s*followers?', 'M'),  # Millones
-        (r'([\d,\.]+)\s*k\s*followers?', 'K'),  # Miles
-        (r'([\d,\.]+)\s*followers?', None),     # Número exacto
-    ]
-    
-    for pattern, unit in patterns:
-        match = re.search(pattern, text)
-        if match:
-            num_str = match.group(1)
-            
-            if unit == 'M':
-                # Para millones: "1.2M" -> 1200000
-                num = float(num_str.replace(',', '.'))
-                return int(num * 1_000_000)
-            
-            elif unit == 'K':
-                # Para miles: "10.5K" -> 10500
-                num = float(num_str.replace(',', '.'))
-                return int(num * 1_000)
-            
-            else:
-                # Para números exactos sin K/M
-                # Eliminar TODAS las comas y puntos (separadores de miles)
-                # "1,234" -> "1234"
-                # "3.223" (formato europeo) -> "3223"
-                # "1,333" -> "1333"
-                clean_num = num_str.replace(',', '').replace('.', '')
-                
-                # Validar que solo contenga dígitos
-                if clean_num.isdigit():
-                    return int(clean_num)
-                else:
-                    # Si no es un número válido, intentar parsearlo de todos modos
-                    try:
-                        return int(float(clean_num))
-                    except:
-                        continue
-    
+    match = FOLLOWER_COUNT_RE.search(text)
+    if match is None:
+        return None
+    num_str, suffix = match.groups()
+
+    if suffix is None:
+        # Número exacto: todos los separadores son de miles ("1,234", "3.223", "1 234")
+        return int(num_str.translate(FOLLOWER_SEPARATORS))
+
+    # Abreviado: el último "," o "." es el decimal ("1,2 mil", "12.3 k", "1.234,5 mil").
+    # Aritmética entera para no arrastrar errores de coma flotante (4.35K -> 4350, no 4349)
+    multiplier = FOLLOWER_SUFFIX_MULTIPLIERS[suffix.lower()]
+    cut = max(num_str.rfind(','), num_str.rfind('.'))
+    integer = num_str[:cut].translate(FOLLOWER_SEPARATORS) if cut >= 0 else num_str.translate(FOLLOWER_SEPARATORS)
+    fraction = num_str[cut + 1:].translate(FOLLOWER_SEPARATORS) if cut >= 0 else ''
+    value = int(integer or '0') * multiplier
+    if fraction:
+        value += int(fraction) * multiplier // 10 ** len(fraction)
+    return value
+
+# ====================== EXTRACCIÓN RÁPIDA DESDE HTML ======================
+META_TAG_RE = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+META_NAME_DESCRIPTION_RE = re.compile(r'\bname\s*=\s*["\']description["\']', re.IGNORECASE)
+META_CONTENT_RE = re.compile(r'\bcontent\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
+# JSON embebido: "edge_followed_by":{"count":1234} o "follower_count":1234. La página
+# incluye también otros usuarios (perfiles sugeridos, menciones): un contador solo se
+# acepta si "username":"<perfil>" aparece a menos de EMBEDDED_USERNAME_WINDOW caracteres
+# o, sin ese ancla, si coincide con el contador de la meta description
+EMBEDDED_FOLLOWERS_RE = re.compile(r'"(?:edge_followed_by|follower_count)"\s*:\s*(?:\{\s*"count"\s*:\s*)?(\d+)')
+EMBEDDED_USERNAME_WINDOW = 4000
+META_APPROX_TOLERANCE = 0.05  # Desviación relativa admitida frente a un contador abreviado (1.2M)
+
+# Contador de qué nivel resolvió el número de seguidores (json, meta, selector, meta_approx, body, miss)
+extraction_tiers = Counter()
+
+def extract_meta_description(raw_html):
+    """Devuelve el content de <meta name="description"> (desescapado) o None"""
+    for tag in META_TAG_RE.findall(raw_html or ''):
+        if META_NAME_DESCRIPTION_RE.search(tag):
+            m = META_CONTENT_RE.search(tag)
+            if m:
+                return html.unescape(m.group(1) if m.group(1) is not None else m.group(2)).strip()
+    return None
+
+def embedded_follower_count(raw_html, username=None, meta_count=None, meta_exact=False):
+    """Contador del JSON embebido que pertenece al perfil (None si ninguno es fiable)"""
+    matches = list(EMBEDDED_FOLLOWERS_RE.finditer(raw_html))
+    if not matches:
+        return None
+    if username:
+        user_re = re.compile(r'"username"\s*:\s*"' + re.escape(username) + '"', re.IGNORECASE)
+        anchors = [u.start() for u in user_re.finditer(raw_html)]
+        if anchors:
+            distance, value = min((min(abs(m.start() - a) for a in anchors), int(m.group(1))) for m in matches)
+            if distance <= EMBEDDED_USERNAME_WINDOW:
+                return value
+    if meta_count is None:
+        return None
+    for m in matches:
+        value = int(m.group(1))
+        if value == meta_count or (not meta_exact and abs(value - meta_count) <= meta_count * META_APPROX_TOLERANCE):
+            return value
     return None
 
+def extract_profile_from_html(raw_html, username=None):
+    """
+    Vía rápida sobre el HTML crudo de la respuesta, sin tocar el DOM.
+    Devuelve {'num_followers', 'exact', 'source', 'meta_description'}:
+     - source 'json': contador exacto del JSON embebido, anclado a username o
+       confirmado por la meta description
+     - source 'meta': meta description ("1,234 Followers, ..."); exact=False si viene abreviado (1.2M)
+    """
+    info = {'num_followers': None, 'exact': False, 'source': None, 'meta_description': None}
+    if not raw_html:
+        return info
+
+    meta_desc = extract_meta_description(raw_html)
+    info['meta_description'] = meta_desc
+    if meta_desc:
+        # La primera parte de la meta suele ser "X Followers". La abreviatura se mira solo
+        # en el contador encontrado: un nombre o bio como "5K Runner" no lo vuelve inexacto
+        match = FOLLOWER_COUNT_RE.search(meta_desc)
+        if match:
+            cnt = parse_follower_count(match.group(0))
+            if cnt is not None:
+                info.update(num_followers=cnt, exact=match.group(2) is None, source='meta')
+
+    embedded = embedded_follower_count(raw_html, username, info['num_followers'], info['exact'])
+    if embedded is not None:
+        info.update(num_followers=embedded, exact=True, source='json')
+    return info
+
+async def parse_response_html(response, username=None):
+    """Lee el HTML de la navegación y aplica la vía rápida (medido como span 'parse')"""
+    raw_html = await read_response_html(response)
+    with metrics.span('parse'):
+        return extract_profile_from_html(raw_html, username)
+
+async def read_response_html(response):
+    """Texto de la respuesta de navegación ('' si no está disponible)"""
+    if response is None:
+        return ''
+    try:
+        return await response.text()
+    except:
+        return ''
+
+def log_extraction_tiers():
+    """Muestra cuántas veces acertó cada nivel de extracción"""
+    total = sum(extraction_tiers.values())
+    if not total:
+        return
+    parts = [f"{tier}={extraction_tiers[tier]} ({extraction_tiers[tier] / total * 100:.0f}%)"
+             for tier in ('json', 'meta', 'selector', 'meta_approx', 'body', 'miss') if extraction_tiers[tier]]
+    logger.log(f"🧭 Extracción por nivel: {', '.join(parts)}")
+
+# ====================== CHECKPOINTS (RUNS REANUDABLES) ======================
+class RunJournal:
+    """
+    Diario append-only (JSONL) de una ejecución. Cada línea es un registro:
+     - {"type": "meta", ...}            configuración de la ejecución
+     - {"type": "follower", "username"} usuario extraído en FASE 1
+     - {"type": "followers_done"}       FASE 1 terminó
+     - {"type": "cookies", "path"}      cookies exportadas para FASE 2
+     - {"type": "result", "username", "value"} resultado de un perfil en FASE 2
+    Al reabrirlo se reconstruye el estado para procesar solo lo que falta.
+    """
+    def __init__(self, path, run_id):
+        self.path = path
+        self.run_id = run_id
+        self.meta = {}
+        self.followers = []
+        self.followers_done = False
+        self.cookies_file = None
+        self.done = set()  # Usuarios con resultado (los valores se releen con iter_results)
+        self._known = set()
+        if os.path.exists(path):
+            self._load()
+        self._fh = open(path, 'a', encoding='utf-8')
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for line in content.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Última línea truncada si el proceso murió a mitad de escritura
+            kind = record.get('type')
+            if kind == 'meta':
+                self.meta.update({k: v for k, v in record.items() if k != 'type'})
+            elif kind == 'follower' and record.get('username') not in self._known:
+                self._known.add(record['username'])
+                self.followers.append(record['username'])
+            elif kind == 'followers_done':
+                self.followers_done = True
+            elif kind == 'cookies':
+                self.cookies_file = record.get('path')
+            elif kind == 'result':
+                self.done.add(record['username'])
+        if content and not content.endswith('\n'):
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write('\n')
+
+    def _append(self, record):
+        self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._fh.flush()
+
+    def record_meta(self, **meta):
+        self.meta.update(meta)
+        self._append({'type': 'meta', **meta})
+
+    def record_follower(self, username):
+        if username in self._known:
+            return
+        self._known.add(username)
+        self.followers.append(username)
+        self._append({'type': 'follower', 'username': username})
+
+    def record_followers_done(self):
+        self.followers_done = True
+        self._append({'type': 'followers_done', 'count': len(self.followers)})
+
+    def record_cookies(self, path):
+        self.cookies_file = path
+        self._append({'type': 'cookies', 'path': path})
+
+    def record_result(self, username, value):
+        self.done.add(username)
+        self._append({'type': 'result', 'username': username, 'value': value})
+
+    def iter_results(self):
+        """Relee del disco los resultados ya anotados (username, valor), sin cargarlos todos"""
+        self._fh.flush()
+        seen = set()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('type') == 'result' and record['username'] not in seen:
+                    seen.add(record['username'])
+                    yield record['username'], record.get('value')
+
+    def pending(self):
+        """Usuarios extraídos que aún no tienen resultado"""
+        return [u for u in self.followers if u not in self.done]
+
+    def close(self):
+        try:
+            self._fh.close()
+        except:
+            pass
+
 # ====================== SELENIUM: LOGIN Y EXTRACCIÓN DE LISTA ======================
-def setup_selenium_driver():
-    """Configura driver de Selenium"""
+def setup_selenium_driver(headless=False):
+    """Configura driver de Selenium (headless solo para benchmarks locales)"""
     options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument('--headless=new')
     options.add_argument('--disable-blink-features=AutomationControlled')
     options.add_argument('--window-size=1920,1080')
     options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
@@ -210,7 +777,7 @@ def selenium_login(driver):
     """Login rápido sin validaciones múltiples"""
     try:
         logger.log("🔐 Iniciando login rápido con Selenium...")
-        driver.get('https://www.instagram.com/')
+        driver.get(f'{INSTAGRAM_URL}/')
         sleep(3)  # Espera corta: solo para carga inicial y cookies
 
         # Aceptar cookies si aparecen
@@ -237,7 +804,7 @@ def selenium_login(driver):
         sleep(random.uniform(4, 6))
 
         # Abrir directamente la cuenta a scrapear
-        target_url = f"https://www.instagram.com/{account}/"
+        target_url = f"{INSTAGRAM_URL}/{account}/"
         driver.get(target_url)
         logger.success(f"✓ Login rápido completado. Abriendo cuenta: {account}")
 
@@ -268,30 +835,94 @@ def handle_post_login_dialogs(driver):
             except:
                 continue
 
+# JavaScript que busca automáticamente el div scrolleable correcto
+MODAL_SCROLL_JS = """
+const dialog = document.querySelector('div[role="dialog"]');
+if (!dialog) return false;
+
+// Buscar el div que realmente scrollea
+const divs = dialog.querySelectorAll('div');
+for (let div of divs) {
+    // Si el div tiene contenido scrolleable (20% más alto que visible)
+    if (div.scrollHeight > div.clientHeight * 1.2) {
+        div.scrollTop = div.scrollHeight;
+        return true;
+    }
+}
+return false;
+"""
+
+# Colector inyectado: un MutationObserver anota solo los enlaces nuevos que
+# aparecen dentro del diálogo; Python vacía el buffer con un único execute_script
+FOLLOWER_COLLECTOR_JS = """
+if (window.__igCollector) return true;
+const c = window.__igCollector = {seen: new Set(), buffer: []};
+const take = (a) => {
+    const h = a.href;
+    if (h && !c.seen.has(h) && a.closest('div[role="dialog"]')) { c.seen.add(h); c.buffer.push(h); }
+};
+const scan = (node) => {
+    if (node.nodeType !== 1) return;
+    if (node.tagName === 'A') take(node);
+    node.querySelectorAll('a[href]').forEach(take);
+};
+document.querySelectorAll('div[role="dialog"] a[href]').forEach(take);
+// Se observa el body (no el diálogo) por si React reemplaza el nodo del modal
+c.observer = new MutationObserver(muts => { for (const m of muts) m.addedNodes.forEach(scan); });
+c.observer.observe(document.body, {childList: true, subtree: true});
+return true;
+"""
+
+FOLLOWER_DRAIN_JS = """
+const c = window.__igCollector;
+if (!c) return null;
+const b = c.buffer;
+c.buffer = [];
+return b;
+"""
+
+def install_follower_collector(driver):
+    """Inyecta el colector de enlaces del modal (idempotente)"""
+    return bool(driver.execute_script(FOLLOWER_COLLECTOR_JS))
+
+def drain_follower_links(driver):
+    """hrefs nuevos desde la última llamada, en un solo round-trip de WebDriver"""
+    hrefs = driver.execute_script(FOLLOWER_DRAIN_JS)
+    if hrefs is None:
+        # El colector se perdió (recarga de la página): reinstalar y volver a leer
+        install_follower_collector(driver)
+        hrefs = driver.execute_script(FOLLOWER_DRAIN_JS)
+    return hrefs or []
+
+def harvest_follower_links_full(driver):
+    """Fallback sin colector: relee todos los enlaces del modal (un get_attribute por enlace)"""
+    hrefs = []
+    for link in driver.find_elements(By.XPATH, "//div[@role='dialog']//a[contains(@href, '/')]"):
+        try:
+            hrefs.append(link.get_attribute('href'))
+        except Exception:
+            continue
+    return hrefs
+
+def username_from_href(href):
+    """Usuario de un enlace de perfil de Instagram (o del servidor configurado en IG_BASE_URL)"""
+    if not href:
+        return None
+    if 'instagram.com/' in href:
+        return href.split('instagram.com/')[-1].strip('/').split('/')[0]
+    parsed = urlparse(href)
+    if parsed.netloc and parsed.netloc == urlparse(INSTAGRAM_URL).netloc:
+        parts = [p for p in parsed.path.split('/') if p]
+        return parts[0] if parts else None
+    return None
+
 def scroll_modal_smart(driver):
     """
     Hace scroll inteligente buscando el div correcto que scrollea
     Basado en técnica probada que busca divs con scrollHeight > clientHeight
     """
     try:
-        # JavaScript que busca automáticamente el div scrolleable correcto
-        scroll_script = """
-        const dialog = document.querySelector('div[role="dialog"]');
-        if (!dialog) return false;
-        
-        // Buscar el div que realmente scrollea
-        const divs = dialog.querySelectorAll('div');
-        for (let div of divs) {
-            // Si el div tiene contenido scrolleable (20% más alto que visible)
-            if (div.scrollHeight > div.clientHeight * 1.2) {
-                div.scrollTop = div.scrollHeight;
-                return true;
-            }
-        }
-        return false;
-        """
-        
-        result = driver.execute_script(scroll_script)
+        result = driver.execute_script(MODAL_SCROLL_JS)
         
         if result:
             # Pausa para que Instagram cargue más datos
@@ -305,8 +936,89 @@ def scroll_modal_smart(driver):
         logger.debug(f"  ✗ Error en scroll: {str(e)}")
         return False
 
-def extract_followers_list_selenium(driver, account_name, page_type, target_count):
-    """Extrae lista de seguidores con Selenium usando clic tradicional y scroll automático"""
+class ModalHarvest:
+    """
+    Estado de la recolección del modal de followers, común a Selenium y Playwright:
+    deduplica los enlaces de cada lectura, avisa de cada usuario nuevo (on_user),
+    registra el progreso y decide cuándo parar (objetivo alcanzado, max_no_progress
+    lecturas seguidas sin usuarios nuevos o max_scroll_attempts scrolls).
+    known_users: usuarios ya extraídos (al reanudar) que cuentan para el objetivo.
+    """
+    def __init__(self, account_name, target_count, known_users=None, on_user=None, max_no_progress=10, max_scroll_attempts=200):
+        self.account_name = account_name
+        self.target_count = target_count
+        self.on_user = on_user
+        self.max_no_progress = max_no_progress
+        self.max_scroll_attempts = max_scroll_attempts
+        self.followers_list = list(known_users or [])
+        self.scraped = set(self.followers_list)
+        self.seen_this_session = set()  # Los ya conocidos también cuentan como progreso del scroll
+        self.consecutive_no_progress = 0
+        self.scroll_attempts = 0
+
+    @property
+    def reached(self):
+        return len(self.followers_list) >= self.target_count
+
+    @property
+    def active(self):
+        return (not self.reached and self.consecutive_no_progress < self.max_no_progress
+                and self.scroll_attempts < self.max_scroll_attempts)
+
+    def consume(self, hrefs):
+        """Procesa los enlaces de una lectura del modal; devuelve cuántos usuarios no vistos traía"""
+        new_users = 0
+        for href in hrefs:
+            try:
+                username = username_from_href(href)
+                if username and username not in self.seen_this_session and username != self.account_name and not username.startswith(('explore', 'p/', 'direct')):
+                    self.seen_this_session.add(username)
+                    new_users += 1
+                    if username not in self.scraped:
+                        self.scraped.add(username)
+                        self.followers_list.append(username)
+                        if self.on_user:
+                            self.on_user(username)
+                    if self.reached:
+                        logger.success(f"🎯 Objetivo alcanzado ({len(self.followers_list)})")
+                        break
+            except Exception:
+                continue
+
+        # Control de progreso
+        if new_users > 0:
+            self.consecutive_no_progress = 0
+            logger.log(f"  ✓ Progreso: {len(self.followers_list)}/{self.target_count} (+{new_users})")
+        else:
+            self.consecutive_no_progress += 1
+            if self.consecutive_no_progress <= 3:
+                logger.debug(f"  ⏳ Sin nuevos usuarios ({self.consecutive_no_progress})")
+            else:
+                logger.warning(f"  ⚠ Sin progreso ({self.consecutive_no_progress})")
+        return new_users
+
+    def next_scroll(self):
+        self.scroll_attempts += 1
+        if self.scroll_attempts % 10 == 1:
+            logger.debug(f"  📜 Scroll #{self.scroll_attempts}")
+
+    def log_summary(self):
+        logger.log("=" * 60)
+        if self.reached:
+            logger.success(f"✅ ÉXITO: {len(self.followers_list)} usuarios extraídos")
+        elif self.followers_list:
+            logger.warning(f"⚠ PARCIAL: {len(self.followers_list)}/{self.target_count} usuarios (fin de lista o límite de carga)")
+        else:
+            logger.error("❌ No se extrajo ningún usuario")
+        logger.log(f"   Total scrolls: {self.scroll_attempts}")
+        logger.log("=" * 60)
+
+def extract_followers_list_selenium(driver, account_name, page_type, target_count, known_users=None, on_user=None):
+    """
+    Extrae lista de seguidores con Selenium usando clic tradicional y scroll automático.
+    known_users: usuarios ya extraídos (al reanudar) que cuentan para el objetivo.
+    on_user: callback invocado con cada usuario nuevo en cuanto se extrae.
+    """
     try:
         logger.log(f"📋 Extrayendo lista de {page_type} de {account_name}...")
         logger.log(f"🎯 Objetivo: {target_count} usuarios")
@@ -346,73 +1058,33 @@ def extract_followers_list_selenium(driver, account_name, page_type, target_coun
         human_delay(1.5, 2.5)
         logger.log("⏳ Cargando primeros usuarios visibles...")
 
-        # --- Extracción y scroll automático (idéntico, no tocar) ---
-        followers_list = []
-        scraped = set()
-        consecutive_no_progress = 0
-        max_no_progress = 10
-        scroll_attempts = 0
-        max_scroll_attempts = 200
+        harvest = ModalHarvest(account_name, target_count, known_users, on_user)
+
+        # Colector incremental de enlaces (fallback: releer todos los enlaces)
+        use_collector = install_follower_collector(driver)
+        if not use_collector:
+            logger.warning("⚠ No se pudo inyectar el colector; se releerán todos los enlaces en cada scroll")
 
         logger.log("🔄 Iniciando extracción con scroll inteligente...")
         logger.log(f"   Objetivo: {target_count}")
-        logger.log(f"   Máx intentos sin progreso: {max_no_progress}")
-
-        while len(followers_list) < target_count and consecutive_no_progress < max_no_progress and scroll_attempts < max_scroll_attempts:
-            user_links = driver.find_elements(By.XPATH, "//div[@role='dialog']//a[contains(@href, '/')]")
-            new_users = 0
-
-            for link in user_links:
-                try:
-                    href = link.get_attribute('href')
-                    if href and 'instagram.com/' in href:
-                        username = href.split('instagram.com/')[-1].strip('/').split('/')[0]
-                        if username and username not in scraped and username != account_name and not username.startswith(('explore', 'p/', 'direct')):
-                            scraped.add(username)
-                            followers_list.append(username)
-                            new_users += 1
-                            if len(followers_list) >= target_count:
-                                logger.success(f"🎯 Objetivo alcanzado ({len(followers_list)})")
-                                break
-                except Exception:
-                    continue
-
-            # Control de progreso
-            if new_users > 0:
-                consecutive_no_progress = 0
-                logger.log(f"  ✓ Progreso: {len(followers_list)}/{target_count} (+{new_users})")
-            else:
-                consecutive_no_progress += 1
-                if consecutive_no_progress <= 3:
-                    logger.debug(f"  ⏳ Sin nuevos usuarios ({consecutive_no_progress})")
-                else:
-                    logger.warning(f"  ⚠ Sin progreso ({consecutive_no_progress})")
+        logger.log(f"   Máx intentos sin progreso: {harvest.max_no_progress}")
 
-            if len(followers_list) >= target_count:
+        while harvest.active:
+            with metrics.span('modal_harvest'):
+                harvest.consume(drain_follower_links(driver) if use_collector else harvest_follower_links_full(driver))
+            if harvest.reached:
                 break
 
-            scroll_attempts += 1
-            if scroll_attempts % 10 == 1:
-                logger.debug(f"  📜 Scroll #{scroll_attempts}")
-
+            harvest.next_scroll()
             # Mantiene scroll automático existente (sin tocar)
-            scroll_modal_smart(driver)
+            with metrics.span('modal_scroll'):
+                scroll_modal_smart(driver)
 
             # Pausa corta entre scrolls (natural)
             sleep(random.uniform(1.4, 2.2))
 
-        # --- Resumen final ---
-        logger.log("=" * 60)
-        if len(followers_list) >= target_count:
-            logger.success(f"✅ ÉXITO: {len(followers_list)} usuarios extraídos")
-        elif followers_list:
-            logger.warning(f"⚠ PARCIAL: {len(followers_list)}/{target_count} usuarios (fin de lista o límite de carga)")
-        else:
-            logger.error("❌ No se extrajo ningún usuario")
-
-        logger.log(f"   Total scrolls: {scroll_attempts}")
-        logger.log("=" * 60)
-        return followers_list
+        harvest.log_summary()
+        return harvest.followers_list
 
     except Exception as e:
         logger.error(f"❌ Error extrayendo lista: {str(e)}")
@@ -432,165 +1104,1246 @@ def save_selenium_cookies(driver, filepath):
         logger.error(f"Error guardando cookies: {str(e)}")
         return False
 
-# ====================== PLAYWRIGHT: ANÁLISIS PARALELO ======================
-async def get_follower_count_playwright(context, username, worker_id):
-    """
-    Obtiene el número de seguidores de un usuario usando Playwright
-    """
-    page = None
-    try:
-        page = await context.new_page()
-        
-        # Bloquear recursos innecesarios para mayor velocidad
-        await page.route("/*.{png,jpg,jpeg,gif,svg,mp4,webm}", lambda route: route.abort())
-        await page.route("/static/", lambda route: route.abort())
-        
-        url = f'https://www.instagram.com/{username}/'
-        await page.goto(url, wait_until='domcontentloaded', timeout=15000)
-        
-        # Esperar un poco para que cargue
-        await page.wait_for_timeout(2000)
-        
-        # Verificar si existe
+# ====================== PLAYWRIGHT: LOGIN Y EXTRACCIÓN DE LISTA ======================
+# Alternativa a la FASE 1 con Selenium: misma secuencia (login, diálogos, modal con
+# scroll) sobre una página del contexto que luego usan los workers de análisis.
+PW_COOKIE_BUTTONS = (
+    "button:has-text('Allow essential and optional cookies')",
+    "button:has-text('Accept')",
+)
+PW_DIALOG_BUTTONS = (
+    "button:has-text('Not Now')",
+    "button:has-text('Ahora no')",
+)
+
+def as_page_function(js_body):
+    """Adapta un script de execute_script (cuerpo con return) a page.evaluate"""
+    return f"() => {{ {js_body} }}"
+
+async def handle_cookies_playwright(pg):
+    for selector in PW_COOKIE_BUTTONS:
         try:
-            error = await page.query_selector("h2:has-text('Sorry')")
-            if error:
-                logger.warning(f"  [Worker {worker_id}] ⚠ {username} no existe/privado")
-                return username, None
+            await pg.click(selector, timeout=3000)
+            await asyncio.sleep(random.uniform(1, 2))
+            return True
         except:
-            pass
-        
-        # Buscar número de seguidores
-        selectors = [
-            f'a[href="/{username}/followers/"]',
-            'a[href*="/followers/"]',
-        ]
-        
-        for selector in selectors:
-            try:
-                element = await page.wait_for_selector(selector, timeout=5000)
-                if element:
-                    text = await element.inner_text()
-                    count = parse_follower_count(text)
-                    
-                    if count is not None:
-                        logger.success(f"  [Worker {worker_id}] ✓ {username}: {count:,}")
-                        return username, count
-                    
-                    # Intentar con title
-                    title = await element.get_attribute('title')
-                    if title:
-                        count = parse_follower_count(title)
-                        if count is not None:
-                            logger.success(f"  [Worker {worker_id}] ✓ {username}: {count:,}")
-                            return username, count
-            except:
-                continue
-        
-        # Método alternativo: buscar en todo el texto
+            continue
+    return False
+
+async def playwright_login(pg):
+    """Login con Playwright (mismos pasos que selenium_login) y apertura de la cuenta objetivo"""
+    try:
+        logger.log("🔐 Iniciando login con Playwright...")
+        await pg.goto(f'{INSTAGRAM_URL}/', wait_until='domcontentloaded')
+        await handle_cookies_playwright(pg)
+
+        await pg.wait_for_selector("input[name='username']", timeout=10000)
+        await pg.type("input[name='username']", yourusername, delay=random.uniform(50, 150))
+        await pg.type("input[name='password']", yourpassword, delay=random.uniform(50, 150))
+        await asyncio.sleep(0.5)
+        await pg.press("input[name='password']", "Enter")
+        logger.log("🚀 Enviando credenciales...")
+
+        # Sin formulario de login tras el envío = sesión iniciada
         try:
-            body_text = await page.inner_text('body')
-            if 'followers' in body_text.lower():
-                lines = body_text.split('\n')
-                for line in lines:
-                    if 'follower' in line.lower():
-                        count = parse_follower_count(line)
-                        if count is not None:
-                            logger.success(f"  [Worker {worker_id}] ✓ {username}: {count:,} (alt)")
-                            return username, count
+            await pg.wait_for_selector("input[name='password']", state='detached', timeout=15000)
         except:
-            pass
-        
-        logger.warning(f"  [Worker {worker_id}] ⚠ No se pudo obtener de {username}")
-        return username, None
-        
+            logger.error("❌ El formulario de login sigue visible (credenciales o verificación)")
+            return False
+
+        await pg.goto(f"{INSTAGRAM_URL}/{account}/", wait_until='domcontentloaded')
+        logger.success(f"✓ Login con Playwright completado. Abriendo cuenta: {account}")
+        await asyncio.sleep(random.uniform(1.5, 2.5))
+        return True
+
     except Exception as e:
-        logger.debug(f"  [Worker {worker_id}] ✗ Error en {username}: {str(e)}")
-        return username, None
-    finally:
-        if page:
-            await page.close()
+        logger.error(f"❌ Error en login con Playwright: {str(e)}")
+        return False
 
-# -------------------------
-# Nuevo: obtener info de perfil (para PAGE_TYPE == 'following')
-# -------------------------
-async def get_profile_info_playwright(context, username, worker_id):
+async def handle_post_login_dialogs_playwright(pg):
+    for selector in PW_DIALOG_BUTTONS:
+        try:
+            await pg.click(selector, timeout=3000)
+            logger.debug("Diálogo cerrado")
+        except:
+            continue
+
+async def extract_followers_list_playwright(pg, account_name, page_type, target_count, known_users=None, on_user=None):
     """
-    Extrae: name, username, bio (description), account_type (categoria), num_followers (si está).
-    Devuelve: (username, details_dict) donde details_dict = {
-        'name': str|None,
-        'username': username,
-        'bio': str|None,
-        'account_type': str|None,
-        'num_followers': int|None
-    }
+    Equivalente a extract_followers_list_selenium sobre una página de Playwright,
+    reutilizando el colector MutationObserver y el script de scroll del modal.
+    on_user se invoca (en el mismo loop) con cada usuario nuevo.
     """
-    page = None
     try:
-        page = await context.new_page()
-        # Bloquear recursos pesados
-        await page.route("/*.{png,jpg,jpeg,gif,svg,mp4,webm}", lambda route: route.abort())
-        await page.route("/static/", lambda route: route.abort())
+        logger.log(f"📋 Extrayendo lista de {page_type} de {account_name} (Playwright)...")
+        logger.log(f"🎯 Objetivo: {target_count} usuarios")
 
-        url = f'https://www.instagram.com/{username}/'
-        await page.goto(url, wait_until='domcontentloaded', timeout=15000)
-        await page.wait_for_timeout(1500)
+        if await pg.query_selector("h2:has-text('Sorry')"):
+            logger.error("❌ Cuenta no existe o no accesible")
+            return []
 
-        # Si la cuenta no existe o es privada detectada por texto tipo 'Sorry'
         try:
-            err = await page.query_selector("h2:has-text('Sorry')")
-            if err:
-                logger.warning(f"  [Worker {worker_id}] ⚠ {username} no existe/privado")
-                return username, {
-                    'name': None,
-                    'username': username,
-                    'bio': None,
-                    'account_type': None,
-                    'num_followers': None
-                }
+            await pg.click(f'a[href*="/{page_type}"]', timeout=6000)
+            await pg.wait_for_selector("div[role='dialog']", timeout=7000)
+            logger.success(f"✓ Modal de {page_type} abierto correctamente.")
         except:
-            pass
+            logger.error(f"❌ No se pudo abrir el modal de {page_type}")
+            return []
 
-        async def try_selectors_text(selectors):
-            for s in selectors:
-                try:
-                    el = await page.query_selector(s)
-                    if el:
-                        txt = (await el.inner_text()).strip()
+        await asyncio.sleep(random.uniform(1.5, 2.5))
+        await pg.evaluate(as_page_function(FOLLOWER_COLLECTOR_JS))
+
+        harvest = ModalHarvest(account_name, target_count, known_users, on_user)
+        while harvest.active:
+            with metrics.span('modal_harvest'):
+                hrefs = await pg.evaluate(as_page_function(FOLLOWER_DRAIN_JS))
+                if hrefs is None:
+                    await pg.evaluate(as_page_function(FOLLOWER_COLLECTOR_JS))
+                    hrefs = []
+                harvest.consume(hrefs)
+            if harvest.reached:
+                break
+
+            harvest.next_scroll()
+            with metrics.span('modal_scroll'):
+                if await pg.evaluate(as_page_function(MODAL_SCROLL_JS)):
+                    await asyncio.sleep(random.uniform(1.5, 2.5))
+            await asyncio.sleep(random.uniform(1.4, 2.2))
+
+        harvest.log_summary()
+        return harvest.followers_list
+
+    except Exception as e:
+        logger.error(f"❌ Error extrayendo lista con Playwright: {str(e)}")
+        import traceback
+        logger.debug(traceback.format_exc())
+        return []
+
+def playwright_to_selenium_cookies(playwright_cookies):
+    """Convierte cookies de Playwright al formato exportado por Selenium"""
+    selenium_cookies = []
+    for cookie in playwright_cookies:
+        exported = {k: cookie[k] for k in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly') if k in cookie}
+        if cookie.get('expires', -1) > 0:
+            exported['expiry'] = int(cookie['expires'])
+        selenium_cookies.append(exported)
+    return selenium_cookies
+
+async def save_playwright_cookies(context, filepath):
+    """Exporta las cookies del contexto en el formato de Selenium (el que lee --resume)"""
+    try:
+        cookies = playwright_to_selenium_cookies(await context.cookies())
+        with open(filepath, 'w') as f:
+            json.dump(cookies, f)
+        logger.success(f"✓ Cookies guardadas: {filepath}")
+        return True
+    except Exception as e:
+        logger.error(f"Error guardando cookies: {str(e)}")
+        return False
+
+# ====================== SESIÓN PERSISTENTE ======================
+class SessionStore:
+    """
+    Cookies del último login (formato Selenium, válido para ambos motores) en
+    logs/session_<usuario>.json. load() hace la validación barata local: existe
+    la cookie sessionid y no ha caducado. La validación real (la página no pide
+    login) la hacen selenium_restore_session / playwright_restore_session.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r') as f:
+                cookies = json.load(f)
+        except (OSError, ValueError):
+            return None
+        session = next((c for c in cookies if c.get('name') == 'sessionid'), None)
+        if session is None or not session.get('value'):
+            return None
+        if session.get('expiry') and session['expiry'] <= time():
+            logger.log("⌛ Sesión guardada caducada")
+            return None
+        return cookies
+
+    def save(self, cookies):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(cookies, f)
+        os.replace(tmp_path, self.path)
+        logger.debug(f"Sesión guardada: {self.path}")
+
+    def invalidate(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+def open_session_store():
+    if not SESSION_REUSE:
+        return None
+    return SessionStore(logger.session_file(yourusername))
+
+def selenium_restore_session(driver, session_store):
+    """Carga la sesión guardada en Selenium y abre la cuenta objetivo; False si hay que hacer login"""
+    cookies = session_store.load() if session_store is not None else None
+    if not cookies:
+        return False
+    try:
+        logger.log("🔑 Reutilizando sesión guardada (Selenium)...")
+        driver.get(f'{INSTAGRAM_URL}/')
+        for cookie in cookies:
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                continue
+        driver.get(f"{INSTAGRAM_URL}/{account}/")
+        sleep(random.uniform(1.5, 2.5))
+        if '/accounts/login' in driver.current_url or driver.find_elements(By.NAME, "password"):
+            logger.warning("⚠ La sesión guardada ya no es válida: login con credenciales")
+            session_store.invalidate()
+            return False
+        logger.success(f"✓ Sesión reutilizada (sin login). Abriendo cuenta: {account}")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠ No se pudo reutilizar la sesión: {str(e)}")
+        return False
+
+async def playwright_restore_session(context, pg, session_store):
+    """Equivalente a selenium_restore_session para el motor Playwright"""
+    cookies = session_store.load() if session_store is not None else None
+    if not cookies:
+        return False
+    try:
+        logger.log("🔑 Reutilizando sesión guardada (Playwright)...")
+        await context.add_cookies(selenium_to_playwright_cookies(cookies))
+        await pg.goto(f"{INSTAGRAM_URL}/{account}/", wait_until='domcontentloaded')
+        await asyncio.sleep(random.uniform(1.5, 2.5))
+        if '/accounts/login' in pg.url or await pg.query_selector("input[name='password']"):
+            logger.warning("⚠ La sesión guardada ya no es válida: login con credenciales")
+            await context.clear_cookies()
+            session_store.invalidate()
+            return False
+        logger.success(f"✓ Sesión reutilizada (sin login). Abriendo cuenta: {account}")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠ No se pudo reutilizar la sesión: {str(e)}")
+        return False
+
+async def ensure_logged_in_context(context, session_store=None):
+    """
+    Deja el contexto con la sesión iniciada: reutiliza la sesión guardada o hace login
+    con credenciales (y entonces cierra los diálogos y guarda la sesión nueva).
+    Devuelve la página usada para el login, ya en la cuenta objetivo, o None si falla.
+    """
+    login_page = await context.new_page()
+    with metrics.span('playwright_login'):
+        restored = await playwright_restore_session(context, login_page, session_store)
+        logged_in = restored or await playwright_login(login_page)
+    if not logged_in:
+        return None
+    if not restored:
+        await handle_post_login_dialogs_playwright(login_page)
+        if session_store is not None:
+            session_store.save(playwright_to_selenium_cookies(await context.cookies()))
+    return login_page
+
+# ====================== CACHÉ PERSISTENTE DE PERFILES ======================
+class ProfileCache:
+    """
+    Caché en SQLite username -> details (el dict de get_profile_info_playwright).
+    Las entradas caducan tras ttl_seconds y, si se supera max_entries, se
+    desalojan las menos usadas recientemente (LRU por last_access).
+    Guarda también cuánto tardó la descarga original para estimar el tiempo ahorrado.
+    get() es solo un SELECT por clave primaria: los last_access se acumulan en
+    memoria y se escriben en lote (cada access_batch aciertos, al desalojar y al cerrar).
+    """
+    def __init__(self, path, ttl_seconds, max_entries, access_batch=100):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._puts = 0
+        self.access_batch = max(1, access_batch)
+        self._accessed = {}
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " username TEXT PRIMARY KEY,"
+            " details TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " fetch_seconds REAL NOT NULL DEFAULT 0)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_profiles_last_access ON profiles(last_access)")
+        self.conn.commit()
+
+    def get(self, username):
+        """Devuelve details si hay una entrada vigente; None si falta o caducó"""
+        row = self.conn.execute(
+            "SELECT details, fetched_at, fetch_seconds FROM profiles WHERE username = ?", (username,)
+        ).fetchone()
+        now = time()
+        if row is None or now - row[1] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self._accessed[username] = now
+        if len(self._accessed) >= self.access_batch:
+            self.flush_access()
+        self.hits += 1
+        self.saved_seconds += row[2]
+        return json.loads(row[0])
+
+    def put(self, username, details, fetch_seconds=0.0):
+        """Guarda/actualiza details (se fusiona con lo ya guardado para no perder campos)"""
+        row = self.conn.execute("SELECT details FROM profiles WHERE username = ?", (username,)).fetchone()
+        merged = json.loads(row[0]) if row else {}
+        merged.update({k: v for k, v in details.items() if v is not None or k not in merged})
+        now = time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO profiles (username, details, fetched_at, last_access, fetch_seconds) VALUES (?, ?, ?, ?, ?)",
+            (username, json.dumps(merged, ensure_ascii=False), now, now, fetch_seconds)
+        )
+        self.conn.commit()
+        self._puts += 1
+        if self._puts % 100 == 0:
+            self.evict()
+
+    def flush_access(self):
+        """Escribe en una transacción los last_access acumulados por get()"""
+        if not self._accessed:
+            return
+        accessed, self._accessed = self._accessed, {}
+        self.conn.executemany("UPDATE profiles SET last_access = ? WHERE username = ?",
+                              [(ts, username) for username, ts in accessed.items()])
+        self.conn.commit()
+
+    def evict(self):
+        """Elimina entradas caducadas y, si sobra, las menos usadas recientemente"""
+        self.flush_access()
+        self.conn.execute("DELETE FROM profiles WHERE fetched_at < ?", (time() - self.ttl_seconds,))
+        total = self.conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+        if total > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM profiles WHERE username IN "
+                "(SELECT username FROM profiles ORDER BY last_access ASC LIMIT ?)",
+                (total - self.max_entries,)
+            )
+        self.conn.commit()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups * 100 if lookups else 0.0
+
+    def log_summary(self):
+        logger.log(f"🗄  Caché de perfiles: {self.hits} aciertos / {self.hits + self.misses} consultas "
+                   f"({self.hit_rate:.1f}%) | tiempo de red ahorrado: ~{self.saved_seconds/60:.1f} min")
+
+    def snapshot(self):
+        return {'hits': self.hits, 'misses': self.misses, 'saved_seconds': self.saved_seconds}
+
+    def merge(self, snapshot):
+        """Suma los contadores de la caché de otro proceso (un shard)"""
+        self.hits += snapshot['hits']
+        self.misses += snapshot['misses']
+        self.saved_seconds += snapshot['saved_seconds']
+
+    def close(self):
+        try:
+            self.evict()
+        finally:
+            self.conn.close()
+
+def open_profile_cache():
+    """Abre la caché de perfiles configurada en .env (None si está desactivada)"""
+    if not PROFILE_CACHE_ENABLED:
+        return None
+    try:
+        return ProfileCache(logger.cache_file, PROFILE_CACHE_TTL_HOURS * 3600, PROFILE_CACHE_MAX_ENTRIES)
+    except Exception as e:
+        logger.warning(f"⚠ No se pudo abrir la caché de perfiles: {e}")
+        return None
+
+# ====================== PLAYWRIGHT: BLOQUEO DE RECURSOS ======================
+class ProfileResources:
+    """Cuenta de una visita a un perfil: contadores y lecturas de sizes() aún en curso"""
+    def __init__(self):
+        self.counts = Counter()
+        self.pending = set()
+
+class ResourceStats:
+    """
+    Peticiones bloqueadas/permitidas y bytes recibidos por perfil. Solo cuentan las
+    páginas de perfil en curso (entre begin y end); login y modal no se tocan.
+    Cada petición queda asociada al perfil que estaba cargando la página cuando salió
+    (con el pool una página pasa de un perfil a otro), y end() espera a sus sizes()
+    pendientes antes de sumar el perfil.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._pages = {}
+        self._requests = weakref.WeakKeyDictionary()  # petición -> ProfileResources que la lanzó
+        self.totals = Counter()
+        self.per_profile = {'blocked': [], 'allowed': [], 'bytes': []}
+        self.profiles = 0
+
+    def begin(self, page):
+        self._pages[page] = ProfileResources()
+
+    async def end(self, page):
+        visit = self._pages.pop(page, None)
+        if visit is None:
+            return
+        if visit.pending:
+            await asyncio.wait(visit.pending, timeout=RESOURCE_SIZES_TIMEOUT)
+        self.profiles += 1
+        self.totals.update(visit.counts)
+        for key, values in self.per_profile.items():
+            if len(values) < METRICS_MAX_SAMPLES:
+                values.append(visit.counts[key])
+
+    def snapshot(self):
+        return {'totals': dict(self.totals), 'per_profile': self.per_profile, 'profiles': self.profiles}
+
+    def merge(self, snapshot):
+        self.totals.update(snapshot['totals'])
+        self.profiles += snapshot['profiles']
+        for key, values in snapshot['per_profile'].items():
+            merged = self.per_profile.setdefault(key, [])
+            merged.extend(values[:max(0, METRICS_MAX_SAMPLES - len(merged))])
+
+    def visit_for(self, request):
+        """Perfil en curso en la página de la petición (None si no es de un perfil)"""
+        try:
+            return self._pages.get(request.frame.page)
+        except Exception:
+            return None
+
+    def tag(self, request, visit):
+        self._requests[request] = visit
+
+    def request_finished(self, request):
+        """Lee los bytes de la petición y los suma al perfil que la lanzó, aunque la página ya esté en otro"""
+        visit = self._requests.pop(request, None)
+        if visit is None:
+            return
+        task = asyncio.ensure_future(self._add_sizes(request, visit))
+        visit.pending.add(task)
+        task.add_done_callback(visit.pending.discard)
+
+    def request_failed(self, request):
+        self._requests.pop(request, None)
+
+    @staticmethod
+    async def _add_sizes(request, visit):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        visit.counts['bytes'] += sizes['responseHeadersSize'] + sizes['responseBodySize']
+
+    def summary(self):
+        if not self.profiles:
+            return {}
+        result = {'profiles': self.profiles}
+        for key, values in self.per_profile.items():
+            result[key] = {
+                'total': self.totals[key],
+                'mean': round(self.totals[key] / self.profiles, 1),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+            }
+        result['blocked_by_type'] = {key.split(':', 1)[1]: n for key, n in sorted(self.totals.items()) if key.startswith('blocked:')}
+        return result
+
+    def log_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        blocked, allowed, received = summary['blocked'], summary['allowed'], summary['bytes']
+        logger.log(f"🧱 Recursos por perfil: {blocked['mean']:.1f} bloqueadas, {allowed['mean']:.1f} permitidas, "
+                   f"{received['mean'] / 1024:.1f} KB recibidos (p95 {received['p95'] / 1024:.1f} KB)")
+        if summary['blocked_by_type']:
+            logger.log(f"   - Bloqueadas por tipo: {', '.join(f'{k}={v}' for k, v in summary['blocked_by_type'].items())}")
+
+resource_stats = ResourceStats()
+
+def should_block_request(request, allowed_hosts):
+    """Decide por tipo de recurso, host permitido y endpoints de telemetría"""
+    if request.resource_type in RESOURCE_BLOCKED_TYPES:
+        return True
+    host = urlparse(request.url).hostname or ''
+    if not any(host == allowed or host.endswith('.' + allowed) for allowed in allowed_hosts):
+        return True
+    return RESOURCE_BLOCKED_URL_RE.search(request.url) is not None
+
+async def install_resource_policy(context):
+    """
+    Instala una única ruta para todo el contexto. Se aplica solo a las páginas de
+    perfil registradas en resource_stats y cuenta sus peticiones y bytes.
+    """
+    blocking = RESOURCE_BLOCKING
+    allowed_hosts = RESOURCE_ALLOWED_HOSTS + (urlparse(INSTAGRAM_URL).hostname or '',)
+
+    async def handle_route(route, request):
+        visit = resource_stats.visit_for(request)
+        try:
+            if visit is not None and blocking and should_block_request(request, allowed_hosts):
+                visit.counts['blocked'] += 1
+                visit.counts[f'blocked:{request.resource_type}'] += 1
+                await route.abort()
+                return
+            if visit is not None:
+                visit.counts['allowed'] += 1
+                resource_stats.tag(request, visit)
+            await route.continue_()
+        except Exception:
+            pass  # Página cerrada mientras la petición estaba en vuelo
+
+    await context.route("**/*", handle_route)
+    context.on('requestfinished', resource_stats.request_finished)
+    context.on('requestfailed', resource_stats.request_failed)
+
+# ====================== PLAYWRIGHT: POOL DE PÁGINAS ======================
+class PagePool:
+    """
+    Pool acotado de páginas Playwright reutilizables.
+    Cada página se crea una sola vez y navega de perfil en perfil (el bloqueo de
+    recursos es una ruta del contexto). Se recicla (cerrar y crear otra) tras
+    max_uses perfiles o cuando el worker informa que se rompió.
+    """
+    def __init__(self, context, size, max_uses=PAGE_POOL_MAX_USES):
+        self.context = context
+        self.max_uses = max(1, max_uses)
+        self._slots = asyncio.Semaphore(max(1, size))
+        self._idle = []
+        self._uses = {}
+        self.pages_created = 0
+        self.pages_recycled = 0
+
+    async def _new_page(self):
+        with metrics.span('page_create'):
+            pg = await self.context.new_page()
+        self._uses[pg] = 0
+        self.pages_created += 1
+        return pg
+
+    async def acquire(self):
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                pg = self._idle.pop()
+                if not pg.is_closed():
+                    return pg
+                self._uses.pop(pg, None)
+            return await self._new_page()
+        except Exception:
+            self._slots.release()
+            raise
+
+    async def release(self, pg, broken=False):
+        try:
+            uses = self._uses.get(pg, 0) + 1
+            if broken or pg.is_closed() or uses >= self.max_uses:
+                self._uses.pop(pg, None)
+                self.pages_recycled += 1
+                try:
+                    await pg.close()
+                except:
+                    pass
+            else:
+                self._uses[pg] = uses
+                self._idle.append(pg)
+        finally:
+            self._slots.release()
+
+    async def close(self):
+        for pg in self._idle:
+            try:
+                await pg.close()
+            except:
+                pass
+        self._idle.clear()
+        self._uses.clear()
+
+async def acquire_profile_page(context, page_pool):
+    """Obtiene una página del pool o, sin pool, crea una nueva; abre su cuenta de recursos"""
+    if page_pool is not None:
+        pg = await page_pool.acquire()
+    else:
+        with metrics.span('page_create'):
+            pg = await context.new_page()
+    resource_stats.begin(pg)
+    return pg
+
+async def release_profile_page(pg, page_pool, broken=False):
+    """Cierra la cuenta de recursos del perfil y devuelve la página al pool (o la cierra)"""
+    await resource_stats.end(pg)
+    if page_pool is not None:
+        await page_pool.release(pg, broken=broken)
+    else:
+        await pg.close()
+
+# ====================== PLAYWRIGHT: ESPERA ADAPTATIVA ======================
+# Señales que indican que el perfil ya es utilizable: (selector, estado)
+PROFILE_READY_MARKERS = {
+    'followers': ('a[href*="/followers/"]', 'visible'),
+    'sorry': ("h2:has-text('Sorry')", 'visible'),
+    'meta': ('meta[name="description"]', 'attached'),
+}
+
+class WaitStats:
+    """Acumula la latencia observada de cada espera y qué señal la resolvió"""
+    def __init__(self):
+        self.samples = {}
+
+    def reset(self):
+        self.samples = {}
+
+    def record(self, marker, latency_ms):
+        self.samples.setdefault(marker or 'timeout', []).append(latency_ms)
+
+    def log_summary(self):
+        all_samples = [v for values in self.samples.values() for v in values]
+        if not all_samples:
+            return
+        logger.log("⏳ Latencia de espera de perfiles (ms):")
+        logger.log(f"   - Total: n={len(all_samples)} p50={percentile(all_samples, 50):.0f} "
+                   f"p90={percentile(all_samples, 90):.0f} p99={percentile(all_samples, 99):.0f} max={max(all_samples):.0f}")
+        for marker in sorted(self.samples):
+            values = self.samples[marker]
+            logger.log(f"   - {marker:<10}: n={len(values)} p50={percentile(values, 50):.0f} "
+                       f"p90={percentile(values, 90):.0f} max={max(values):.0f}")
+
+wait_stats = WaitStats()
+
+async def wait_for_profile_ready(page, deadline, markers=('followers', 'sorry', 'meta')):
+    """
+    Compite entre los selectores de markers contra un único plazo (deadline, en
+    perf_counter) y devuelve el nombre del primero que aparece, o None si vence.
+    """
+    start = perf_counter()
+    remaining_ms = (deadline - start) * 1000
+    if remaining_ms <= 0:
+        return None
+
+    tasks = {}
+    for name in markers:
+        selector, state = PROFILE_READY_MARKERS[name]
+        task = asyncio.ensure_future(page.wait_for_selector(selector, state=state, timeout=remaining_ms))
+        tasks[task] = name
+
+    winner = None
+    pending = set(tasks)
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0, deadline - perf_counter()), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                if task.exception() is None and task.result() is not None:
+                    winner = tasks[task]
+                    break
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    wait_stats.record(winner, (perf_counter() - start) * 1000)
+    metrics.observe('selector_wait', perf_counter() - start)
+    return winner
+
+async def wait_for_profile_content(page):
+    """
+    Espera adaptativa de un perfil recién navegado: vuelve en cuanto aparece una
+    señal. Si solo está la meta description (llega con el HTML), se sigue esperando
+    al enlace de followers o al "Sorry" con lo que quede del mismo plazo.
+    """
+    deadline = perf_counter() + PROFILE_READY_TIMEOUT_MS / 1000
+    marker = await wait_for_profile_ready(page, deadline)
+    if marker == 'meta':
+        marker = await wait_for_profile_ready(page, deadline, markers=('followers', 'sorry')) or 'meta'
+    return marker
+
+# ====================== PLAYWRIGHT: CONTROL DE RITMO ======================
+def is_login_url(url):
+    return '/accounts/login' in url or '/challenge' in url
+
+def navigation_signal(page, response):
+    """Clasifica un goto: 'throttled' (HTTP 429), 'login' (redirige al login/challenge) u 'ok'"""
+    if response is not None and response.status == 429:
+        return 'throttled'
+    if is_login_url(page.url):
+        return 'login'
+    return 'ok'
+
+class RateController:
+    """
+    Ritmo global de FASE 2 compartido por todos los workers del proceso:
+     - token bucket: como mucho `rate` perfiles/s (ráfagas de RATE_BURST)
+     - AIMD de concurrencia: como mucho `concurrency` perfiles en vuelo
+    Cada perfil aporta una señal (ok, sorry, error, slow, throttled, login).
+    Un 429 o una redirección al login reducen ritmo y concurrencia a la mitad de
+    inmediato; sorry/error/goto lento lo hacen si superan RATE_BAD_FRACTION de una
+    ventana de RATE_WINDOW perfiles. Una ventana limpia suma RATE_STEP y +1 worker.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self, max_concurrency=MAX_CONCURRENT_WORKERS):
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = max(1, min(RATE_INITIAL_CONCURRENCY, self.max_concurrency))
+        self.rate = min(max(RATE_INITIAL, RATE_MIN), RATE_MAX)
+        self.peak_concurrency = self.concurrency
+        self.peak_rate = self.rate
+        self.active = 0
+        self.tokens = 1.0
+        self._last_refill = None
+        self._cond = None
+        self.window = Counter()
+        self.latency_ewma = None
+        self.latency_floor = None
+        self.latency_samples = 0
+        self.last_backoff = 0.0
+        self.backoffs = Counter()
+        self.increases = 0
+        self.observed = 0
+
+    def _condition(self):
+        # Se crea en el loop que lo usa (cada asyncio.run tiene el suyo)
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    @asynccontextmanager
+    async def slot(self):
+        """Espera a tener hueco de concurrencia y un token antes de visitar un perfil"""
+        if not RATE_LIMIT_ENABLED:
+            yield
+            return
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self.active < self.concurrency)
+            self.active += 1
+        try:
+            await self._take_token()
+            yield
+        finally:
+            async with cond:
+                self.active -= 1
+                cond.notify_all()
+
+    async def _take_token(self):
+        while True:
+            now = perf_counter()
+            if self._last_refill is not None:
+                self.tokens = min(RATE_BURST, self.tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def observe(self, signal, goto_seconds=None):
+        """Registra la señal de un perfil (y la latencia de su goto) y ajusta el ritmo"""
+        if not RATE_LIMIT_ENABLED:
+            return
+        self.observed += 1
+        if goto_seconds is not None:
+            self.latency_samples += 1
+            self.latency_ewma = goto_seconds if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * goto_seconds
+            if self.latency_samples >= RATE_WINDOW // 2:
+                self.latency_floor = min(self.latency_floor or self.latency_ewma, self.latency_ewma)
+                if signal == 'ok' and self.latency_ewma > self.latency_floor * RATE_LATENCY_FACTOR:
+                    signal = 'slow'
+        if signal in ('throttled', 'login'):
+            self._backoff(signal)
+            return
+        self.window[signal] += 1
+        total = sum(self.window.values())
+        if total < RATE_WINDOW:
+            return
+        bad = total - self.window['ok']
+        if bad / total > RATE_BAD_FRACTION:
+            cause = max((s for s in self.window if s != 'ok'), key=self.window.get)
+            self._backoff(cause)
+        elif bad == 0:
+            self._increase()
+        self.window.clear()
+
+    def _backoff(self, cause):
+        self.backoffs[cause] += 1
+        now = perf_counter()
+        if now - self.last_backoff < RATE_BACKOFF_COOLDOWN:
+            return  # Varias señales de la misma racha cuentan como un solo backoff
+        self.last_backoff = now
+        self.concurrency = max(1, self.concurrency // 2)
+        self.rate = max(RATE_MIN, self.rate / 2)
+        self.tokens = 0.0
+        self.window.clear()
+        logger.warning(f"🐢 Backoff por '{cause}': {self.concurrency} workers activos, {self.rate:.2f} perfiles/s")
+
+    def _increase(self):
+        self.increases += 1
+        self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+        self.rate = min(RATE_MAX, self.rate + RATE_STEP)
+        self.peak_concurrency = max(self.peak_concurrency, self.concurrency)
+        self.peak_rate = max(self.peak_rate, self.rate)
+        if self._cond is not None:
+            asyncio.ensure_future(self._notify())
+        logger.debug(f"🐇 Ritmo al alza: {self.concurrency} workers activos, {self.rate:.2f} perfiles/s")
+
+    async def _notify(self):
+        async with self._cond:
+            self._cond.notify_all()
+
+    def summary(self):
+        return {
+            'enabled': RATE_LIMIT_ENABLED,
+            'final_rate_per_s': round(self.rate, 3),
+            'peak_rate_per_s': round(self.peak_rate, 3),
+            'final_concurrency': self.concurrency,
+            'peak_concurrency': self.peak_concurrency,
+            'max_concurrency': self.max_concurrency,
+            'increases': self.increases,
+            'backoff_signals': dict(self.backoffs),
+            'goto_latency_ewma': round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+        }
+
+    def log_summary(self):
+        if not RATE_LIMIT_ENABLED or not self.observed:
+            return
+        causes = ', '.join(f"{k}={v}" for k, v in self.backoffs.items()) or 'ninguna'
+        logger.log(f"🚦 Ritmo final: {self.rate:.2f} perfiles/s con {self.concurrency}/{self.max_concurrency} workers "
+                   f"(pico {self.peak_rate:.2f}/s, {self.peak_concurrency} workers) | señales de backoff: {causes}")
+
+rate_controller = RateController()
+
+# ====================== PLAYWRIGHT: REINTENTOS Y DEAD-LETTER ======================
+# Tipos de fallo de un perfil: timeout, navigation, throttled (429) y login son
+# transitorios. 'sorry' (no existe/privado) y 'miss' (contador no encontrado: resultado
+# determinista del parseo) no se reintentan; 'miss' va directo al dead-letter para revisarlo
+PERMANENT_FAILURES = ('sorry', 'miss')
+DEAD_LETTER_FAILURES = ('miss',)
+
+def failure_from_signal(signal, default):
+    """Fallo de un perfil sin contador: la señal de navegación si fue anómala (429/login), si no default"""
+    return signal if signal in ('throttled', 'login') else default
+
+def failure_from_exception(exc):
+    return 'timeout' if isinstance(exc, (PlaywrightTimeoutError, asyncio.TimeoutError)) else 'navigation'
+
+class RetryScheduler:
+    """
+    Reintentos de fallos transitorios con backoff exponencial con jitter: el
+    reintento n espera entre d/2 y d, con d = min(max_delay, base_delay * 2^(n-1)).
+    Los reintentos vencidos quedan en `ready` y los workers los toman antes que la
+    cola principal. Agotados max_attempts, el usuario se anota en el dead-letter
+    (un usuario por línea, se puede volver a analizar con --usernames).
+    """
+    def __init__(self, dead_letter_path, max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+        self.dead_letter_path = dead_letter_path
+        self.max_attempts = max(0, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempts = Counter()  # usuario -> fallos transitorios
+        self.ready = asyncio.Queue()
+        self.scheduled = 0
+        self.in_flight = 0
+        self.recovered = 0
+        self.dead = Counter()      # tipo de fallo -> usuarios en el dead-letter
+
+    def delay(self, attempt):
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(cap / 2, cap)
+
+    def retry_or_dead_letter(self, username, failure):
+        """Programa un reintento; False si ya se agotaron (el usuario pasa al dead-letter)"""
+        self.attempts[username] += 1
+        attempt = self.attempts[username]
+        if attempt > self.max_attempts:
+            self._dead_letter(username, failure, attempt)
+            return False
+        delay = self.delay(attempt)
+        self.scheduled += 1
+        asyncio.get_running_loop().call_later(delay, self.ready.put_nowait, username)
+        if logger.debug_enabled:
+            logger.debug(f"  🔁 {username}: {failure}, reintento {attempt}/{self.max_attempts} en {delay:.1f}s",
+                         username=username, phase='retry')
+        return True
+
+    def take_ready(self):
+        """Reintento ya vencido o None (sin esperar)"""
+        try:
+            username = self.ready.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+        self.scheduled -= 1
+        self.in_flight += 1
+        return username
+
+    async def next(self):
+        """Espera al siguiente reintento; None cuando no queda ninguno programado ni en curso"""
+        while self.scheduled or self.in_flight:
+            username = self.take_ready()
+            if username is not None:
+                return username
+            await asyncio.sleep(RETRY_POLL_INTERVAL)
+        return None
+
+    def done(self):
+        self.in_flight -= 1
+
+    def record_success(self, username):
+        if username in self.attempts:
+            self.recovered += 1
+
+    def give_up(self, username, failure):
+        """Fallo permanente que merece revisión: al dead-letter sin reintentar"""
+        self._dead_letter(username, failure, self.attempts[username] + 1)
+
+    def _dead_letter(self, username, failure, attempts):
+        self.dead[failure] += 1
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            f.write(f"{username}  # {failure}, {attempts} intentos\n")
+        logger.warning(f"  ☠ {username}: {failure} tras {attempts} intentos -> dead-letter", username=username, phase='retry')
+
+    def log_summary(self):
+        if not self.attempts and not self.dead:
+            return
+        retries = sum(min(n, self.max_attempts) for n in self.attempts.values())
+        logger.log(f"🔁 Reintentos: {len(self.attempts)} perfiles con fallos transitorios, {retries} reintentos, "
+                   f"{self.recovered} recuperados")
+        if self.dead:
+            causes = ', '.join(f"{k}={v}" for k, v in self.dead.items())
+            logger.warning(f"☠ Dead-letter: {sum(self.dead.values())} perfiles ({causes}) -> {self.dead_letter_path}")
+
+# ====================== MOTOR HTTP DE PERFILES ======================
+BROWSER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+class HttpProfileFetcher:
+    """
+    Vía rápida de FASE 2 sin navegador: GET del perfil sobre un httpx.AsyncClient
+    compartido (conexiones keep-alive, HTTP/2 si está disponible) con las cookies
+    de la sesión, y extract_profile_from_html sobre la respuesta.
+    get_follower_count devuelve (username, seguidores|None, fallo) si el resultado es
+    definitivo (valor exacto, 404, 429 o redirección al login) o None para que el worker use Playwright.
+    """
+    def __init__(self, client):
+        self.client = client
+        self.stats = Counter()
+
+    async def get_follower_count(self, username, worker_id):
+        signal = None
+        goto_seconds = None
+        try:
+            goto_start = perf_counter()
+            with metrics.span('http_get'):
+                response = await self.client.get(f'{INSTAGRAM_URL}/{username}/')
+            goto_seconds = perf_counter() - goto_start
+
+            if response.status_code == 429:
+                signal = 'throttled'
+                self.stats['throttled'] += 1
+                return username, None, 'throttled'
+            if is_login_url(str(response.url)):
+                signal = 'login'
+                self.stats['login'] += 1
+                return username, None, 'login'
+            if response.status_code == 404:
+                signal = 'sorry'
+                self.stats['sorry'] += 1
+                logger.warning(f"  [Worker {worker_id}] ⚠ {username} no existe/privado", worker_id=worker_id, username=username, phase='profile')
+                return username, None, 'sorry'
+
+            with metrics.span('parse'):
+                html_info = extract_profile_from_html(response.text, username)
+            if html_info['num_followers'] is not None and html_info['exact']:
+                signal = 'ok'
+                self.stats['ok'] += 1
+                extraction_tiers[html_info['source']] += 1
+                logger.success(f"  [Worker {worker_id}] ✓ {username}: {html_info['num_followers']:,} (http {html_info['source']})", worker_id=worker_id, username=username, phase='profile')
+                return username, html_info['num_followers'], None
+        except Exception as e:
+            self.stats['error'] += 1
+            if logger.debug_enabled:
+                logger.debug(f"  [Worker {worker_id}] ✗ HTTP {username}: {e}", worker_id=worker_id, username=username, phase='profile')
+        finally:
+            # Si se pasa a Playwright, la señal de ritmo la aporta el navegador
+            if signal is not None:
+                rate_controller.observe(signal, goto_seconds)
+
+        self.stats['fallback'] += 1
+        return None
+
+    def log_summary(self):
+        total = sum(self.stats.values()) - self.stats['error']
+        if not total:
+            return
+        parts = [f"{key}={self.stats[key]}" for key in ('ok', 'sorry', 'throttled', 'login', 'fallback', 'error') if self.stats[key]]
+        logger.log(f"🌐 Motor HTTP: {', '.join(parts)} ({self.stats['fallback'] / total * 100:.0f}% a Playwright)")
+
+    async def close(self):
+        await self.client.aclose()
+
+async def open_http_fetcher(context, max_connections):
+    """
+    Crea el HttpProfileFetcher con las cookies del contexto de Playwright (las
+    exportadas por Selenium o por el login de Playwright). Devuelve None si httpx
+    no está instalado (dependencia opcional: pip install "httpx[http2]").
+    """
+    try:
+        import httpx
+    except ImportError:
+        logger.warning("⚠ PROFILE_ENGINE=http requiere httpx (pip install \"httpx[http2]\"); se usa Playwright")
+        return None
+
+    cookies = httpx.Cookies()
+    for cookie in await context.cookies():
+        cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+
+    http2 = HTTP_ENGINE_HTTP2
+    if http2:
+        if importlib.util.find_spec('h2') is None:
+            http2 = False
+            logger.debug("  HTTP/2 no disponible (falta h2); el motor HTTP usa HTTP/1.1 con keep-alive")
+
+    client = httpx.AsyncClient(
+        http2=http2,
+        cookies=cookies,
+        headers={'User-Agent': BROWSER_USER_AGENT, 'Accept': 'text/html,application/xhtml+xml', 'Accept-Language': 'en-US,en;q=0.9'},
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        timeout=HTTP_ENGINE_TIMEOUT,
+        follow_redirects=True,
+    )
+    logger.log(f"🌐 Motor HTTP activo ({'HTTP/2' if http2 else 'HTTP/1.1'}, {max_connections} conexiones); Playwright como respaldo")
+    return HttpProfileFetcher(client)
+
+# ====================== PLAYWRIGHT: ANÁLISIS PARALELO ======================
+async def get_follower_count_playwright(context, username, worker_id, page_pool=None):
+    """
+    Obtiene el número de seguidores de un usuario usando Playwright.
+    Con page_pool reutiliza una página ya preparada en lugar de crear una nueva.
+    Devuelve (username, seguidores|None, fallo): fallo es None si hubo éxito o el
+    tipo de fallo ('sorry', 'timeout', 'navigation', 'throttled', 'login', 'miss').
+    """
+    page = None
+    broken = False
+    signal = None
+    goto_seconds = None
+    try:
+        page = await acquire_profile_page(context, page_pool)
+        
+        url = f'{INSTAGRAM_URL}/{username}/'
+        goto_start = perf_counter()
+        with metrics.span('goto'):
+            response = await page.goto(url, wait_until='domcontentloaded', timeout=15000)
+        goto_seconds = perf_counter() - goto_start
+        signal = navigation_signal(page, response)
+        if signal in ('throttled', 'login'):
+            # Ni el 429 ni el login tienen contador: no esperar al plazo de carga del perfil
+            if logger.debug_enabled:
+                logger.debug(f"  [Worker {worker_id}] ✗ {username}: {signal}", worker_id=worker_id, username=username, phase='profile')
+            return username, None, failure_from_signal(signal, 'miss')
+        
+        # Vía rápida: JSON embebido / meta description del HTML crudo (valor exacto)
+        html_info = await parse_response_html(response, username)
+        if html_info['num_followers'] is not None and html_info['exact']:
+            extraction_tiers[html_info['source']] += 1
+            logger.success(f"  [Worker {worker_id}] ✓ {username}: {html_info['num_followers']:,} ({html_info['source']})", worker_id=worker_id, username=username, phase='profile')
+            return username, html_info['num_followers'], None
+        
+        # Esperar solo hasta que aparezca alguna señal del perfil
+        marker = await wait_for_profile_content(page)
+        
+        # Verificar si existe
+        try:
+            error = marker == 'sorry' or await page.query_selector("h2:has-text('Sorry')")
+            if error:
+                signal = 'sorry'
+                logger.warning(f"  [Worker {worker_id}] ⚠ {username} no existe/privado", worker_id=worker_id, username=username, phase='profile')
+                return username, None, 'sorry'
+        except:
+            pass
+        
+        # Buscar número de seguidores (el span cubre también los aciertos con return)
+        selectors = [
+            f'a[href="/{username}/followers/"]',
+            'a[href*="/followers/"]',
+        ]
+        
+        with metrics.span('selector_resolution'):
+            for selector in selectors:
+                try:
+                    element = await page.query_selector(selector)
+                    if element:
+                        text = await element.inner_text()
+                        count = parse_follower_count(text)
+                    
+                        if count is not None:
+                            extraction_tiers['selector'] += 1
+                            logger.success(f"  [Worker {worker_id}] ✓ {username}: {count:,}", worker_id=worker_id, username=username, phase='profile')
+                            return username, count, None
+                    
+                        # Intentar con title
+                        title = await element.get_attribute('title')
+                        if title:
+                            count = parse_follower_count(title)
+                            if count is not None:
+                                extraction_tiers['selector'] += 1
+                                logger.success(f"  [Worker {worker_id}] ✓ {username}: {count:,}", worker_id=worker_id, username=username, phase='profile')
+                                return username, count, None
+                except:
+                    continue
+        
+        # Valor abreviado de la meta description (ej. 1.2M) antes del texto completo
+        if html_info['num_followers'] is not None:
+            extraction_tiers['meta_approx'] += 1
+            logger.success(f"  [Worker {worker_id}] ✓ {username}: {html_info['num_followers']:,} (meta aprox.)", worker_id=worker_id, username=username, phase='profile')
+            return username, html_info['num_followers'], None
+        
+        # Método alternativo: buscar en todo el texto
+        try:
+            with metrics.span('body_text_fallback'):
+                body_text = await page.inner_text('body')
+            if FOLLOWER_WORD_RE.search(body_text):
+                lines = body_text.split('\n')
+                for line in lines:
+                    if FOLLOWER_WORD_RE.search(line):
+                        count = parse_follower_count(line)
+                        if count is not None:
+                            extraction_tiers['body'] += 1
+                            logger.success(f"  [Worker {worker_id}] ✓ {username}: {count:,} (alt)", worker_id=worker_id, username=username, phase='profile')
+                            return username, count, None
+        except:
+            pass
+        
+        extraction_tiers['miss'] += 1
+        logger.warning(f"  [Worker {worker_id}] ⚠ No se pudo obtener de {username}", worker_id=worker_id, username=username, phase='profile')
+        return username, None, failure_from_signal(signal, 'miss')
+        
+    except Exception as e:
+        broken = True
+        signal = 'error'
+        if logger.debug_enabled:
+            logger.debug(f"  [Worker {worker_id}] ✗ Error en {username}: {str(e)}", worker_id=worker_id, username=username, phase='profile')
+        return username, None, failure_from_exception(e)
+    finally:
+        if signal is not None:
+            rate_controller.observe(signal, goto_seconds)
+        if page:
+            await release_profile_page(page, page_pool, broken=broken)
+
+# -------------------------
+# Nuevo: obtener info de perfil (para PAGE_TYPE == 'following')
+# -------------------------
+async def get_profile_info_playwright(context, username, worker_id, page_pool=None):
+    """
+    Extrae: name, username, bio (description), account_type (categoria), num_followers (si está).
+    Devuelve: (username, details_dict, fallo) donde details_dict = {
+        'name': str|None,
+        'username': username,
+        'bio': str|None,
+        'account_type': str|None,
+        'num_followers': int|None
+    }
+    y fallo es None o el tipo de fallo (como en get_follower_count_playwright)
+    """
+    page = None
+    broken = False
+    signal = None
+    goto_seconds = None
+    try:
+        page = await acquire_profile_page(context, page_pool)
+
+        url = f'{INSTAGRAM_URL}/{username}/'
+        goto_start = perf_counter()
+        with metrics.span('goto'):
+            response = await page.goto(url, wait_until='domcontentloaded', timeout=15000)
+        goto_seconds = perf_counter() - goto_start
+        signal = navigation_signal(page, response)
+        if signal in ('throttled', 'login'):
+            if logger.debug_enabled:
+                logger.debug(f"  [Worker {worker_id}] ✗ {username}: {signal}", worker_id=worker_id, username=username, phase='profile')
+            return username, {
+                'name': None,
+                'username': username,
+                'bio': None,
+                'account_type': None,
+                'num_followers': None
+            }, failure_from_signal(signal, 'miss')
+        # Vía rápida sobre el HTML crudo (seguidores y meta description)
+        html_info = await parse_response_html(response, username)
+        marker = await wait_for_profile_content(page)
+
+        # Si la cuenta no existe o es privada detectada por texto tipo 'Sorry'
+        try:
+            err = marker == 'sorry' or await page.query_selector("h2:has-text('Sorry')")
+            if err:
+                signal = 'sorry'
+                logger.warning(f"  [Worker {worker_id}] ⚠ {username} no existe/privado", worker_id=worker_id, username=username, phase='profile')
+                return username, {
+                    'name': None,
+                    'username': username,
+                    'bio': None,
+                    'account_type': None,
+                    'num_followers': None
+                }, 'sorry'
+        except:
+            pass
+
+        async def try_selectors_text(selectors):
+            for s in selectors:
+                try:
+                    el = await page.query_selector(s)
+                    if el:
+                        txt = (await el.inner_text()).strip()
                         if txt:
                             return txt
                 except:
                     continue
             return None
 
-        # Intentar extraer name (varios selectores por si cambia el DOM)
-        name_selectors = [
-            "header h1", "header section h1", "main header h1", "h1"
-        ]
-        name = await try_selectors_text(name_selectors)
-
-        # Intentar extraer bio/description (multi-fallback)
-        bio_selectors = [
-            "div.-vDIg > span",                 # antiguo
-            "section div:nth-of-type(2) span",  # fallback
-            "div[data-testid='user-bio']",      # posible selector semántico
-            "main section div span",            # genérico
-            "header + div span"                 # alternativa
-        ]
-        bio = await try_selectors_text(bio_selectors)
+        with metrics.span('selector_resolution'):
+            # Intentar extraer name (varios selectores por si cambia el DOM)
+            name_selectors = [
+                "header h1", "header section h1", "main header h1", "h1"
+            ]
+            name = await try_selectors_text(name_selectors)
 
-        # Intentar extraer account_type / category (empresas, noticias, artista...)
-        acct_selectors = [
-            "header section div a[role='link']",    # a veces es link
-            "header section div span",              # fallback
-            "div._aa_c span"                        # fallback genérico
-        ]
-        account_type = await try_selectors_text(acct_selectors)
+            # Intentar extraer bio/description (multi-fallback)
+            bio_selectors = [
+                "div.-vDIg > span",                 # antiguo
+                "section div:nth-of-type(2) span",  # fallback
+                "div[data-testid='user-bio']",      # posible selector semántico
+                "main section div span",            # genérico
+                "header + div span"                 # alternativa
+            ]
+            bio = await try_selectors_text(bio_selectors)
+
+            # Intentar extraer account_type / category (empresas, noticias, artista...)
+            acct_selectors = [
+                "header section div a[role='link']",    # a veces es link
+                "header section div span",              # fallback
+                "div._aa_c span"                        # fallback genérico
+            ]
+            account_type = await try_selectors_text(acct_selectors)
 
         # Como fallback adicional, intentar leer meta description (puede contener texto util)
         if not bio or not name or not account_type:
             try:
-                meta_desc = await page.locator('meta[name="description"]').get_attribute('content')
+                meta_desc = html_info['meta_description'] or await page.locator('meta[name="description"]').get_attribute('content')
                 if meta_desc:
                     meta_desc = meta_desc.strip()
                     # meta suele contener: "Nombre (@username) • X posts • Y followers • Z following"
@@ -617,11 +2370,17 @@ async def get_profile_info_playwright(context, username, worker_id):
             except:
                 pass
 
-        # Intentar extraer número de followers usando las mismas técnicas que ya tienes
+        # Intentar extraer número de followers: primero el valor exacto del HTML crudo
         followers_count = None
+        tier = 'miss'
+        if html_info['num_followers'] is not None and html_info['exact']:
+            followers_count = html_info['num_followers']
+            tier = html_info['source']
         try:
             # Reusar la búsqueda por selectores que ya conocemos
             for sel in [f'a[href="/{username}/followers/"]', 'a[href*="/followers/"]']:
+                if followers_count is not None:
+                    break
                 try:
                     elt = await page.query_selector(sel)
                     if elt:
@@ -629,28 +2388,38 @@ async def get_profile_info_playwright(context, username, worker_id):
                         cnt = parse_follower_count(text)
                         if cnt is not None:
                             followers_count = cnt
+                            tier = 'selector'
                             break
                         title = await elt.get_attribute('title')
                         if title:
                             cnt = parse_follower_count(title)
                             if cnt is not None:
                                 followers_count = cnt
+                                tier = 'selector'
                                 break
                 except:
                     continue
 
+            # valor abreviado de la meta description
+            if followers_count is None and html_info['num_followers'] is not None:
+                followers_count = html_info['num_followers']
+                tier = 'meta_approx'
+
             # fallback: buscar en todo el texto del body
             if followers_count is None:
-                body_text = await page.inner_text('body')
-                if 'followers' in body_text.lower():
+                with metrics.span('body_text_fallback'):
+                    body_text = await page.inner_text('body')
+                if FOLLOWER_WORD_RE.search(body_text):
                     for line in body_text.split('\n'):
-                        if 'follower' in line.lower():
+                        if FOLLOWER_WORD_RE.search(line):
                             cnt = parse_follower_count(line)
                             if cnt is not None:
                                 followers_count = cnt
+                                tier = 'body'
                                 break
         except:
             pass
+        extraction_tiers[tier] += 1
 
         details = {
             'name': name,
@@ -660,48 +2429,298 @@ async def get_profile_info_playwright(context, username, worker_id):
             'num_followers': followers_count
         }
 
-        logger.success(f"  [Worker {worker_id}] ✓ {username} info: name={'OK' if name else 'N/A'}, bio={'OK' if bio else 'N/A'}, type={'OK' if account_type else 'N/A'}, followers={followers_count if followers_count is not None else 'N/A'}")
-        return username, details
+        logger.success(f"  [Worker {worker_id}] ✓ {username} info: name={'OK' if name else 'N/A'}, bio={'OK' if bio else 'N/A'}, type={'OK' if account_type else 'N/A'}, followers={followers_count if followers_count is not None else 'N/A'}", worker_id=worker_id, username=username, phase='profile')
+        return username, details, None if followers_count is not None else failure_from_signal(signal, 'miss')
 
     except Exception as e:
-        logger.debug(f"  [Worker {worker_id}] ✗ Error en profile {username}: {str(e)}")
+        broken = True
+        signal = 'error'
+        if logger.debug_enabled:
+            logger.debug(f"  [Worker {worker_id}] ✗ Error en profile {username}: {str(e)}", worker_id=worker_id, username=username, phase='profile')
         return username, {
             'name': None,
             'username': username,
             'bio': None,
             'account_type': None,
             'num_followers': None
-        }
+        }, failure_from_exception(e)
     finally:
+        if signal is not None:
+            rate_controller.observe(signal, goto_seconds)
         if page:
-            await page.close()
-
-async def process_batch(context, batch, worker_id, semaphore):
-    """Procesa un lote de usuarios con un worker. Si page == 'following' extrae perfil completo."""
-    async with semaphore:
-        results = []
-        for username in batch:
-            if page == 'following':
-                result = await get_profile_info_playwright(context, username, worker_id)
+            await release_profile_page(page, page_pool, broken=broken)
+
+async def process_batch(context, queue, worker_id, worker_stats, page_pool=None, profile_cache=None, on_result=None, retries=None,
+                        http_fetcher=None):
+    """
+    Worker de larga vida: toma usuarios de la cola compartida uno a uno (work-stealing)
+    hasta recibir el centinela None. Si page == 'following' extrae perfil completo.
+    Un perfil lento solo retrasa a su worker; el resto sigue vaciando la cola.
+    Los aciertos de profile_cache se sirven sin abrir página.
+    on_result se invoca con cada (username, valor) en cuanto está disponible; en ese
+    caso los resultados no se acumulan en memoria.
+    Con retries, los fallos transitorios se reprograman en lugar de emitirse y los
+    reintentos vencidos tienen prioridad sobre la cola (se miran al menos cada
+    RETRY_POLL_INTERVAL aunque la cola esté vacía); tras el centinela el worker
+    sigue atendiendo reintentos hasta que no quede ninguno.
+    Con http_fetcher los conteos de seguidores se intentan primero sin navegador.
+    """
+    stats = worker_stats.setdefault(worker_id, {'processed': 0, 'cached': 0, 'busy': 0.0, 'wall': 0.0})
+    started = perf_counter()
+    results = []
+
+    async def deliver(username, value):
+        if on_result:
+            await emit_result(on_result, username, value)
+        else:
+            results.append((username, value))
+
+    async def handle(username):
+        # Acierto de caché: no se abre página ni se espera
+        cached = lookup_cache(profile_cache, username)
+        if cached is not None and (page != 'following' or 'bio' in cached):
+            value = cached if page == 'following' else cached.get('num_followers')
+            await deliver(username, value)
+            stats['cached'] += 1
+            if logger.debug_enabled:
+                logger.debug(f"  [Worker {worker_id}] ↺ {username} desde caché", worker_id=worker_id, username=username, phase='profile')
+            logger.event('profile', worker_id=worker_id, username=username, latency=0.0, cached=True, ok=value is not None)
+            return
+
+        # El controlador de ritmo decide cuándo (y cuántos a la vez) se visitan perfiles
+        async with rate_controller.slot():
+            t0 = perf_counter()
+            fetched = None
+            if http_fetcher is not None and page != 'following':
+                fetched = await http_fetcher.get_follower_count(username, worker_id)
+            if fetched is not None:
+                _, value, failure = fetched
+            elif page == 'following':
+                _, value, failure = await get_profile_info_playwright(context, username, worker_id, page_pool)
             else:
-                result = await get_follower_count_playwright(context, username, worker_id)
-            results.append(result)
-            # Pequeña pausa entre perfiles del mismo worker
-            await asyncio.sleep(random.uniform(0.5, 1.5))
-        return results
-    """Procesa un lote de usuarios con un worker"""
-    async with semaphore:
-        results = []
-        for username in batch:
-            result = await get_follower_count_playwright(context, username, worker_id)
-            results.append(result)
-            # Pequeña pausa entre perfiles del mismo worker
-            await asyncio.sleep(random.uniform(0.5, 1.5))
-        return results
-
-async def analyze_profiles_parallel(cookies_file, followers_list, max_workers):
-    """
-    Analiza perfiles en paralelo usando Playwright
+                _, value, failure = await get_follower_count_playwright(context, username, worker_id, page_pool)
+            fetch_seconds = perf_counter() - t0
+        metrics.observe('profile_total', fetch_seconds)
+        stats['busy'] += fetch_seconds
+        stats['processed'] += 1
+        logger.event('profile', worker_id=worker_id, username=username, latency=round(fetch_seconds, 3),
+                     cached=False, ok=failure is None, failure=failure)
+
+        if retries is not None:
+            if failure is None:
+                retries.record_success(username)
+            elif failure in PERMANENT_FAILURES:
+                if failure in DEAD_LETTER_FAILURES:
+                    retries.give_up(username, failure)
+            elif retries.retry_or_dead_letter(username, failure):
+                return  # Se emitirá cuando el reintento termine
+        await deliver(username, value)
+
+        if profile_cache is not None:
+            store_in_cache(profile_cache, (username, value), fetch_seconds)
+
+    async def handle_retry(username):
+        try:
+            await handle(username)
+        finally:
+            retries.done()
+
+    try:
+        while True:
+            retry = retries.take_ready() if retries is not None else None
+            if retry is not None:
+                await handle_retry(retry)
+                continue
+            if retries is None:
+                username = await queue.get()
+            else:
+                try:
+                    # Sin bloquear indefinidamente: en modo pipeline la cola puede estar
+                    # vacía mucho tiempo mientras vencen reintentos
+                    username = await asyncio.wait_for(queue.get(), timeout=RETRY_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    continue
+            try:
+                if username is None:
+                    # Cola agotada: atender los reintentos pendientes antes de terminar
+                    while retries is not None and (retry := await retries.next()) is not None:
+                        await handle_retry(retry)
+                    return results
+                await handle(username)
+            finally:
+                queue.task_done()
+    finally:
+        stats['wall'] = perf_counter() - started
+
+async def emit_result(on_result, username, value):
+    """Entrega un resultado al callback (síncrono o async) del consumidor"""
+    ret = on_result(username, value)
+    if asyncio.iscoroutine(ret):
+        await ret
+
+def lookup_cache(profile_cache, username):
+    """Consulta la caché; un error de SQLite (p. ej. database is locked) cuenta como fallo de caché"""
+    if profile_cache is None:
+        return None
+    try:
+        return profile_cache.get(username)
+    except Exception as e:
+        logger.debug(f"  ⚠ No se pudo leer {username} de la caché: {e}")
+        return None
+
+def store_in_cache(profile_cache, result, fetch_seconds):
+    """Guarda en caché solo los perfiles obtenidos con éxito"""
+    username, value = result
+    if isinstance(value, dict):
+        if value.get('num_followers') is None:
+            return
+        details = value
+    elif value is not None:
+        details = {'username': username, 'num_followers': value}
+    else:
+        return
+    try:
+        profile_cache.put(username, details, fetch_seconds)
+    except Exception as e:
+        logger.debug(f"  ⚠ No se pudo guardar {username} en caché: {e}")
+
+def log_worker_utilization(worker_stats):
+    """Muestra cuántos perfiles procesó cada worker y qué fracción de su tiempo estuvo ocupado"""
+    if not worker_stats:
+        return
+    logger.log("👷 Utilización por worker:")
+    total_busy = 0.0
+    total_wall = 0.0
+    for worker_id in sorted(worker_stats):
+        stats = worker_stats[worker_id]
+        utilization = stats['busy'] / stats['wall'] * 100 if stats['wall'] > 0 else 0.0
+        total_busy += stats['busy']
+        total_wall += stats['wall']
+        logger.log(f"   - Worker {worker_id:>2}: {stats['processed']:>5} perfiles (+{stats['cached']} caché) | ocupado {stats['busy']:.1f}s / {stats['wall']:.1f}s ({utilization:.0f}%)")
+    if total_wall > 0:
+        logger.log(f"   - Utilización media: {total_busy / total_wall * 100:.0f}%")
+
+def selenium_to_playwright_cookies(selenium_cookies):
+    """Convierte cookies exportadas por Selenium al formato de Playwright"""
+    playwright_cookies = []
+    for cookie in selenium_cookies:
+        playwright_cookie = {
+            'name': cookie['name'],
+            'value': cookie['value'],
+            'domain': cookie['domain'],
+            'path': cookie['path'],
+        }
+        if 'expiry' in cookie:
+            playwright_cookie['expires'] = cookie['expiry']
+        if 'secure' in cookie:
+            playwright_cookie['secure'] = cookie['secure']
+        if 'httpOnly' in cookie:
+            playwright_cookie['httpOnly'] = cookie['httpOnly']
+        
+        playwright_cookies.append(playwright_cookie)
+    return playwright_cookies
+
+async def launch_browser_context(p, selenium_cookies=None):
+    """Lanza Chromium y crea el contexto de análisis (con cookies de Selenium si las hay)"""
+    # Lanzar navegador
+    browser = await p.chromium.launch(
+        headless=True,  # Cambiar a False para ver el proceso
+        args=['--disable-blink-features=AutomationControlled']
+    )
+    
+    # Crear contexto con cookies
+    context = await browser.new_context(
+        user_agent=BROWSER_USER_AGENT,
+        viewport={'width': 1920, 'height': 1080}
+    )
+    
+    await install_resource_policy(context)
+    
+    # Añadir cookies de Selenium a Playwright
+    if selenium_cookies:
+        await context.add_cookies(selenium_to_playwright_cookies(selenium_cookies))
+        logger.success("✓ Cookies cargadas en Playwright")
+    
+    return browser, context
+
+async def run_profile_workers(context, followers_list, max_workers, use_page_pool=True, profile_cache=None, on_result=None,
+                              engine=PROFILE_ENGINE):
+    """
+    Encola los usuarios y lanza max_workers workers de larga vida que los consumen
+    de uno en uno. Devuelve (results, elapsed_seconds, worker_stats).
+    """
+    # Cola compartida: cada worker toma el siguiente usuario cuando termina el anterior
+    num_workers = max(1, min(max_workers, len(followers_list)))
+    queue = asyncio.Queue()
+    for username in followers_list:
+        queue.put_nowait(username)
+    for _ in range(num_workers):
+        queue.put_nowait(None)  # Centinela de fin para cada worker
+    
+    logger.log(f"📦 {len(followers_list)} usuarios en cola para {num_workers} workers")
+    logger.log(f"⏱  Tiempo estimado: ~{len(followers_list) * 2 / num_workers / 60:.1f} minutos")
+    
+    return await consume_profile_queue(context, queue, num_workers, use_page_pool, profile_cache, on_result, engine)
+
+async def consume_profile_queue(context, queue, num_workers, use_page_pool=True, profile_cache=None, on_result=None,
+                                engine=PROFILE_ENGINE):
+    """
+    Lanza num_workers workers de larga vida sobre una cola ya creada y espera a que
+    cada uno reciba su centinela None. La cola puede seguir llenándose mientras tanto
+    (modo pipeline). engine 'http' antepone el HttpProfileFetcher a Playwright.
+    Devuelve (results, elapsed_seconds, worker_stats).
+    """
+    page_pool = PagePool(context, num_workers) if use_page_pool else None
+    http_fetcher = await open_http_fetcher(context, num_workers) if engine == 'http' and page != 'following' else None
+    wait_stats.reset()
+    resource_stats.reset()
+    rate_controller.reset(num_workers)
+    extraction_tiers.clear()
+    retries = RetryScheduler(logger.dead_letter_file)
+    worker_stats = {}
+    results = []
+    
+    # Crear los workers de larga vida
+    tasks = [
+        process_batch(context, queue, worker_id, worker_stats, page_pool, profile_cache, on_result, retries, http_fetcher)
+        for worker_id in range(1, num_workers + 1)
+    ]
+    
+    # Ejecutar todos los workers en paralelo
+    start_time = datetime.datetime.now()
+    
+    try:
+        batch_results = await asyncio.gather(*tasks)
+    finally:
+        if page_pool is not None:
+            await page_pool.close()
+        if http_fetcher is not None:
+            await http_fetcher.close()
+    
+    end_time = datetime.datetime.now()
+    elapsed = (end_time - start_time).total_seconds()
+    
+    # Consolidar resultados
+    for batch_result in batch_results:
+        results.extend(batch_result)
+    
+    if page_pool is not None:
+        logger.log(f"📄 Pool de páginas: {page_pool.pages_created} creadas, {page_pool.pages_recycled} recicladas")
+    resource_stats.log_summary()
+    if http_fetcher is not None:
+        http_fetcher.log_summary()
+    wait_stats.log_summary()
+    log_extraction_tiers()
+    retries.log_summary()
+    
+    return results, elapsed, worker_stats
+
+async def analyze_profiles_parallel(cookies_file, followers_list, max_workers, profile_cache=None, on_result=None):
+    """
+    Analiza perfiles en paralelo usando Playwright.
+    Los usuarios se encolan en un asyncio.Queue y max_workers workers de larga vida
+    los consumen de uno en uno, de modo que el tiempo total depende del trabajo
+    total y no del lote más lento.
     """
     logger.log("="*80)
     logger.log(f"🚀 INICIANDO ANÁLISIS PARALELO CON {max_workers} WORKERS")
@@ -711,162 +2730,197 @@ async def analyze_profiles_parallel(cookies_file, followers_list, max_workers):
     with open(cookies_file, 'r') as f:
         selenium_cookies = json.load(f)
     
-    # Dividir la lista en lotes para cada worker
-    batch_size = len(followers_list) // max_workers
-    if batch_size == 0:
-        batch_size = 1
-    
-    batches = [followers_list[i:i+batch_size] for i in range(0, len(followers_list), batch_size)]
-    
-    logger.log(f"📦 {len(followers_list)} usuarios divididos en {len(batches)} lotes")
-    
-    results = []
-    
     async with async_playwright() as p:
-        # Lanzar navegador
-        browser = await p.chromium.launch(
-            headless=True,  # Cambiar a False para ver el proceso
-            args=['--disable-blink-features=AutomationControlled']
-        )
+        browser, context = await launch_browser_context(p, selenium_cookies)
         
-        # Crear contexto con cookies
-        context = await browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            viewport={'width': 1920, 'height': 1080}
+        results, elapsed, worker_stats = await run_profile_workers(
+            context, followers_list, max_workers, profile_cache=profile_cache, on_result=on_result
         )
         
-        # Añadir cookies de Selenium a Playwright
-        playwright_cookies = []
-        for cookie in selenium_cookies:
-            playwright_cookie = {
-                'name': cookie['name'],
-                'value': cookie['value'],
-                'domain': cookie['domain'],
-                'path': cookie['path'],
-            }
-            if 'expiry' in cookie:
-                playwright_cookie['expires'] = cookie['expiry']
-            if 'secure' in cookie:
-                playwright_cookie['secure'] = cookie['secure']
-            if 'httpOnly' in cookie:
-                playwright_cookie['httpOnly'] = cookie['httpOnly']
-            
-            playwright_cookies.append(playwright_cookie)
-        
-        await context.add_cookies(playwright_cookies)
-        logger.success("✓ Cookies cargadas en Playwright")
-        
-        # Semáforo para limitar concurrencia
-        semaphore = asyncio.Semaphore(max_workers)
-        
-        # Crear tareas para cada lote
-        tasks = []
-        for worker_id, batch in enumerate(batches, 1):
-            task = process_batch(context, batch, worker_id, semaphore)
-            tasks.append(task)
-        
-        # Ejecutar todas las tareas en paralelo
-        logger.log(f"⏱  Tiempo estimado: ~{len(followers_list) * 2 / max_workers / 60:.1f} minutos")
-        start_time = datetime.datetime.now()
-        
-        batch_results = await asyncio.gather(*tasks)
-        
-        end_time = datetime.datetime.now()
-        elapsed = (end_time - start_time).total_seconds()
-        
-        # Consolidar resultados
-        for batch_result in batch_results:
-            results.extend(batch_result)
-        
         await browser.close()
-        
-        logger.log("="*80)
-        logger.success(f"✅ ANÁLISIS PARALELO COMPLETADO")
-        logger.log(f"⏱  Tiempo real: {elapsed/60:.1f} minutos")
-        logger.log(f"🚀 Velocidad: {len(results)/(elapsed/60):.1f} perfiles/minuto")
-        logger.log("="*80)
+        log_analysis_summary(elapsed, worker_stats, profile_cache)
     
     return results
 
-# Análisis de Benford
-def benford_analysis(csv_path, save_fig=True, show_plot=True):
+def log_analysis_summary(elapsed, worker_stats, profile_cache=None):
+    logger.log("="*80)
+    logger.success("✅ ANÁLISIS PARALELO COMPLETADO")
+    logger.log(f"⏱  Tiempo real: {elapsed/60:.1f} minutos")
+    processed = sum(st['processed'] + st['cached'] for st in worker_stats.values())
+    logger.log(f"🚀 Velocidad: {processed/max(elapsed/60, 1e-9):.1f} perfiles/minuto")
+    log_worker_utilization(worker_stats)
+    rate_controller.log_summary()
+    if profile_cache is not None:
+        profile_cache.log_summary()
+    logger.log("="*80)
+
+# ====================== ANÁLISIS EN SHARDS (MULTIPROCESO) ======================
+def parse_shard_workers(spec, shards):
     """
-    Versión mejorada visualmente de Benford:
-    - Barras azules (Porcentaje real)
-    - Porcentajes en color negro
-    - Tabla debajo del gráfico
-    - Líneas comparativas con la Ley de Benford
+    Workers por shard a partir de SHARD_WORKERS / --shard-workers: "8" (igual en todos)
+    o "8,8,4" (uno por shard; el último se repite). Vacío reparte MAX_CONCURRENT_WORKERS.
     """
-    try:
-        df = pd.read_csv(csv_path, dtype=str)
-    except Exception as e:
-        logger.error(f"❌ No se pudo leer CSV para Benford: {e}")
-        return
+    values = [int(v) for v in str(spec or '').replace(' ', '').split(',') if v]
+    if not values:
+        return [max(1, math.ceil(MAX_CONCURRENT_WORKERS / shards))] * shards
+    values += [values[-1]] * (shards - len(values))
+    return [max(1, v) for v in values[:shards]]
 
-    # Normalizar nombres de columnas (soportar español/inglés)
-    col_first_digit = None
-    if 'Primer_Dígito' in df.columns:
-        col_first_digit = 'Primer_Dígito'
-    elif 'First_Digit' in df.columns:
-        col_first_digit = 'First_Digit'
-    elif 'Primer_Digito' in df.columns:
-        col_first_digit = 'Primer_Digito'
-    elif 'Primer Digito' in df.columns:
-        col_first_digit = 'Primer Digito'
-
-    if col_first_digit is None:
-        num_col = None
-        if 'Num_Followers' in df.columns:
-            num_col = 'Num_Followers'
-        elif 'NumFollowers' in df.columns:
-            num_col = 'NumFollowers'
-        elif 'Num Seguidores' in df.columns:
-            num_col = 'Num Seguidores'
-        if num_col is None:
-            logger.error("❌ CSV no contiene 'Primer_Dígito' ni 'Num_Followers'. No se puede aplicar Benford.")
-            return
+_rate_limits_base = None
 
-        def first_digit_from_value(v):
-            try:
-                s = str(v).strip()
-                s = re.sub(r'[^0-9]', '', s)
-                if not s:
-                    return None
-                s = s.lstrip('0')
-                return int(s[0]) if s else None
-            except:
-                return None
+def share_rate_limits(shards):
+    """
+    Aplica en este proceso 1/shards del ritmo global (RATE_INITIAL/MIN/MAX/STEP, ráfaga
+    y concurrencia inicial), para que la suma de los shards respete los límites
+    configurados. Idempotente: parte siempre de los valores originales.
+    """
+    global _rate_limits_base, RATE_INITIAL, RATE_MIN, RATE_MAX, RATE_STEP, RATE_BURST, RATE_INITIAL_CONCURRENCY
+    if _rate_limits_base is None:
+        _rate_limits_base = (RATE_INITIAL, RATE_MIN, RATE_MAX, RATE_STEP, RATE_BURST, RATE_INITIAL_CONCURRENCY)
+    initial, low, high, step, burst, concurrency = _rate_limits_base
+    shards = max(1, shards)
+    RATE_INITIAL, RATE_MIN, RATE_MAX, RATE_STEP = initial / shards, low / shards, high / shards, step / shards
+    RATE_BURST = max(1.0, burst / shards)
+    RATE_INITIAL_CONCURRENCY = max(1, math.ceil(concurrency / shards))
 
-        df['__first_digit__'] = df[num_col].apply(first_digit_from_value)
-        digits_series = df['__first_digit__'].dropna().astype(int).tolist()
-    else:
-        def normalize_digit(x):
+def shard_metrics_snapshot(profile_cache=None):
+    """Métricas del proceso del shard (y de su caché) para fusionarlas en el principal"""
+    return {
+        'metrics': metrics.snapshot(),
+        'extraction_tiers': dict(extraction_tiers),
+        'resources': resource_stats.snapshot(),
+        'rate_control': rate_controller.summary(),
+        'profile_cache': profile_cache.snapshot() if profile_cache is not None else None,
+    }
+
+def merge_shard_metrics(shard_id, snapshot, profile_cache=None):
+    metrics.merge(snapshot['metrics'])
+    extraction_tiers.update(snapshot['extraction_tiers'])
+    resource_stats.merge(snapshot['resources'])
+    shard_rate_control[str(shard_id)] = snapshot['rate_control']
+    if profile_cache is not None and snapshot.get('profile_cache'):
+        profile_cache.merge(snapshot['profile_cache'])
+
+def _profile_shard_job(shard_id, cookies_file, usernames, max_workers, results_queue, shards=1):
+    """
+    Proceso de un shard: su propio Chromium, contexto y event loop. Cada resultado
+    vuelve al proceso principal por results_queue en cuanto está disponible.
+    El ritmo global se reparte entre los shards (share_rate_limits).
+    Devuelve (shard_id, elapsed, worker_stats, métricas) (picklable).
+    """
+    share_rate_limits(shards)
+    metrics.reset()
+    extraction_tiers.clear()
+    profile_cache = open_profile_cache()  # Conexión SQLite propia del proceso
+
+    async def forward(username, value):
+        await asyncio.to_thread(results_queue.put, (username, value))
+
+    async def run():
+        with open(cookies_file, 'r') as f:
+            selenium_cookies = json.load(f)
+        async with async_playwright() as p:
+            browser, context = await launch_browser_context(p, selenium_cookies)
             try:
-                if pd.isna(x):
-                    return None
-                sx = str(x).strip()
-                sx = re.sub(r'[^0-9]', '', sx)
-                if sx == '':
-                    return None
-                d = int(sx[0])
-                if 1 <= d <= 9:
-                    return d
-                return None
-            except:
-                return None
+                return await run_profile_workers(context, usernames, max_workers,
+                                                 profile_cache=profile_cache, on_result=forward)
+            finally:
+                await browser.close()
+
+    try:
+        logger.log(f"🧩 Shard {shard_id} (pid {os.getpid()}): {len(usernames)} perfiles, {max_workers} workers")
+        _, elapsed, worker_stats = asyncio.run(run())
+        rate_controller.log_summary()
+        if profile_cache is not None:
+            profile_cache.log_summary()
+        return shard_id, elapsed, worker_stats, shard_metrics_snapshot(profile_cache)
+    finally:
+        if profile_cache is not None:
+            profile_cache.close()
+        logger.close()
 
-        digits_series = df[col_first_digit].apply(normalize_digit).dropna().astype(int).tolist()
+async def analyze_profiles_sharded(cookies_file, followers_list, shards, shard_workers=None, on_result=None, profile_cache=None):
+    """
+    Reparte followers_list (round-robin) entre shards procesos del SO, cada uno con
+    su propio navegador y contexto, y fusiona sus flujos de resultados en este loop:
+    on_result recibe cada (username, valor) según llega de cualquier shard. Las
+    métricas de cada shard se fusionan aquí para que export_metrics las incluya, y
+    los aciertos de la caché de cada shard se suman a profile_cache (la de este
+    proceso, que no consulta nada) para que el resumen los refleje.
+    Si un shard cae, sus perfiles sin resultado quedan pendientes en el diario (--resume).
+    """
+    shards = max(1, min(shards, len(followers_list)))
+    workers = parse_shard_workers(shard_workers, shards)
+    parts = [followers_list[i::shards] for i in range(shards)]
+    logger.log("="*80)
+    logger.log(f"🚀 ANÁLISIS EN {shards} SHARDS: workers por shard {workers}")
+    logger.log("="*80)
 
-    if not digits_series:
-        logger.error("❌ No se encontraron primeros dígitos válidos para analizar.")
-        return
+    loop = asyncio.get_running_loop()
+    results = []
+    worker_stats = {}
+    start = perf_counter()
+    with multiprocessing.Manager() as manager:
+        results_queue = manager.Queue(maxsize=RESULT_FLUSH_BATCH * 4)
+        with ProcessPoolExecutor(max_workers=shards) as pool:
+            jobs = [
+                loop.run_in_executor(pool, _profile_shard_job, shard_id, cookies_file, part, max_workers, results_queue, shards)
+                for shard_id, (part, max_workers) in enumerate(zip(parts, workers), 1)
+            ]
+            finished = asyncio.gather(*jobs, return_exceptions=True)
+            while True:
+                try:
+                    item = await asyncio.to_thread(results_queue.get, True, 0.5)
+                except queue_module.Empty:
+                    # Los shards encolan todo antes de terminar: cola vacía + todos terminados = fin
+                    if finished.done() and results_queue.empty():
+                        break
+                    continue
+                if on_result:
+                    await emit_result(on_result, *item)
+                else:
+                    results.append(item)
+            outcomes = await finished
+
+    for shard_id, outcome in enumerate(outcomes, 1):
+        if isinstance(outcome, BaseException):
+            logger.error(f"❌ Shard {shard_id} falló: {outcome}")
+            continue
+        _, elapsed, stats, snapshot = outcome
+        merge_shard_metrics(shard_id, snapshot, profile_cache)
+        logger.log(f"🧩 Shard {shard_id}: {len(parts[shard_id - 1])} perfiles en {elapsed/60:.1f} min")
+        for worker_id, values in stats.items():
+            worker_stats[f"{shard_id}.{worker_id}"] = values
+    log_analysis_summary(perf_counter() - start, worker_stats, profile_cache)
+    return results
+
+# ====================== ANÁLISIS DE BENFORD ======================
+# El cálculo (conteos y pruebas de conformidad) vive en benford.py; aquí solo se
+# registra, se grafica y se guarda el informe
+def compute_benford(csv_path, chunksize=None):
+    """read_benford_counts con los errores al log: devuelve BenfordResult o None"""
+    try:
+        return read_benford_counts(csv_path, chunksize=chunksize)
+    except BenfordError as e:
+        logger.error(f"❌ {e}")
+        return None
+
+def plot_benford(result, csv_path, save_fig=True, show_plot=True):
+    """
+    Versión mejorada visualmente de Benford:
+    - Barras azules (Porcentaje real)
+    - Porcentajes en color negro
+    - Tabla debajo del gráfico
+    - Líneas comparativas con la Ley de Benford
+    matplotlib se importa aquí: el cálculo no depende de él.
+    Devuelve la ruta del PNG guardado (o None).
+    """
+    import matplotlib.pyplot as plt
 
-    # Calcular frecuencias y porcentajes
-    total = len(digits_series)
-    frecuencias_reales = [digits_series.count(d) for d in range(1, 10)]
-    porcentajes_reales = [(f / total) * 100 for f in frecuencias_reales]
-    porcentajes_benford = [(math.log10(1 + 1/d)) * 100 for d in range(1, 10)]
-    digitos = np.arange(1, 10)
+    frecuencias_reales = [int(c) for c in result.counts]
+    porcentajes_reales = [float(v) * 100 for v in result.observed]
+    porcentajes_benford = [float(v) * 100 for v in BENFORD_EXPECTED]
+    digitos = BENFORD_DIGITS
 
     # --- Layout con gridspec: gráfico arriba, tabla abajo ---
     fig = plt.figure(figsize=(12, 9))
@@ -948,6 +3002,7 @@ def benford_analysis(csv_path, save_fig=True, show_plot=True):
 
     plt.tight_layout(rect=[0, 0, 1, 0.98])
 
+    fig_path = None
     if save_fig:
         try:
             logs_dir = os.path.dirname(csv_path) or "."
@@ -956,6 +3011,7 @@ def benford_analysis(csv_path, save_fig=True, show_plot=True):
             plt.savefig(fig_path, dpi=200, bbox_inches='tight')
             logger.success(f"📈 Gráfico Benford guardado: {fig_path}")
         except Exception as e:
+            fig_path = None
             logger.warning(f"⚠ No se pudo guardar figura: {e}")
 
     if show_plot:
@@ -965,173 +3021,1168 @@ def benford_analysis(csv_path, save_fig=True, show_plot=True):
             logger.warning(f"⚠ No se pudo mostrar la figura (entorno posiblemente headless): {e}")
 
     plt.close(fig)
+    return fig_path
 
-# ====================== GUARDAR RESULTADOS ======================
-def save_results(account_name, results_dict):
-    """
-    Guarda resultados detectando formato:
-     - valores int/None -> comportamiento original (Username, Username_Follower, Num_Followers, Primer_Dígito)
-     - valores dict -> nuevo formato con: Account, Username, Name, Bio, Account_Type, Num_Followers, Primer_Dígito
-    """
-    # Detectar si results_dict values son dict o ints
-    sample_val = next(iter(results_dict.values()), None)
-    writing_extended = isinstance(sample_val, dict)
-
-    # Preparar rows
-    if writing_extended:
-        # Preparar lista de filas con campos completos
-        rows = []
-        for username, info in results_dict.items():
-            # info es un dict
-            name = info.get('name') if isinstance(info, dict) else None
-            bio = info.get('bio') if isinstance(info, dict) else None
-            account_type = info.get('account_type') if isinstance(info, dict) else None
-            num_followers = info.get('num_followers') if isinstance(info, dict) else None
-            primer = str(num_followers)[0] if num_followers not in (None, 'None') and str(num_followers).isdigit() else "N/A"
-            rows.append([account_name, username, name or "", bio or "", account_type or "", num_followers if num_followers is not None else "", primer])
-        # CSV header extended
-        header = ['Account', 'Username', 'Name', 'Bio', 'Account_Type', 'Num_Followers', 'Primer_Dígito']
-
+def save_benford_report(result, csv_path, fig_path=None):
+    """Escribe el resultado y las pruebas en JSON junto al PNG (mismo nombre)"""
+    if fig_path:
+        json_path = os.path.splitext(fig_path)[0] + ".json"
     else:
-        # Formato original: username -> int or None
-        rows = []
-        for username, num_followers in results_dict.items():
-            primer = str(num_followers)[0] if num_followers not in (None, 'None') and str(num_followers).isdigit() else "N/A"
-            rows.append([username, account_name, num_followers if num_followers is not None else "", primer])
-        header = ['Username', 'Username_Follower', 'Num_Followers', 'Primer_Dígito']
-
-    # Escribir CSV
+        out_dir = os.path.dirname(csv_path) or "."
+        json_path = os.path.join(out_dir, f"benford_{os.path.splitext(os.path.basename(csv_path))[0]}_{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
     try:
-        with open(logger.csv_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(header)
-            writer.writerows(rows)
-        logger.success(f"📊 CSV generado correctamente: {logger.csv_file}")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(result.as_dict(), f, ensure_ascii=False, indent=2)
+        logger.success(f"🧾 Pruebas de Benford guardadas: {json_path}")
+        return json_path
     except Exception as e:
-        logger.error(f"Error al guardar CSV: {str(e)}")
+        logger.warning(f"⚠ No se pudo guardar el JSON de Benford: {e}")
+        return None
+
+def log_benford_conformity(tests):
+    if not tests:
         return
+    significant = [str(d) for d, z in tests['z_scores'].items() if z['significant']]
+    logger.log(f"📐 Benford: χ²={tests['chi_square']['statistic']:.2f} (p={tests['chi_square']['p_value']:.4f}) | "
+               f"MAD={tests['mad']['value']:.4f} ({tests['mad']['conformity']}) | "
+               f"KS={tests['ks']['statistic']:.4f} (crítico {tests['ks']['critical_5pct']:.4f}) | "
+               f"dígitos con Z significativa: {', '.join(significant) or 'ninguno'}")
+
+def benford_analysis(csv_path, save_fig=True, show_plot=True, chunksize=None, save_json=True):
+    """
+    Calcula Benford sobre el CSV, registra las pruebas de conformidad y, aparte,
+    dibuja el gráfico. El JSON con las pruebas se guarda junto al PNG.
+    Devuelve BenfordResult o None.
+    """
+    result = compute_benford(csv_path, chunksize=chunksize)
+    if result is None:
+        return None
+    log_benford_conformity(result.conformity())
+    fig_path = None
+    if save_fig or show_plot:
+        fig_path = plot_benford(result, csv_path, save_fig=save_fig, show_plot=show_plot)
+    if save_json:
+        save_benford_report(result, csv_path, fig_path)
+    return result
 
-    # Mantener TXT antiguo sin cambios (opcional: podrías añadir info_extended ahí si quieres)
+# ====================== BENFORD EN LOTE ======================
+def _benford_plot_job(csv_path, counts):
+    """Tarea del pool: dibuja y guarda PNG + JSON de un resultado ya calculado"""
+    import matplotlib
+    matplotlib.use('Agg')  # Sin ventana en procesos hijos
     try:
-        with open(logger.txt_file, 'w', encoding='utf-8') as f:
-            f.write(f"{'='*80}\n")
-            f.write(f"ANÁLISIS DE SEGUIDORES (HÍBRIDO) - {account_name}\n")
-            f.write(f"Fecha: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"{'='*80}\n\n")
-            if writing_extended:
-                f.write("Formato extendido (seguido -> perfil):\n")
-                for account_name_, username, name, bio, account_type, num_followers, primer in rows:
-                    f.write(f"{username: <25} | {name: <20} | {account_type or '':<15} | followers: {num_followers or 'N/A'} | 1er: {primer}\n")
-            else:
-                f.write(f"{'Cuenta':<20} | {'Follower':<25} | {'Num Seguidores':>15} | {'1er Dígito':>10}\n")
-                f.write(f"{'-'*20}-+-{'-'*25}-+-{'-'*15}-+-{'-'*10}\n")
-                for username, account_name_, num_followers, primer in rows:
-                    num_str = f"{num_followers:,}" if num_followers not in (None, '') else "N/A"
-                    f.write(f"{account_name_:<20} | {username:<25} | {num_str:>15} | {primer:>10}\n")
+        result = BenfordResult(source=csv_path, counts=np.asarray(counts, dtype=np.int64))
+        fig_path = plot_benford(result, csv_path, save_fig=True, show_plot=False)
+        save_benford_report(result, csv_path, fig_path)
+        return fig_path
+    finally:
+        # El proceso del pool puede terminar sin pasar por atexit: volcar sus líneas ya
+        logger.close()
 
-        logger.success(f"📄 TXT generado correctamente: {logger.txt_file}")
+def benford_batch(paths, max_workers=None, plots=False, chunksize=None, output=None):
+    """
+    Analiza muchos CSV de resultados en paralelo (ProcessPoolExecutor) y escribe
+    una tabla resumen consolidada. Los gráficos son opcionales y también se
+    generan en paralelo. Devuelve la lista de filas del resumen.
+    """
+    files = resolve_benford_inputs(paths)
+    if not files:
+        logger.error(f"❌ No se encontraron CSV ({BENFORD_BATCH_PATTERN}) en: {', '.join(paths)}")
+        return []
+    logger.log(f"📚 Benford en lote: {len(files)} archivos, {max_workers or os.cpu_count()} procesos")
+
+    rows = []
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(benford_summary_row, f, chunksize): f for f in files}
+        for future in as_completed(futures):
+            try:
+                row = future.result()
+            except Exception as e:
+                row = {'File': futures[future], 'Error': str(e)}
+            if row.get('Error'):
+                logger.warning(f"  ⚠ {os.path.basename(row['File'])}: {row['Error']}")
+            rows.append(row)
+
+        if plots:
+            plot_futures = [pool.submit(_benford_plot_job, r['File'], r['counts']) for r in rows if 'counts' in r]
+            for future in as_completed(plot_futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.warning(f"  ⚠ No se pudo generar un gráfico: {e}")
+
+    ok_rows = sorted((r for r in rows if 'counts' in r), key=lambda r: r['MAD'], reverse=True)
+    output = output or os.path.join(logger.logs_dir, f"benford_summary_{logger.timestamp}.csv")
+    try:
+        with open(output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=BENFORD_SUMMARY_HEADER, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(ok_rows)
+        logger.success(f"📊 Resumen de Benford: {output}")
     except Exception as e:
-        logger.error(f"Error al guardar TXT: {str(e)}")
+        logger.error(f"Error al guardar resumen de Benford: {e}")
+
+    logger.log(f"{'Cuenta':<30} | {'N':>7} | {'MAD':>8} | {'Conformidad':<32} | {'p (χ²)':>8}")
+    logger.log(f"{'-'*30}-+-{'-'*7}-+-{'-'*8}-+-{'-'*32}-+-{'-'*8}")
+    for r in ok_rows:
+        logger.log(f"{r['Account'][:30]:<30} | {r['N']:>7} | {r['MAD']:>8.4f} | {r['MAD_Conformity']:<32} | {r['P_Value']:>8.4f}")
+    logger.log(f"⏱  {len(ok_rows)}/{len(files)} archivos analizados en {perf_counter() - start:.1f}s")
+    return ok_rows
+
+# ====================== GUARDAR RESULTADOS ======================
+CSV_HEADER_ORIGINAL = ['Username', 'Username_Follower', 'Num_Followers', 'Primer_Dígito']
+CSV_HEADER_EXTENDED = ['Account', 'Username', 'Name', 'Bio', 'Account_Type', 'Num_Followers', 'Primer_Dígito']
+
+def build_result_row(account_name, username, value, extended):
+    """
+    Fila CSV de un resultado:
+     - formato original (valor int/None): Username, Username_Follower, Num_Followers, Primer_Dígito
+     - formato extendido (valor dict): Account, Username, Name, Bio, Account_Type, Num_Followers, Primer_Dígito
+    """
+    if extended:
+        # info es un dict
+        name = value.get('name') if isinstance(value, dict) else None
+        bio = value.get('bio') if isinstance(value, dict) else None
+        account_type = value.get('account_type') if isinstance(value, dict) else None
+        num_followers = value.get('num_followers') if isinstance(value, dict) else None
+        primer = str(num_followers)[0] if num_followers not in (None, 'None') and str(num_followers).isdigit() else "N/A"
+        return [account_name, username, name or "", bio or "", account_type or "", num_followers if num_followers is not None else "", primer]
+
+    # Formato original: username -> int or None
+    num_followers = value
+    primer = str(num_followers)[0] if num_followers not in (None, 'None') and str(num_followers).isdigit() else "N/A"
+    return [username, account_name, num_followers if num_followers is not None else "", primer]
 
-    # --- Ahora que el CSV está escrito, ejecutar Benford (si aplica) ---
+def write_txt_header(f, account_name, extended):
+    f.write(f"{'='*80}\n")
+    f.write(f"ANÁLISIS DE SEGUIDORES (HÍBRIDO) - {account_name}\n")
+    f.write(f"Fecha: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    f.write(f"{'='*80}\n\n")
+    if extended:
+        f.write("Formato extendido (seguido -> perfil):\n")
+    else:
+        f.write(f"{'Cuenta':<20} | {'Follower':<25} | {'Num Seguidores':>15} | {'1er Dígito':>10}\n")
+        f.write(f"{'-'*20}-+-{'-'*25}-+-{'-'*15}-+-{'-'*10}\n")
+
+def format_txt_row(row, extended):
+    if extended:
+        account_name_, username, name, bio, account_type, num_followers, primer = row
+        return f"{username: <25} | {name: <20} | {account_type or '':<15} | followers: {num_followers or 'N/A'} | 1er: {primer}\n"
+    username, account_name_, num_followers, primer = row
+    num_str = f"{num_followers:,}" if num_followers not in (None, '') else "N/A"
+    return f"{account_name_:<20} | {username:<25} | {num_str:>15} | {primer:>10}\n"
+
+def run_benford_on_csv(csv_path, show_plot=True):
+    """Ejecuta Benford sobre el CSV ya escrito (si existe)"""
     try:
-        if os.path.exists(logger.csv_file):
+        if os.path.exists(csv_path):
             logger.log("🔎 Ejecutando análisis de Benford sobre el CSV generado...")
-            benford_analysis(logger.csv_file, save_fig=True, show_plot=True)
+            benford_analysis(csv_path, save_fig=True, show_plot=show_plot)
         else:
-            logger.error(f"❌ CSV no encontrado para Benford: {logger.csv_file}")
+            logger.error(f"❌ CSV no encontrado para Benford: {csv_path}")
     except Exception as e:
         logger.error(f"❌ Error ejecutando Benford: {e}")
 
+class ResultStreamWriter:
+    """
+    Etapa de escritura en streaming: los workers encolan (username, valor) y una
+    tarea escribe el CSV y el TXT por lotes de batch_size filas. La cola está
+    acotada, así que la memoria no crece con el tamaño de la audiencia (los
+    workers esperan si el disco va más lento). Si la tarea de escritura muere, put()
+    y close() relanzan su excepción en lugar de esperar para siempre a la cola llena.
+    """
+    def __init__(self, account_name, extended, csv_path, txt_path, batch_size=RESULT_FLUSH_BATCH):
+        self.account_name = account_name
+        self.extended = extended
+        self.csv_path = csv_path
+        self.txt_path = txt_path
+        self.batch_size = max(1, batch_size)
+        self.queue = asyncio.Queue(maxsize=self.batch_size * 4)
+        self.total = 0
+        self.successful = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def put(self, username, value):
+        await self._enqueue((username, value))
+
+    async def close(self):
+        """Envía el centinela y espera a que se vacíe la cola y se cierren los archivos"""
+        if self._task is None:
+            return
+        try:
+            if not self._task.done():
+                await self._enqueue(None)
+            await self._task
+        finally:
+            self._task = None
+
+    async def _enqueue(self, item):
+        """queue.put que también vuelve si la tarea de escritura termina (relanzando su error)"""
+        self._raise_if_dead()
+        if not self.queue.full():
+            self.queue.put_nowait(item)
+            return
+        putter = asyncio.ensure_future(self.queue.put(item))
+        try:
+            done, _ = await asyncio.wait({putter, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not putter.done():
+                putter.cancel()
+        if putter in done:
+            return
+        self._raise_if_dead()
+
+    def _raise_if_dead(self):
+        if self._task is not None and self._task.done():
+            self._task.result()  # Relanza la excepción (o CancelledError) de _run
+            raise RuntimeError(f"El escritor de resultados de {self.account_name} terminó antes de tiempo")
+
+    def _write_batch(self, csv_writer, csv_f, txt_f, rows):
+        with metrics.span('csv_write'):
+            csv_writer.writerows(rows)
+            for row in rows:
+                txt_f.write(format_txt_row(row, self.extended))
+            csv_f.flush()
+            txt_f.flush()
+
+    async def _run(self):
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as csv_f, \
+             open(self.txt_path, 'w', encoding='utf-8') as txt_f:
+            csv_writer = csv.writer(csv_f)
+            csv_writer.writerow(CSV_HEADER_EXTENDED if self.extended else CSV_HEADER_ORIGINAL)
+            write_txt_header(txt_f, self.account_name, self.extended)
+            csv_f.flush()
+
+            rows = []
+            while True:
+                item = await self.queue.get()
+                if item is None:
+                    break
+                username, value = item
+                self.total += 1
+                if value is not None:
+                    self.successful += 1
+                rows.append(build_result_row(self.account_name, username, value, self.extended))
+                if len(rows) >= self.batch_size:
+                    self._write_batch(csv_writer, csv_f, txt_f, rows)
+                    rows = []
+            if rows:
+                self._write_batch(csv_writer, csv_f, txt_f, rows)
+
+async def start_result_stream(journal):
+    """
+    Arranca el escritor en streaming, le pasa los resultados recuperados del diario
+    y devuelve (writer, on_result) para los workers.
+    """
+    writer = ResultStreamWriter(account, page == 'following', logger.csv_file, logger.txt_file).start()
+    for username, value in journal.iter_results():
+        await writer.put(username, value)
+
+    async def on_result(username, value):
+        journal.record_result(username, value)
+        await writer.put(username, value)
+
+    return writer, on_result
+
+async def analyze_and_stream(cookies_file, pending, journal, profile_cache=None, shards=1, shard_workers=None, queue_url=None):
+    """
+    FASE 2 + escritura en streaming: los resultados previos del diario y los nuevos
+    de los workers pasan por el mismo escritor, sin acumularse en memoria.
+    Con shards > 1 los perfiles se reparten entre varios procesos (cada uno con su
+    caché abierta por separado); con queue_url se publican en la cola distribuida
+    y este proceso solo coordina.
+    """
+    writer, on_result = await start_result_stream(journal)
+    try:
+        if pending and queue_url:
+            job_queue = open_job_queue(queue_url)
+            try:
+                await analyze_profiles_distributed(cookies_file, pending, job_queue, journal.run_id, queue_url, on_result)
+            finally:
+                job_queue.close()
+        elif pending and shards > 1:
+            await analyze_profiles_sharded(cookies_file, pending, shards, shard_workers, on_result=on_result,
+                                           profile_cache=profile_cache)
+        elif pending:
+            await analyze_profiles_parallel(cookies_file, pending, MAX_CONCURRENT_WORKERS, profile_cache,
+                                            on_result=on_result)
+    finally:
+        await writer.close()
+    return writer
+
+async def pipeline_profile_workers(context, journal, produce, profile_cache=None, on_result=None):
+    """
+    FASE 1 y FASE 2 solapadas: produce(enqueue) extrae la lista y llama a enqueue
+    (en el loop) con cada usuario nuevo, que entra en la cola compartida en cuanto
+    aparece. Los workers analizan perfiles mientras la lista aún se está cargando,
+    así que el tiempo total tiende a max(scroll, análisis) en lugar de su suma.
+    Devuelve la lista de usuarios extraída.
+    """
+    queue = asyncio.Queue()
+    num_workers = max(1, MAX_CONCURRENT_WORKERS)
+
+    # Al reanudar, lo ya extraído y sin resultado entra primero en la cola
+    for username in journal.pending():
+        queue.put_nowait(username)
+
+    def enqueue(username):
+        journal.record_follower(username)
+        queue.put_nowait(username)
+
+    workers = asyncio.create_task(
+        consume_profile_queue(context, queue, num_workers, profile_cache=profile_cache, on_result=on_result)
+    )
+    logger.log(f"🔀 Pipeline: {num_workers} workers consumen usuarios mientras se hace scroll del modal")
+    followers_list = []
+    try:
+        followers_list = await produce(enqueue)
+    finally:
+        # Fin de la producción: un centinela por worker detrás de lo ya encolado
+        for _ in range(num_workers):
+            queue.put_nowait(None)
+        _, elapsed, worker_stats = await workers
+
+    if followers_list:
+        journal.record_followers_done()
+    log_analysis_summary(elapsed, worker_stats, profile_cache)
+    return followers_list
+
+async def analyze_and_stream_pipelined(driver, cookies_file, journal, profile_cache=None):
+    """
+    Pipeline con Selenium: el scroll del modal corre en un hilo y cada usuario se
+    pasa al loop con call_soon_threadsafe (el diario solo se escribe desde el loop).
+    Devuelve (writer, followers_list).
+    """
+    loop = asyncio.get_running_loop()
+
+    def produce(enqueue):
+        return asyncio.to_thread(
+            extract_followers_list_selenium, driver, account, page, count,
+            list(journal.followers), lambda username: loop.call_soon_threadsafe(enqueue, username)
+        )
+
+    writer, on_result = await start_result_stream(journal)
+    try:
+        with open(cookies_file, 'r') as f:
+            selenium_cookies = json.load(f)
+
+        async with async_playwright() as p:
+            browser, context = await launch_browser_context(p, selenium_cookies)
+            try:
+                followers_list = await pipeline_profile_workers(context, journal, produce, profile_cache, on_result)
+            finally:
+                await browser.close()
+    finally:
+        await writer.close()
+    return writer, followers_list
+
+async def analyze_and_stream_playwright(journal, profile_cache=None, pipeline=False, session_store=None, usernames=None):
+    """
+    Motor Playwright completo: login, extracción del modal y análisis de perfiles
+    en un único navegador y contexto (sin Selenium ni traspaso de cookies entre
+    navegadores). Las cookies se exportan igualmente para poder usar --resume.
+    Con usernames (--usernames) se analiza esa lista en lugar de recorrer el modal.
+    Devuelve (writer, followers_list); writer es None si el login falla.
+    """
+    async with async_playwright() as p:
+        browser, context = await launch_browser_context(p)
+        try:
+            login_page = await ensure_logged_in_context(context, session_store)
+            if login_page is None:
+                return None, []
+
+            cookies_file = logger.cookies_file
+            if await save_playwright_cookies(context, cookies_file):
+                journal.record_cookies(cookies_file)
+
+            writer, on_result = await start_result_stream(journal)
+            try:
+                if pipeline:
+                    def produce(enqueue):
+                        return extract_followers_list_playwright(
+                            login_page, account, page, count, list(journal.followers), enqueue
+                        )
+                    followers_list = await pipeline_profile_workers(context, journal, produce, profile_cache, on_result)
+                else:
+                    if usernames is not None:
+                        for username in usernames:
+                            journal.record_follower(username)
+                        followers_list = list(journal.followers)
+                    else:
+                        followers_list = await extract_followers_list_playwright(
+                            login_page, account, page, count,
+                            known_users=journal.followers, on_user=journal.record_follower
+                        )
+                    if followers_list:
+                        journal.record_followers_done()
+                        logger.success(f"✓ FASE 1 COMPLETADA: {len(followers_list)} usuarios extraídos")
+                        await login_page.close()
+                        _, elapsed, worker_stats = await run_profile_workers(
+                            context, journal.pending(), MAX_CONCURRENT_WORKERS,
+                            profile_cache=profile_cache, on_result=on_result
+                        )
+                        log_analysis_summary(elapsed, worker_stats, profile_cache)
+            finally:
+                await writer.close()
+            return writer, followers_list
+        finally:
+            await browser.close()
+
+# ====================== COLA DISTRIBUIDA (COORDINADOR / WORKERS) ======================
+class SQLiteJobQueue:
+    """
+    Cola de trabajos en SQLite para repartir FASE 2 entre varios nodos (archivo
+    compartido) o procesos locales. Cada usuario es un job por run_id que un worker
+    reclama con un lease; si el worker muere, el lease caduca y otro lo reclama.
+    Los resultados llevan un número de secuencia (done_seq) para que el
+    coordinador los lea en orden de llegada.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, meta TEXT NOT NULL, created_at REAL NOT NULL)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " run_id TEXT NOT NULL,"
+            " username TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"  # pending | leased | done
+            " owner TEXT,"
+            " lease_expires REAL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " result TEXT,"
+            " done_seq INTEGER,"
+            " PRIMARY KEY (run_id, username))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(run_id, status, lease_expires)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_done ON jobs(run_id, done_seq)")
+        self._lock = threading.Lock()  # Una conexión compartida entre hilos de asyncio.to_thread
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE: toma el bloqueo de escritura antes de leer (reclamo atómico entre procesos)"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def publish(self, run_id, usernames, meta):
+        """Registra la ejecución (meta: page_type, cookies_file...) y encola los usuarios que falten"""
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO runs (run_id, meta, created_at) VALUES (?, ?, ?)",
+                         (run_id, json.dumps(meta), time()))
+            conn.executemany("INSERT OR IGNORE INTO jobs (run_id, username) VALUES (?, ?)",
+                             ((run_id, u) for u in usernames))
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def latest_run(self):
+        rows = self._query("SELECT run_id FROM runs ORDER BY created_at DESC LIMIT 1")
+        return rows[0][0] if rows else None
+
+    def run_meta(self, run_id):
+        rows = self._query("SELECT meta FROM runs WHERE run_id = ?", (run_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def claim(self, run_id, owner, lease_seconds):
+        """Reclama un job pendiente o con lease caducado; devuelve (username, attempts) o None"""
+        now = time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT username, attempts FROM jobs WHERE run_id = ? AND"
+                " (status = 'pending' OR (status = 'leased' AND lease_expires < ?))"
+                " ORDER BY status = 'leased', rowid LIMIT 1", (run_id, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1"
+                " WHERE run_id = ? AND username = ?", (owner, now + lease_seconds, run_id, row[0])
+            )
+        return row[0], row[1] + 1
+
+    def extend(self, run_id, owner, usernames, lease_seconds):
+        """Renueva los leases que owner aún tiene (heartbeat de jobs en curso o en reintento)"""
+        expires = time() + lease_seconds
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE jobs SET lease_expires = ? WHERE run_id = ? AND username = ? AND owner = ? AND status = 'leased'",
+                ((expires, run_id, username, owner) for username in usernames)
+            )
+
+    def complete(self, run_id, username, value):
+        """Guarda el resultado; un job ya completado (lease reclamado por otro) se ignora"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, lease_expires = NULL,"
+                " done_seq = (SELECT COALESCE(MAX(done_seq), 0) + 1 FROM jobs WHERE run_id = ?)"
+                " WHERE run_id = ? AND username = ? AND status != 'done'",
+                (json.dumps(value), run_id, run_id, username)
+            )
+
+    def results(self, run_id, after_seq=0):
+        """Resultados con done_seq > after_seq: [(seq, username, valor)]"""
+        rows = self._query(
+            "SELECT done_seq, username, result FROM jobs WHERE run_id = ? AND done_seq > ? ORDER BY done_seq",
+            (run_id, after_seq)
+        )
+        return [(seq, username, json.loads(result)) for seq, username, result in rows]
+
+    def counts(self, run_id):
+        """{'pending', 'leased', 'expired', 'done'} de la ejecución"""
+        counts = {'pending': 0, 'leased': 0, 'expired': 0, 'done': 0}
+        rows = self._query(
+            "SELECT CASE WHEN status = 'leased' AND lease_expires < ? THEN 'expired' ELSE status END, COUNT(*)"
+            " FROM jobs WHERE run_id = ? GROUP BY 1", (time(), run_id)
+        )
+        counts.update(dict(rows))
+        return counts
+
+    def close(self):
+        self.conn.close()
+
+REDIS_CLAIM_LUA = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, u in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], u)
+    redis.call('HSET', KEYS[3], u, 'pending')
+    redis.call('LPUSH', KEYS[1], u)
+end
+local u = redis.call('LPOP', KEYS[1])
+if not u then return nil end
+redis.call('ZADD', KEYS[2], ARGV[2], u)
+redis.call('HSET', KEYS[3], u, 'leased')
+return {u, redis.call('HINCRBY', KEYS[4], u, 1)}
+"""
+
+REDIS_COMPLETE_LUA = """
+if redis.call('HGET', KEYS[1], ARGV[1]) == 'done' then return 0 end
+redis.call('HSET', KEYS[1], ARGV[1], 'done')
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('ZREM', KEYS[3], ARGV[1])
+redis.call('RPUSH', KEYS[4], ARGV[1])
+return 1
+"""
+
+class RedisJobQueue:
+    """
+    Misma interfaz que SQLiteJobQueue sobre Redis (dependencia opcional: pip install redis).
+    Reclamo y cierre de jobs atómicos con scripts Lua; los leases son un sorted set
+    por fecha de caducidad.
+    """
+    def __init__(self, url):
+        import redis
+        self.r = redis.Redis.from_url(url, decode_responses=True)
+        self._claim = self.r.register_script(REDIS_CLAIM_LUA)
+        self._complete = self.r.register_script(REDIS_COMPLETE_LUA)
+
+    @staticmethod
+    def _key(run_id, name):
+        return f"igjobs:{run_id}:{name}"
+
+    def publish(self, run_id, usernames, meta):
+        self.r.set(self._key(run_id, 'meta'), json.dumps(meta))
+        self.r.zadd('igjobs:runs', {run_id: time()})
+        state, pending = self._key(run_id, 'state'), self._key(run_id, 'pending')
+        for username in usernames:
+            if self.r.hsetnx(state, username, 'pending'):
+                self.r.rpush(pending, username)
+
+    def latest_run(self):
+        runs = self.r.zrevrange('igjobs:runs', 0, 0)
+        return runs[0] if runs else None
+
+    def run_meta(self, run_id):
+        meta = self.r.get(self._key(run_id, 'meta'))
+        return json.loads(meta) if meta else None
+
+    def claim(self, run_id, owner, lease_seconds):
+        now = time()
+        keys = [self._key(run_id, name) for name in ('pending', 'leases', 'state', 'attempts')]
+        job = self._claim(keys=keys, args=[now, now + lease_seconds])
+        return (job[0], int(job[1])) if job else None
+
+    def extend(self, run_id, owner, usernames, lease_seconds):
+        usernames = list(usernames)
+        if usernames:
+            # XX: solo los que siguen con lease (los completados ya salieron del sorted set)
+            self.r.zadd(self._key(run_id, 'leases'), {u: time() + lease_seconds for u in usernames}, xx=True)
+
+    def complete(self, run_id, username, value):
+        keys = [self._key(run_id, name) for name in ('state', 'results', 'leases', 'done')]
+        self._complete(keys=keys, args=[username, json.dumps(value)])
+
+    def results(self, run_id, after_seq=0):
+        usernames = self.r.lrange(self._key(run_id, 'done'), after_seq, -1)
+        if not usernames:
+            return []
+        values = self.r.hmget(self._key(run_id, 'results'), usernames)
+        return [(after_seq + i + 1, u, json.loads(v)) for i, (u, v) in enumerate(zip(usernames, values))]
+
+    def counts(self, run_id):
+        counts = {'pending': 0, 'leased': 0, 'expired': 0, 'done': 0}
+        counts.update(Counter(self.r.hvals(self._key(run_id, 'state'))))
+        counts['expired'] = self.r.zcount(self._key(run_id, 'leases'), '-inf', time())
+        counts['leased'] -= counts['expired']
+        return counts
+
+    def close(self):
+        self.r.close()
+
+def open_job_queue(url=None):
+    """redis://... -> RedisJobQueue; sqlite:///ruta, una ruta o vacío (logs/job_queue.sqlite) -> SQLiteJobQueue"""
+    url = url or JOB_QUEUE_URL
+    if url.startswith(('redis://', 'rediss://')):
+        return RedisJobQueue(url)
+    path = url[len('sqlite:///'):] if url.startswith('sqlite:///') else url
+    return SQLiteJobQueue(path or os.path.join(logger.logs_dir, "job_queue.sqlite"))
+
+async def analyze_profiles_distributed(cookies_file, followers_list, job_queue, run_id, queue_url, on_result=None):
+    """
+    Coordinador: publica los usuarios en la cola (junto con el tipo de página y la ruta
+    del archivo de cookies; las cookies mismas solo con JOB_QUEUE_SHARE_COOKIES) y espera
+    sus resultados, entregándolos a on_result según llegan. Termina cuando todos tienen resultado.
+    """
+    meta = {'page_type': page, 'cookies_file': os.path.abspath(cookies_file)}
+    if JOB_QUEUE_SHARE_COOKIES:
+        with open(cookies_file, 'r') as f:
+            meta['cookies'] = json.load(f)
+    remaining = set(followers_list)
+    await asyncio.to_thread(job_queue.publish, run_id, followers_list, meta)
+    logger.log("="*80)
+    logger.log(f"📡 COORDINADOR: {len(remaining)} perfiles publicados en la cola (run {run_id})")
+    logger.log(f"   Lanza workers en cualquier nodo con: worker --queue {queue_url} --run {run_id}")
+    logger.log("="*80)
+
+    start = perf_counter()
+    last_seq = 0
+    last_report = perf_counter()
+    while remaining:
+        for seq, username, value in await asyncio.to_thread(job_queue.results, run_id, last_seq):
+            last_seq = seq
+            if username in remaining:
+                remaining.discard(username)
+                await emit_result(on_result, username, value)
+        if perf_counter() - last_report >= 30:
+            counts = await asyncio.to_thread(job_queue.counts, run_id)
+            logger.log(f"📡 Cola: {counts['done']} hechos, {counts['leased']} en curso, "
+                       f"{counts['pending']} pendientes, {counts['expired']} leases caducados")
+            last_report = perf_counter()
+        if remaining:
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+    elapsed = perf_counter() - start
+    logger.success(f"✅ Cola completada en {elapsed/60:.1f} minutos "
+                   f"({len(followers_list)/max(elapsed/60, 1e-9):.1f} perfiles/minuto)")
+
+def load_run_cookies(meta, cookies_file=None):
+    """Cookies para un worker: --cookies, las copiadas en la cola o el archivo que indica el coordinador"""
+    if cookies_file is None and meta.get('cookies') is not None:
+        return meta['cookies']
+    path = cookies_file or meta.get('cookies_file')
+    if not path:
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"❌ No se pudieron leer las cookies de {path}: {e} (usa worker --cookies o JOB_QUEUE_SHARE_COOKIES=1)")
+        return None
+
+async def run_queue_worker(job_queue, run_id, max_workers, profile_cache=None, cookies_file=None):
+    """
+    Worker de un nodo: reclama jobs con lease y los pasa a process_batch por una cola
+    local pequeña (así los leases no caducan esperando). Cada resultado se devuelve
+    a la cola distribuida. Un heartbeat renueva cada JOB_LEASE_SECONDS/3 los leases
+    de los jobs aún sin resultado (en curso o esperando un reintento con backoff),
+    para que otro worker no los repita. Termina cuando no quedan jobs pendientes ni en curso.
+    """
+    global page
+    meta = await asyncio.to_thread(job_queue.run_meta, run_id)
+    if meta is None:
+        logger.error(f"❌ La ejecución {run_id} no existe en la cola")
+        return
+    page = meta.get('page_type', page)
+    selenium_cookies = load_run_cookies(meta, cookies_file)
+    if selenium_cookies is None:
+        return
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    local_queue = asyncio.Queue(maxsize=max_workers)
+    worker_stats = {}
+    held = set()  # Jobs reclamados por este worker y aún sin resultado
+
+    async def on_result(username, value):
+        await asyncio.to_thread(job_queue.complete, run_id, username, value)
+        held.discard(username)
+
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            if held:
+                try:
+                    await asyncio.to_thread(job_queue.extend, run_id, owner, list(held), JOB_LEASE_SECONDS)
+                except Exception as e:
+                    logger.warning(f"⚠ No se pudieron renovar los leases: {e}")
+
+    async def feed():
+        while True:
+            job = await asyncio.to_thread(job_queue.claim, run_id, owner, JOB_LEASE_SECONDS)
+            if job is None:
+                counts = await asyncio.to_thread(job_queue.counts, run_id)
+                if counts['pending'] == 0 and counts['leased'] == 0 and counts['expired'] == 0:
+                    break
+                await asyncio.sleep(JOB_POLL_INTERVAL)  # Quedan leases de otros workers (pueden caducar)
+                continue
+            username, attempts = job
+            if attempts > 1:
+                logger.warning(f"♻️  {username}: lease caducado, reintento {attempts}")
+            held.add(username)
+            await local_queue.put(username)
+        for _ in range(max_workers):
+            await local_queue.put(None)
+
+    logger.log(f"🛠  Worker {owner}: run {run_id} ({page}), {max_workers} workers, lease {JOB_LEASE_SECONDS}s")
+    async with async_playwright() as p:
+        browser, context = await launch_browser_context(p, selenium_cookies)
+        page_pool = PagePool(context, max_workers)
+        rate_controller.reset(max_workers)
+        retries = RetryScheduler(logger.dead_letter_file)
+        renewer = asyncio.create_task(heartbeat())
+        start = perf_counter()
+        try:
+            await asyncio.gather(
+                feed(),
+                *(process_batch(context, local_queue, worker_id, worker_stats, page_pool, profile_cache, on_result, retries)
+                  for worker_id in range(1, max_workers + 1))
+            )
+        finally:
+            renewer.cancel()
+            await asyncio.gather(renewer, return_exceptions=True)
+            await page_pool.close()
+            await browser.close()
+    retries.log_summary()
+    log_analysis_summary(perf_counter() - start, worker_stats, profile_cache)
+
+def main_worker(queue_url, run_id=None, max_workers=MAX_CONCURRENT_WORKERS, cookies_file=None):
+    """Subcomando worker: procesa jobs de la cola distribuida hasta vaciarla"""
+    job_queue = open_job_queue(queue_url)
+    profile_cache = open_profile_cache()
+    try:
+        run_id = run_id or job_queue.latest_run()
+        if not run_id:
+            logger.error("❌ No hay ejecuciones publicadas en la cola")
+            return
+        asyncio.run(run_queue_worker(job_queue, run_id, max(1, max_workers), profile_cache, cookies_file))
+    except KeyboardInterrupt:
+        logger.warning("\n⚠ Worker interrumpido: sus leases caducarán y otro worker los reclamará")
+    finally:
+        if profile_cache is not None:
+            profile_cache.close()
+        job_queue.close()
+        export_metrics()
+
+# ====================== MODO MULTI-CUENTA ======================
+def read_accounts_file(path):
+    """Cuentas de un archivo (una por línea; '#' comenta; '@' opcional), sin repetir y en orden"""
+    accounts = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            name = line.split('#', 1)[0].strip().lstrip('@').strip('/')
+            if name and name not in seen:
+                seen.add(name)
+                accounts.append(name)
+    return accounts
+
+class AudienceRouter:
+    """
+    Deduplica usuarios entre audiencias: cada usuario entra una sola vez en la cola
+    compartida y su resultado se reparte a los escritores de todas las cuentas en
+    cuya lista aparece. Si el resultado ya llegó cuando otra cuenta lo añade, se
+    deja en backlog para que esa cuenta lo escriba sin volver a visitar el perfil.
+    """
+    def __init__(self, queue):
+        self.queue = queue
+        self.subscribers = {}  # usuario en cola -> escritores que esperan su resultado
+        self.results = {}      # usuario -> valor ya obtenido
+        self.backlog = []
+        self.unique = 0
+        self.shared = 0
+
+    def add(self, username, writer):
+        if username in self.results:
+            self.backlog.append((writer, username))
+            self.shared += 1
+        elif username in self.subscribers:
+            self.subscribers[username].append(writer)
+            self.shared += 1
+        else:
+            self.subscribers[username] = [writer]
+            self.queue.put_nowait(username)
+            self.unique += 1
+
+    async def flush_backlog(self):
+        backlog, self.backlog = self.backlog, []
+        for writer, username in backlog:
+            await writer.put(username, self.results[username])
+
+    async def on_result(self, username, value):
+        self.results[username] = value
+        for writer in self.subscribers.pop(username, ()):
+            await writer.put(username, value)
+
+async def analyze_accounts_batch(accounts, profile_cache=None, session_store=None):
+    """
+    Varias cuentas objetivo con un único login y un único navegador Playwright:
+    el modal de cada cuenta se recorre por turnos en la página de login mientras
+    un pool compartido de workers analiza los perfiles de todas las audiencias.
+    Cada cuenta tiene su propio CSV/TXT. Devuelve {cuenta: writer} (vacío si el login falla).
+    """
+    global account
+    account = accounts[0]
+    writers = {}
+    async with async_playwright() as p:
+        browser, context = await launch_browser_context(p)
+        try:
+            login_page = await ensure_logged_in_context(context, session_store)
+            if login_page is None:
+                return writers
+
+            queue = asyncio.Queue()
+            router = AudienceRouter(queue)
+            num_workers = max(1, MAX_CONCURRENT_WORKERS)
+            workers = asyncio.create_task(
+                consume_profile_queue(context, queue, num_workers, profile_cache=profile_cache, on_result=router.on_result)
+            )
+            logger.log(f"👥 {len(accounts)} cuentas objetivo, {num_workers} workers compartidos")
+            try:
+                for index, account_name in enumerate(accounts, 1):
+                    account = account_name
+                    csv_path, txt_path = logger.result_files(account_name)
+                    writer = ResultStreamWriter(account_name, page == 'following', csv_path, txt_path).start()
+                    writers[account_name] = writer
+                    logger.log("\n" + "="*80)
+                    logger.log(f"CUENTA {index}/{len(accounts)}: {account_name}")
+                    logger.log("="*80)
+                    try:
+                        with metrics.span('account_navigation'):
+                            await login_page.goto(f"{INSTAGRAM_URL}/{account_name}/", wait_until='domcontentloaded')
+                            await asyncio.sleep(random.uniform(1.5, 2.5))
+                        followers_list = await extract_followers_list_playwright(
+                            login_page, account_name, page, count,
+                            on_user=lambda username, writer=writer: router.add(username, writer)
+                        )
+                    except Exception as e:
+                        logger.error(f"❌ Error extrayendo la lista de {account_name}: {str(e)}")
+                        followers_list = []
+                    if not followers_list:
+                        logger.error(f"❌ No se pudieron extraer seguidores de {account_name}")
+                    await router.flush_backlog()
+            finally:
+                # Todas las listas extraídas: un centinela por worker detrás de lo encolado
+                for _ in range(num_workers):
+                    queue.put_nowait(None)
+                _, elapsed, worker_stats = await workers
+                await router.flush_backlog()
+                for writer in writers.values():
+                    await writer.close()
+
+            logger.log(f"🔁 Usuarios únicos analizados: {router.unique} "
+                       f"({router.shared} apariciones repetidas entre audiencias sin volver a visitar)")
+            log_analysis_summary(elapsed, worker_stats, profile_cache)
+            return writers
+        finally:
+            await browser.close()
+
+def main_accounts(accounts_file):
+    """Modo multi-cuenta (subcomando accounts): un login y un navegador para todas las cuentas del archivo"""
+    profile_cache = None
+    validate_config()
+    try:
+        accounts = read_accounts_file(accounts_file)
+        if not accounts:
+            logger.error(f"❌ No hay cuentas objetivo en {accounts_file}")
+            return
+        start_time = perf_counter()
+        logger.log("="*80)
+        logger.log(f"🎯 MODO MULTI-CUENTA: {len(accounts)} cuentas ({page}, {count} por cuenta)")
+        logger.log("="*80)
+
+        profile_cache = open_profile_cache()
+        writers = asyncio.run(analyze_accounts_batch(accounts, profile_cache, open_session_store()))
+        if not writers:
+            logger.error("❌ Login fallido")
+            return
+
+        for account_name, writer in writers.items():
+            csv_path, _ = logger.result_files(account_name)
+            logger.log(f"   - {account_name}: {writer.successful}/{writer.total} perfiles OK -> {csv_path}")
+            if writer.total:
+                run_benford_on_csv(csv_path, show_plot=False)
+        logger.success(f"🎉 {len(writers)} cuentas completadas en {(perf_counter() - start_time)/60:.1f} minutos")
+    except KeyboardInterrupt:
+        logger.warning("\n⚠ Proceso interrumpido por el usuario")
+    except Exception as e:
+        logger.error(f"\n❌ Error crítico: {str(e)}")
+        import traceback
+        logger.error(f"Traceback:\n{traceback.format_exc()}")
+    finally:
+        if profile_cache is not None:
+            profile_cache.close()
+        export_metrics()
+
 # ====================== MAIN ======================
-def main():
+def phase2_distribution_conflict(pipeline, shards, queue_url, login_engine=None):
+    """
+    Motivo por el que --shards/--queue no se pueden aplicar (None si no hay conflicto):
+    el pipeline y el motor de login Playwright analizan en el proceso que recorre el modal
+    """
+    option = '--queue' if queue_url else '--shards' if shards > 1 else None
+    if option is None:
+        return None
+    if pipeline:
+        return f"{option} no es compatible con --pipeline: FASE 2 se solapa con el scroll en este mismo proceso"
+    if (login_engine or LOGIN_ENGINE) == 'playwright':
+        return f"{option} no es compatible con LOGIN_ENGINE=playwright: login, lista y análisis comparten un navegador"
+    return None
+
+def open_run_journal(resume_run_id=None):
+    """
+    Abre el diario de checkpoints. Con resume_run_id recupera el de esa ejecución
+    (y su cuenta/tipo/cantidad); sin él crea uno nuevo con el timestamp actual.
+    Devuelve None si la ejecución a reanudar no existe.
+    """
+    global account, page, count
+    if resume_run_id:
+        path = logger.journal_file(resume_run_id)
+        if not os.path.exists(path):
+            logger.error(f"❌ No existe el diario de la ejecución {resume_run_id}: {path}")
+            return None
+        journal = RunJournal(path, resume_run_id)
+        account = journal.meta.get('account', account)
+        page = journal.meta.get('page_type', page)
+        count = int(journal.meta.get('target_count', count))
+        logger.set_account(account)
+        logger.log(f"♻️  Reanudando ejecución {resume_run_id}: {len(journal.followers)} usuarios extraídos, "
+                   f"{len(journal.done)} perfiles ya analizados")
+        return journal
+
+    run_id = logger.timestamp
+    journal = RunJournal(logger.journal_file(run_id), run_id)
+    journal.record_meta(run_id=run_id, account=account, page_type=page, target_count=count)
+    logger.log(f"🧾 Run ID: {run_id} (reanudar con --resume {run_id})")
+    return journal
+
+def main(resume_run_id=None, pipeline=PIPELINE_PHASES, shards=PROFILE_SHARDS, shard_workers=SHARD_WORKERS, queue_url=JOB_QUEUE_URL,
+         usernames_file=None):
     driver = None
+    profile_cache = None
+    journal = None
+    validate_config()
+    session_store = open_session_store()
     
     try:
         start_time = datetime.datetime.now()
         
+        journal = open_run_journal(resume_run_id)
+        if journal is None:
+            return
+        
+        # --usernames: analizar una lista dada (p. ej. un dead-letter) en lugar del modal
+        input_users = None
+        if usernames_file:
+            input_users = read_accounts_file(usernames_file)
+            pipeline = False
+            logger.log(f"📥 {len(input_users)} usuarios desde {usernames_file} (sin recorrer el modal)")
+        
+        conflict = phase2_distribution_conflict(pipeline, shards, queue_url)
+        if conflict:
+            logger.error(f"❌ {conflict}")
+            return
+        
         logger.log("="*80)
         logger.log("🎯 SCRAPER HÍBRIDO: SELENIUM + PLAYWRIGHT PARALELO")
         logger.log("="*80)
-        logger.log(f"📊 Configuración:")
+        logger.log("📊 Configuración:")
         logger.log(f"   - Cuenta objetivo: {account}")
         logger.log(f"   - Tipo: {page}")
         logger.log(f"   - Cantidad: {count}")
-        logger.log(f"   - Workers paralelos: {MAX_CONCURRENT_WORKERS}")
-        logger.log("="*80)
-        
-        # FASE 1: SELENIUM - Login y extracción de lista
-        logger.log("\n" + "="*80)
-        logger.log("FASE 1: SELENIUM - LOGIN Y EXTRACCIÓN DE LISTA")
+        logger.log(f"   - Workers paralelos (máx.): {MAX_CONCURRENT_WORKERS}")
+        logger.log(f"   - Pipeline FASE 1/2: {'sí' if pipeline else 'no'}")
+        if queue_url:
+            logger.log(f"   - Cola distribuida FASE 2: {queue_url}")
+        elif shards > 1:
+            logger.log(f"   - Shards FASE 2: {shards} procesos (workers por shard: {parse_shard_workers(shard_workers, shards)})")
+        logger.log(f"   - Motor de login: {LOGIN_ENGINE}")
         logger.log("="*80)
         
-        driver = setup_selenium_driver()
-        logger.success("✓ Driver Selenium iniciado")
-        
-        if not selenium_login(driver):
-            logger.error("❌ Login fallido")
-            return
-        
-        handle_post_login_dialogs(driver)
+        cookies_file = journal.cookies_file
+        phase1_done = (journal.followers_done or len(journal.followers) >= count) \
+            and cookies_file and os.path.exists(cookies_file)
+        pipelined = False
+        writer = None
+        profile_cache = open_profile_cache()
         
-        followers_list = extract_followers_list_selenium(driver, account, page, count)
-        
-        if not followers_list:
-            logger.error("❌ No se pudieron extraer seguidores")
-            return
-        
-        # Guardar cookies para Playwright
-        if not save_selenium_cookies(driver, logger.cookies_file):
-            logger.error("❌ No se pudieron guardar cookies")
-            return
-        
-        logger.success(f"✓ FASE 1 COMPLETADA: {len(followers_list)} usuarios extraídos")
-        
-        # Cerrar Selenium
-        driver.quit()
-        logger.log("✓ Driver Selenium cerrado")
+        if phase1_done:
+            followers_list = list(journal.followers)
+            logger.success(f"✓ FASE 1 recuperada del checkpoint: {len(followers_list)} usuarios")
+        elif LOGIN_ENGINE == 'playwright':
+            # FASE 1 + 2 en un único navegador Playwright (sin Selenium)
+            logger.log("\n" + "="*80)
+            logger.log("FASE 1 + 2: PLAYWRIGHT - LOGIN, LISTA Y ANÁLISIS EN UN SOLO NAVEGADOR")
+            logger.log("="*80)
+            
+            writer, followers_list = asyncio.run(
+                analyze_and_stream_playwright(journal, profile_cache, pipeline, session_store, input_users)
+            )
+            if writer is None:
+                logger.warning("⚠ Login con Playwright fallido: se usa Selenium como alternativa")
+            elif not followers_list:
+                logger.error("❌ No se pudieron extraer seguidores")
+                return
         
-        # FASE 2: PLAYWRIGHT - Análisis paralelo
-        logger.log("\n" + "="*80)
-        logger.log("FASE 2: PLAYWRIGHT - ANÁLISIS PARALELO DE PERFILES")
-        logger.log("="*80)
+        if not phase1_done and writer is None:
+            # FASE 1: SELENIUM - Login y extracción de lista
+            logger.log("\n" + "="*80)
+            logger.log("FASE 1: SELENIUM - LOGIN Y EXTRACCIÓN DE LISTA")
+            logger.log("="*80)
+            
+            with metrics.span('selenium_setup'):
+                driver = setup_selenium_driver()
+            logger.success("✓ Driver Selenium iniciado")
+            
+            with metrics.span('selenium_login'):
+                restored = selenium_restore_session(driver, session_store)
+                logged_in = restored or selenium_login(driver)
+            if not logged_in:
+                logger.error("❌ Login fallido")
+                return
+            
+            if not restored:
+                handle_post_login_dialogs(driver)
+                if session_store is not None:
+                    session_store.save(driver.get_cookies())
+            
+            if pipeline:
+                # Las cookies se exportan antes del scroll: FASE 2 arranca con la sesión ya iniciada
+                cookies_file = logger.cookies_file
+                if not save_selenium_cookies(driver, cookies_file):
+                    logger.error("❌ No se pudieron guardar cookies")
+                    return
+                journal.record_cookies(cookies_file)
+                pipelined = True
         
-        # Ejecutar análisis paralelo
-        results = asyncio.run(
-            analyze_profiles_parallel(logger.cookies_file, followers_list, MAX_CONCURRENT_WORKERS)
-        )
+        if not phase1_done and writer is None and not pipelined:
+            if input_users is not None:
+                for username in input_users:
+                    journal.record_follower(username)
+                followers_list = list(journal.followers)
+            else:
+                # Cada usuario se anota en el diario en cuanto se extrae
+                followers_list = extract_followers_list_selenium(
+                    driver, account, page, count,
+                    known_users=journal.followers, on_user=journal.record_follower
+                )
+            
+            if not followers_list:
+                logger.error("❌ No se pudieron extraer seguidores")
+                return
+            journal.record_followers_done()
+            
+            # Guardar cookies para Playwright
+            cookies_file = logger.cookies_file
+            if not save_selenium_cookies(driver, cookies_file):
+                logger.error("❌ No se pudieron guardar cookies")
+                return
+            journal.record_cookies(cookies_file)
+            
+            logger.success(f"✓ FASE 1 COMPLETADA: {len(followers_list)} usuarios extraídos")
+            
+            # Cerrar Selenium
+            driver.quit()
+            driver = None
+            logger.log("✓ Driver Selenium cerrado")
         
-        # Convertir resultados a diccionario
-        results_dict = {username: count for username, count in results}
+        if pipelined:
+            # FASE 1 + FASE 2 en paralelo: los workers consumen usuarios según aparecen
+            logger.log("\n" + "="*80)
+            logger.log("FASE 1 + 2: SCROLL DEL MODAL Y ANÁLISIS EN PIPELINE")
+            logger.log("="*80)
+            
+            writer, followers_list = asyncio.run(
+                analyze_and_stream_pipelined(driver, cookies_file, journal, profile_cache)
+            )
+            if not followers_list:
+                logger.error("❌ No se pudieron extraer seguidores")
+                return
+            logger.success(f"✓ FASE 1 COMPLETADA: {len(followers_list)} usuarios extraídos")
+            
+            driver.quit()
+            driver = None
+            logger.log("✓ Driver Selenium cerrado")
+        elif writer is None:
+            # FASE 2: PLAYWRIGHT - Análisis paralelo
+            logger.log("\n" + "="*80)
+            logger.log("FASE 2: PLAYWRIGHT - ANÁLISIS PARALELO DE PERFILES")
+            logger.log("="*80)
+            
+            # Solo se analizan los perfiles sin resultado en el diario
+            pending = [u for u in followers_list if u not in journal.done]
+            if len(pending) < len(followers_list):
+                logger.log(f"♻️  {len(followers_list) - len(pending)} perfiles recuperados del checkpoint, {len(pending)} pendientes")
+            
+            # Ejecutar análisis paralelo (los perfiles en caché vigentes no se visitan);
+            # el CSV/TXT se escribe en streaming a medida que llegan los resultados
+            writer = asyncio.run(analyze_and_stream(cookies_file, pending, journal, profile_cache, shards, shard_workers, queue_url))
         
         # FASE 3: Guardar resultados
         logger.log("\n" + "="*80)
         logger.log("FASE 3: GUARDANDO RESULTADOS")
         logger.log("="*80)
         
-        save_results(account, results_dict)
+        logger.success(f"📊 CSV generado correctamente: {logger.csv_file}")
+        logger.success(f"📄 TXT generado correctamente: {logger.txt_file}")
+        run_benford_on_csv(logger.csv_file)
         
         # RESUMEN FINAL
         end_time = datetime.datetime.now()
         total_elapsed = (end_time - start_time).total_seconds()
         
-        successful = sum(1 for count in results_dict.values() if count is not None)
-        failed = len(results_dict) - successful
+        total_profiles = writer.total
+        successful = writer.successful
+        failed = total_profiles - successful
         
         logger.log("\n" + "="*80)
         logger.success("🎉 PROCESO COMPLETADO")
         logger.log("="*80)
         logger.log(f"⏱  Tiempo total: {total_elapsed/60:.1f} minutos")
-        logger.log(f"🚀 Velocidad promedio: {len(results_dict)/(total_elapsed/60):.1f} perfiles/min")
-        logger.log(f"📊 Estadísticas:")
-        logger.log(f"   - Total analizado: {len(results_dict)}")
+        logger.log(f"🚀 Velocidad promedio: {total_profiles/(total_elapsed/60):.1f} perfiles/min")
+        logger.log("📊 Estadísticas:")
+        logger.log(f"   - Total analizado: {total_profiles}")
         logger.log(f"   - ✓ Exitosos: {successful}")
         logger.log(f"   - ✗ Fallidos: {failed}")
-        logger.log(f"   - Tasa de éxito: {successful/len(results_dict)*100:.1f}%")
-        logger.log(f"📁 Archivos generados:")
+        logger.log(f"   - Tasa de éxito: {successful/max(total_profiles, 1)*100:.1f}%")
+        if RATE_LIMIT_ENABLED and rate_controller.observed:
+            logger.log(f"   - Ritmo final: {rate_controller.rate:.2f} perfiles/s, {rate_controller.concurrency} workers activos")
+        if profile_cache is not None:
+            logger.log(f"   - Caché: {profile_cache.hit_rate:.1f}% aciertos, ~{profile_cache.saved_seconds/60:.1f} min de red ahorrados")
+        logger.log("📁 Archivos generados:")
         logger.log(f"   - CSV: {logger.csv_file}")
         logger.log(f"   - TXT: {logger.txt_file}")
         logger.log(f"   - LOG: {logger.log_file}")
+        if os.path.exists(logger.dead_letter_file):
+            logger.log(f"   - DEAD-LETTER: {logger.dead_letter_file} (reanalizar con --usernames)")
         logger.log("="*80)
         
         # Estimación para 500 perfiles
@@ -1151,6 +4202,118 @@ def main():
                 driver.quit()
             except:
                 pass
+        if profile_cache is not None:
+            profile_cache.close()
+        if journal is not None:
+            journal.close()
+        export_metrics()
+
+def parse_args(argv=None):
+    """Argumentos de línea de comandos (sin subcomando se ejecuta el scraper)"""
+    parser = argparse.ArgumentParser(description="Instagram Follower Stats Scraper - versión híbrida")
+    parser.add_argument('--resume', metavar='RUN_ID', help='Reanuda una ejecución interrumpida desde su diario (logs/journal_<RUN_ID>.jsonl)')
+    parser.add_argument('--pipeline', action='store_true', default=PIPELINE_PHASES,
+                        help='Analiza perfiles mientras el modal aún hace scroll (FASE 1 y 2 solapadas; también PIPELINE=1)')
+    parser.add_argument('--shards', type=int, default=PROFILE_SHARDS,
+                        help='Reparte FASE 2 entre N procesos, cada uno con su navegador; los límites RATE_* '
+                             'son globales y cada shard aplica 1/N (también SHARDS=N; no con --pipeline ni LOGIN_ENGINE=playwright)')
+    parser.add_argument('--shard-workers', default=SHARD_WORKERS,
+                        help='Workers por shard: "8" o una lista "8,8,4" (también SHARD_WORKERS)')
+    parser.add_argument('--queue', default=JOB_QUEUE_URL,
+                        help='Coordinador: publica FASE 2 en una cola distribuida (sqlite:///ruta o redis://...; también JOB_QUEUE; '
+                             'no con --pipeline ni LOGIN_ENGINE=playwright)')
+    parser.add_argument('--usernames', metavar='FILE',
+                        help='Analiza los usuarios de FILE (uno por línea, p. ej. un dead-letter) en lugar de recorrer el modal')
+    subparsers = parser.add_subparsers(dest='command')
+
+    worker = subparsers.add_parser('worker', help='Worker de la cola distribuida: reclama perfiles con lease y devuelve resultados')
+    worker.add_argument('--queue', dest='worker_queue', default=None,
+                        help='Cola del coordinador (por defecto JOB_QUEUE o logs/job_queue.sqlite)')
+    worker.add_argument('--run', default=None, help='Run ID publicado por el coordinador (por defecto el último)')
+    worker.add_argument('--workers', type=int, default=MAX_CONCURRENT_WORKERS, help='Workers paralelos en este nodo')
+    worker.add_argument('--cookies', default=None,
+                        help='Archivo de cookies de la sesión (por defecto la ruta que publica el coordinador)')
+
+    bench_pool = subparsers.add_parser('bench-pool', help='Compara perfiles/minuto con y sin pool de páginas (servidor local)')
+    bench_pool.add_argument('--profiles', type=int, default=200, help='Número de perfiles sintéticos')
+    bench_pool.add_argument('--workers', type=int, default=MAX_CONCURRENT_WORKERS, help='Workers paralelos')
+
+    bench_throughput = subparsers.add_parser('bench-throughput', help='Benchmark de extremo a extremo de FASE 2 contra el servidor local')
+    bench_throughput.add_argument('--profiles', type=int, default=300, help='Número de perfiles sintéticos')
+    bench_throughput.add_argument('--workers', type=int, default=MAX_CONCURRENT_WORKERS, help='Workers paralelos')
+    bench_throughput.add_argument('--latency-ms', type=float, default=150, help='Latencia simulada por petición')
+    bench_throughput.add_argument('--jitter-ms', type=float, default=50, help='Variación aleatoria de la latencia (±)')
+    bench_throughput.add_argument('--error-rate', type=float, default=0.02, help='Fracción de peticiones que responden 429')
+    bench_throughput.add_argument('--missing-rate', type=float, default=0.05, help='Fracción de perfiles inexistentes ("Sorry")')
+    bench_throughput.add_argument('--rate-limit', action='store_true', help='Mantener activo el control de ritmo adaptativo')
+    bench_throughput.add_argument('--engine', choices=('playwright', 'http'), default=PROFILE_ENGINE, help='Motor de FASE 2')
+    bench_throughput.add_argument('--no-blocking', action='store_true', help='No bloquear recursos (solo contarlos) para comparar bytes por perfil')
+
+    bench_engine = subparsers.add_parser('bench-engine', help='Compara el motor HTTP con Playwright en el servidor local')
+    bench_engine.add_argument('--profiles', type=int, default=300, help='Número de perfiles sintéticos')
+    bench_engine.add_argument('--workers', type=int, default=MAX_CONCURRENT_WORKERS, help='Workers paralelos')
+    bench_engine.add_argument('--latency-ms', type=float, default=150, help='Latencia simulada por petición')
+    bench_engine.add_argument('--jitter-ms', type=float, default=50, help='Variación aleatoria de la latencia (±)')
+    bench_engine.add_argument('--error-rate', type=float, default=0.02, help='Fracción de peticiones que responden 429')
+    bench_engine.add_argument('--missing-rate', type=float, default=0.05, help='Fracción de perfiles inexistentes ("Sorry")')
+
+    bench_modal = subparsers.add_parser('bench-modal', help='Compara la recolección del modal (anterior vs colector) en una página local')
+    bench_modal.add_argument('--total', type=int, default=1000, help='Usuarios en el modal sintético')
+    bench_modal.add_argument('--page-size', type=int, default=25, help='Usuarios añadidos por cada scroll')
+
+    bench_benford = subparsers.add_parser('bench-benford', help='Benchmark del motor vectorizado de Benford con conteos sintéticos')
+    bench_benford.add_argument('--n', type=int, default=10_000_000, help='Número de conteos sintéticos')
+    bench_benford.add_argument('--legacy-limit', type=int, default=1_000_000, help='Valores medidos con la ruta antigua (se extrapola)')
+    bench_benford.add_argument('--chunksize', type=int, default=1_000_000, help='Filas por bloque al leer el CSV')
+    bench_benford.add_argument('--csv', action='store_true', help='Medir también la lectura por bloques de un CSV temporal')
+
+    bench_parse = subparsers.add_parser('bench-parse', help='Fuzzing y benchmark del parser de contadores de seguidores')
+    bench_parse.add_argument('--n', type=int, default=1_000_000, help='Llamadas medidas por parser')
+    bench_parse.add_argument('--fuzz', type=int, default=100_000, help='Textos sintéticos para el fuzzing')
+
+    accounts = subparsers.add_parser('accounts', help='Analiza varias cuentas objetivo con un solo login y navegador (Playwright)')
+    accounts.add_argument('accounts_file', help='Archivo con una cuenta objetivo por línea (# para comentarios)')
+
+    batch = subparsers.add_parser('benford-batch', help='Benford en lote sobre muchos CSV de resultados (pool de procesos)')
+    batch.add_argument('paths', nargs='+', help=f'Directorios (se busca {BENFORD_BATCH_PATTERN}), patrones glob o archivos CSV')
+    batch.add_argument('--workers', type=int, default=None, help='Procesos en paralelo (por defecto: núcleos de la CPU)')
+    batch.add_argument('--plots', action='store_true', help='Generar también los gráficos PNG y JSON por archivo')
+    batch.add_argument('--chunksize', type=int, default=None, help='Filas por bloque al leer cada CSV')
+    batch.add_argument('--output', default=None, help='Ruta del CSV resumen (por defecto logs/benford_summary_<ts>.csv)')
+
+    return parser.parse_args(argv)
+
+def cli(argv=None):
+    args = parse_args(argv)
+    if args.command and args.command.startswith('bench-'):
+        # bench.benchmarks importa este módulo: al ejecutarlo como script debe recibir esta misma
+        # instancia (logger, métricas y configuración) y no una segunda copia
+        sys.modules.setdefault('instagram_followers', sys.modules[__name__])
+        from bench import benchmarks
+    if args.command == 'bench-pool':
+        asyncio.run(benchmarks.benchmark_page_pool(args.profiles, args.workers))
+    elif args.command == 'bench-throughput':
+        asyncio.run(benchmarks.benchmark_throughput(args.profiles, args.workers, args.latency_ms, args.jitter_ms,
+                                                    args.error_rate, args.missing_rate, args.rate_limit, engine=args.engine,
+                                                    resource_blocking=not args.no_blocking))
+    elif args.command == 'bench-engine':
+        asyncio.run(benchmarks.benchmark_profile_engines(args.profiles, args.workers, args.latency_ms, args.jitter_ms,
+                                                         args.error_rate, args.missing_rate))
+    elif args.command == 'worker':
+        main_worker(args.worker_queue or args.queue, args.run, args.workers, args.cookies)
+    elif args.command == 'accounts':
+        main_accounts(args.accounts_file)
+    elif args.command == 'benford-batch':
+        benford_batch(args.paths, args.workers, args.plots, args.chunksize, args.output)
+    elif args.command == 'bench-modal':
+        benchmarks.benchmark_modal_harvest(args.total, args.page_size)
+    elif args.command == 'bench-benford':
+        benchmarks.benchmark_benford(args.n, args.legacy_limit, args.chunksize, args.csv)
+    elif args.command == 'bench-parse':
+        benchmarks.benchmark_parse_follower_count(args.n, args.fuzz)
+    else:
+        main(resume_run_id=args.resume, pipeline=args.pipeline, shards=args.shards, shard_workers=args.shard_workers,
+             queue_url=args.queue, usernames_file=args.usernames)
 
 if __name__ == "__main__":
-    main()
+    cli()
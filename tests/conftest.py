@@ -0,0 +1,15 @@
+import os
+import shutil
+import sys
+import tempfile
+
+# Los tests importan instagram_followers desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# El logger se crea al importar el scraper: sus archivos van a una carpeta temporal, no a logs/
+LOG_DIR = tempfile.mkdtemp(prefix='ig_scraper_logs_')
+os.environ['LOG_DIR'] = LOG_DIR
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(LOG_DIR, ignore_errors=True)
@@ -0,0 +1,50 @@
+import pathlib
+import subprocess
+import sys
+
+import numpy as np
+
+from benford import (
+    BENFORD_EXPECTED, benford_conformity, benford_summary_row, count_first_digits, first_digits,
+)
+
+
+def test_first_digits_handles_powers_of_ten():
+    values = [1, 9, 10, 99, 100, 999, 1000, 10**15, 10**15 - 1, 0, -5]
+    assert first_digits(values).tolist() == [1, 9, 1, 9, 1, 9, 1, 1, 9]
+
+
+def test_count_first_digits():
+    assert count_first_digits([1, 1, 2, 9, 0, 10]).tolist() == [2, 1, 0, 0, 0, 0, 0, 0, 1]
+
+
+def test_conformity_of_exact_benford_counts():
+    counts = np.round(BENFORD_EXPECTED * 100_000)
+    tests = benford_conformity(counts)
+    assert tests['mad']['conformity'] == 'close_conformity'
+    assert tests['chi_square']['p_value'] > 0.99
+    assert tests['ks']['conforms']
+    assert benford_conformity(np.zeros(9)) is None
+
+
+def test_summary_row_from_results_csv(tmp_path):
+    csv_path = tmp_path / "anastats_hybrid20250101-000000.csv"
+    csv_path.write_text("Username,Username_Follower,Num_Followers,Primer_Dígito\n"
+                        "ana,u1,1234,1\nana,u2,N/A,\nana,u3,987,9\n", encoding='utf-8')
+    row = benford_summary_row(str(csv_path))
+    assert row['Layout'] == 'original'
+    assert row['N'] == 2
+    assert row['counts'] == [1, 0, 0, 0, 0, 0, 0, 0, 1]
+
+
+def test_summary_row_reports_errors(tmp_path):
+    csv_path = tmp_path / "vacio.csv"
+    csv_path.write_text("Username\nana\n", encoding='utf-8')
+    assert 'Error' in benford_summary_row(str(csv_path))
+
+
+def test_benford_module_does_not_import_scraping_stack():
+    code = "import sys, benford; print(any(m in sys.modules for m in ('selenium', 'playwright', 'instagram_followers')))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=str(pathlib.Path(__file__).resolve().parents[1]))
+    assert out.stdout.strip() == 'False'
@@ -0,0 +1,64 @@
+import pytest
+
+from instagram_followers import extract_profile_from_html, parse_follower_count
+
+
+def meta_page(description):
+    return f'<html><head><meta name="description" content="{description}"></head><body></body></html>'
+
+
+@pytest.mark.parametrize("description, expected", [
+    ("1,234 Followers, 120 Following, 34 Posts - See Instagram photos and videos from Ana (@ana)", 1234),
+    ("1,234 Followers, 120 Following, 34 Posts - See Instagram photos and videos from 5K Runner (@runner)", 1234),
+    ("3.223 seguidores, 120 seguidos, 34 publicaciones - Ver fotos y videos de 2M Posts (@dos)", 3223),
+    ("987 Followers, 12 Following, 3 Posts - Entrenando para mi primer 10K • 1.2M sueños", 987),
+])
+def test_meta_exact_count_ignores_abbreviations_outside_the_counter(description, expected):
+    info = extract_profile_from_html(meta_page(description))
+    assert info['num_followers'] == expected
+    assert info['exact'] is True
+    assert info['source'] == 'meta'
+
+
+@pytest.mark.parametrize("description, expected", [
+    ("1.2M Followers, 120 Following, 34 Posts - See Instagram photos and videos from Ana (@ana)", 1_200_000),
+    ("12,3 mil seguidores, 120 seguidos, 34 publicaciones - Ver fotos y videos de Ana (@ana)", 12_300),
+])
+def test_meta_abbreviated_count_is_not_exact(description, expected):
+    info = extract_profile_from_html(meta_page(description))
+    assert info['num_followers'] == expected
+    assert info['exact'] is False
+
+
+def test_embedded_json_wins_over_meta():
+    html = meta_page("1.2M Followers, 1 Following, 1 Posts") + '<script>{"edge_followed_by":{"count":1234567}}</script>'
+    info = extract_profile_from_html(html)
+    assert (info['num_followers'], info['exact'], info['source']) == (1234567, True, 'json')
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1,234 followers", 1234),
+    ("1 234 followers", 1234),
+    ("4.35K followers", 4350),
+    ("2,5 mill. seguidores", 2_500_000),
+    ("no count here", None),
+])
+def test_parse_follower_count(text, expected):
+    assert parse_follower_count(text) == expected
+
+
+def test_embedded_json_is_anchored_to_the_profile_username():
+    # Un perfil sugerido aparece antes que el propio en el JSON de la página
+    html = ('<script>{"username":"famoso","edge_followed_by":{"count":9876543}}</script>'
+            + 'x' * 5000
+            + '<script>{"edge_followed_by":{"count":321},"username":"ana"}</script>')
+    info = extract_profile_from_html(html, 'ana')
+    assert (info['num_followers'], info['source']) == (321, 'json')
+
+
+def test_unanchored_json_must_agree_with_meta():
+    suggested = '<script>{"username":"famoso","edge_followed_by":{"count":9876543}}</script>'
+    info = extract_profile_from_html(meta_page("1,234 Followers, 1 Following, 1 Posts") + suggested, 'ana')
+    assert (info['num_followers'], info['exact'], info['source']) == (1234, True, 'meta')
+    # Sin meta no hay con qué confirmarlo: no se usa
+    assert extract_profile_from_html(suggested, 'ana')['num_followers'] is None
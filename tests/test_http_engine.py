@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+import instagram_followers as scraper
+from bench.fixture_server import FixtureServer, fixture_follower_count
+
+pytest.importorskip('httpx')
+
+
+class CookieContext:
+    """Lo único que open_http_fetcher necesita del contexto de Playwright"""
+
+    async def cookies(self):
+        return [{'name': 'sessionid', 'value': 'x', 'domain': '127.0.0.1', 'path': '/'}]
+
+
+def fetch_all(monkeypatch, usernames, **server_options):
+    async def run():
+        fetcher = await scraper.open_http_fetcher(CookieContext(), max_connections=4)
+        try:
+            return [await fetcher.get_follower_count(u, 1) for u in usernames], fetcher.stats
+        finally:
+            await fetcher.close()
+
+    with FixtureServer(**server_options) as server:
+        monkeypatch.setattr(scraper, 'INSTAGRAM_URL', server.url)
+        return asyncio.run(run())
+
+
+def test_exact_count_with_abbreviation_in_display_name(monkeypatch):
+    # El nombre visible es "Runner_10K": no debe marcar el contador como abreviado
+    results, stats = fetch_all(monkeypatch, ['runner_10k', 'ana'])
+    assert results == [
+        ('runner_10k', fixture_follower_count('runner_10k'), None),
+        ('ana', fixture_follower_count('ana'), None),
+    ]
+    assert stats['ok'] == 2 and stats['fallback'] == 0
+
+
+def test_missing_profile_and_throttling_are_final(monkeypatch):
+    results, _ = fetch_all(monkeypatch, ['missing_1'])
+    assert results == [('missing_1', None, 'sorry')]
+
+    results, stats = fetch_all(monkeypatch, ['ana'], error_rate=1.0)
+    assert results == [('ana', None, 'throttled')]
+    assert stats['throttled'] == 1
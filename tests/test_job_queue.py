@@ -0,0 +1,81 @@
+import json
+from time import sleep
+
+import pytest
+
+from instagram_followers import SQLiteJobQueue, load_run_cookies, open_job_queue
+
+
+@pytest.fixture
+def job_queue(tmp_path):
+    jq = SQLiteJobQueue(str(tmp_path / "jobs.sqlite"))
+    jq.publish('run1', ['ana', 'bea', 'carla'], {'page_type': 'followers', 'cookies_file': '/tmp/cookies.json'})
+    yield jq
+    jq.close()
+
+
+def test_publish_claim_complete(job_queue):
+    assert job_queue.latest_run() == 'run1'
+    assert job_queue.run_meta('run1') == {'page_type': 'followers', 'cookies_file': '/tmp/cookies.json'}
+
+    claimed = [job_queue.claim('run1', 'w1', 60) for _ in range(3)]
+    assert claimed == [('ana', 1), ('bea', 1), ('carla', 1)]
+    assert job_queue.claim('run1', 'w1', 60) is None
+    assert job_queue.counts('run1') == {'pending': 0, 'leased': 3, 'expired': 0, 'done': 0}
+
+    job_queue.complete('run1', 'bea', 200)
+    job_queue.complete('run1', 'ana', {'num_followers': 100})
+    assert job_queue.results('run1') == [(1, 'bea', 200), (2, 'ana', {'num_followers': 100})]
+    assert job_queue.results('run1', after_seq=1) == [(2, 'ana', {'num_followers': 100})]
+    assert job_queue.counts('run1')['done'] == 2
+
+
+def test_expired_lease_is_claimed_again(job_queue):
+    assert job_queue.claim('run1', 'w1', 0.05) == ('ana', 1)
+    sleep(0.1)
+    assert job_queue.counts('run1')['expired'] == 1
+    # Los pendientes van antes que los leases caducados
+    assert job_queue.claim('run1', 'w2', 60) == ('bea', 1)
+    assert job_queue.claim('run1', 'w2', 60) == ('carla', 1)
+    assert job_queue.claim('run1', 'w2', 60) == ('ana', 2)
+
+
+def test_extend_keeps_lease_alive(job_queue):
+    assert job_queue.claim('run1', 'w1', 0.2) == ('ana', 1)
+    job_queue.extend('run1', 'w1', ['ana'], 60)
+    job_queue.extend('run1', 'otro', ['bea'], 60)  # No es suyo: no cambia nada
+    sleep(0.3)
+    assert job_queue.claim('run1', 'w2', 60) == ('bea', 1)
+    assert job_queue.claim('run1', 'w2', 60) == ('carla', 1)
+    assert job_queue.claim('run1', 'w2', 60) is None
+
+
+def test_duplicate_complete_is_ignored(job_queue):
+    job_queue.claim('run1', 'w1', 0.05)
+    sleep(0.1)
+    job_queue.claim('run1', 'w2', 60)  # bea
+    job_queue.claim('run1', 'w2', 60)  # carla
+    assert job_queue.claim('run1', 'w2', 60) == ('ana', 2)
+    job_queue.complete('run1', 'ana', 111)
+    job_queue.complete('run1', 'ana', 222)  # El primer worker termina tarde
+    assert job_queue.results('run1') == [(1, 'ana', 111)]
+
+
+def test_open_job_queue_sqlite_url(tmp_path):
+    jq = open_job_queue(f"sqlite:///{tmp_path / 'q.sqlite'}")
+    try:
+        assert isinstance(jq, SQLiteJobQueue)
+        assert jq.latest_run() is None
+    finally:
+        jq.close()
+
+
+def test_run_cookies_are_read_from_the_published_file(tmp_path):
+    cookies_file = tmp_path / "cookies.json"
+    cookies_file.write_text(json.dumps([{'name': 'sessionid', 'value': 'x'}]))
+    meta = {'page_type': 'followers', 'cookies_file': str(cookies_file)}
+    assert load_run_cookies(meta) == [{'name': 'sessionid', 'value': 'x'}]
+    # Cookies copiadas en la cola (JOB_QUEUE_SHARE_COOKIES) o un --cookies explícito
+    assert load_run_cookies({'cookies': []}) == []
+    assert load_run_cookies({'cookies': []}, str(cookies_file)) == [{'name': 'sessionid', 'value': 'x'}]
+    assert load_run_cookies({'cookies_file': str(tmp_path / "no_existe.json")}) is None
@@ -0,0 +1,14 @@
+from instagram_followers import Logger
+
+
+def test_console_and_file_are_written_by_the_writer_thread(tmp_path, capsys):
+    log = Logger(log_dir=str(tmp_path), level='INFO', structured=False)
+    log.debug("no aparece")
+    log.log("línea de info")
+    log.close()
+
+    out = capsys.readouterr().out
+    assert "línea de info" in out and "no aparece" not in out
+    assert not log.debug_enabled
+    with open(log.log_file, encoding='utf-8') as f:
+        assert "[INFO] línea de info" in f.read()
@@ -0,0 +1,27 @@
+from instagram_followers import ModalHarvest
+
+
+def links(*usernames):
+    return [f"https://www.instagram.com/{u}/" for u in usernames]
+
+
+def test_consume_deduplicates_and_counts_known_users():
+    seen = []
+    harvest = ModalHarvest('cuenta', 4, known_users=['ana'], on_user=seen.append)
+    # El colector repite enlaces y el modal incluye la propia cuenta y rutas que no son perfiles
+    assert harvest.consume(links('ana', 'bea', 'cuenta', 'explore', 'bea')) == 2
+    assert harvest.consume(links('carla', 'dani', 'eva')) == 2
+    assert harvest.followers_list == ['ana', 'bea', 'carla', 'dani']
+    assert seen == ['bea', 'carla', 'dani']
+    assert harvest.reached and not harvest.active
+
+
+def test_stops_after_reads_without_progress():
+    harvest = ModalHarvest('cuenta', 100, max_no_progress=3)
+    harvest.consume(links('ana'))
+    for _ in range(3):
+        assert harvest.active
+        harvest.next_scroll()
+        harvest.consume(links('ana'))
+    assert not harvest.active and not harvest.reached
+    assert harvest.scroll_attempts == 3
@@ -0,0 +1,27 @@
+import sqlite3
+
+from instagram_followers import ProfileCache, lookup_cache
+
+
+def test_get_batches_last_access_updates(tmp_path):
+    cache = ProfileCache(str(tmp_path / "cache.sqlite"), ttl_seconds=3600, max_entries=100, access_batch=2)
+    cache.put('ana', {'username': 'ana', 'num_followers': 10})
+    cache.put('bea', {'username': 'bea', 'num_followers': 20})
+
+    assert cache.get('ana') == {'username': 'ana', 'num_followers': 10}
+    assert cache.get('nadie') is None
+    assert list(cache._accessed) == ['ana']
+
+    cache.get('bea')
+    assert cache._accessed == {}
+    assert (cache.hits, cache.misses) == (2, 1)
+    cache.close()
+
+
+def test_lookup_cache_treats_sqlite_errors_as_miss():
+    class LockedCache:
+        def get(self, username):
+            raise sqlite3.OperationalError('database is locked')
+
+    assert lookup_cache(LockedCache(), 'ana') is None
+    assert lookup_cache(None, 'ana') is None
@@ -0,0 +1,41 @@
+import asyncio
+from types import SimpleNamespace
+
+from instagram_followers import ResourceStats
+
+
+class FakeRequest:
+    def __init__(self, page, size, delay=0.0):
+        self.frame = SimpleNamespace(page=page)
+        self.size = size
+        self.delay = delay
+
+    async def sizes(self):
+        await asyncio.sleep(self.delay)
+        return {'responseHeadersSize': 0, 'responseBodySize': self.size}
+
+
+def test_bytes_go_to_the_profile_that_sent_the_request():
+    async def scenario():
+        stats = ResourceStats()
+        page = object()  # Página del pool: pasa del perfil A al B
+
+        stats.begin(page)
+        request_a = FakeRequest(page, 1000, delay=0.05)
+        late = FakeRequest(page, 5000)  # Petición de A que termina con B en curso
+        for request in (request_a, late):
+            stats.tag(request, stats.visit_for(request))
+        stats.request_finished(request_a)
+        await stats.end(page)  # Espera al sizes() pendiente de A
+
+        stats.begin(page)
+        request_b = FakeRequest(page, 10)
+        stats.tag(request_b, stats.visit_for(request_b))
+        stats.request_finished(late)
+        stats.request_finished(request_b)
+        await stats.end(page)
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats.per_profile['bytes'] == [1000, 10]
+    assert stats.totals['bytes'] == 1010
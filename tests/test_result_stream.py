@@ -0,0 +1,39 @@
+import asyncio
+import csv
+
+import pytest
+
+from instagram_followers import CSV_HEADER_ORIGINAL, ResultStreamWriter
+
+
+def test_writer_streams_rows_in_batches(tmp_path):
+    csv_path, txt_path = tmp_path / "out.csv", tmp_path / "out.txt"
+
+    async def run():
+        writer = ResultStreamWriter('cuenta', False, str(csv_path), str(txt_path), batch_size=2).start()
+        for i in range(5):
+            await writer.put(f'user{i}', 1000 + i if i != 3 else None)
+        await writer.close()
+        return writer
+
+    writer = asyncio.run(run())
+    assert (writer.total, writer.successful) == (5, 4)
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == CSV_HEADER_ORIGINAL
+    assert len(rows) == 6
+
+
+def test_put_raises_when_writer_task_dies(tmp_path):
+    missing_dir = tmp_path / "no_existe"
+
+    async def run():
+        writer = ResultStreamWriter('cuenta', False, str(missing_dir / "out.csv"), str(missing_dir / "out.txt"),
+                                    batch_size=1).start()
+        with pytest.raises(FileNotFoundError):
+            for i in range(100):
+                await asyncio.wait_for(writer.put(f'user{i}', i), timeout=5)
+        with pytest.raises(FileNotFoundError):
+            await writer.close()
+
+    asyncio.run(run())
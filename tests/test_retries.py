@@ -0,0 +1,98 @@
+import asyncio
+
+import instagram_followers as scraper
+
+
+class ScriptedFetcher:
+    """Sustituto del HttpProfileFetcher: devuelve los fallos programados por usuario"""
+
+    def __init__(self, outcomes):
+        self.outcomes = {u: list(v) for u, v in outcomes.items()}
+        self.calls = []
+
+    async def get_follower_count(self, username, worker_id):
+        self.calls.append(username)
+        failure = self.outcomes[username].pop(0) if self.outcomes[username] else None
+        return username, (None if failure else 1000), failure
+
+
+def run_worker(monkeypatch, tmp_path, fetcher, feed):
+    monkeypatch.setattr(scraper, 'RATE_LIMIT_ENABLED', False)
+    monkeypatch.setattr(scraper, 'page', 'followers')
+    dead_letter = tmp_path / "dead_letter.txt"
+    delivered = []
+
+    async def on_result(username, value):
+        delivered.append((username, value))
+
+    async def run():
+        queue = asyncio.Queue()
+        retries = scraper.RetryScheduler(str(dead_letter), max_attempts=3, base_delay=0.05, max_delay=0.05)
+        worker = asyncio.create_task(scraper.process_batch(
+            None, queue, 1, {}, on_result=on_result, retries=retries, http_fetcher=fetcher))
+        await feed(queue, delivered)
+        await asyncio.wait_for(worker, timeout=5)
+        return retries
+
+    return asyncio.run(run()), delivered, dead_letter
+
+
+def test_due_retry_runs_while_pipeline_queue_is_idle(monkeypatch, tmp_path):
+    fetcher = ScriptedFetcher({'ana': ['timeout']})
+
+    async def feed(queue, delivered):
+        await queue.put('ana')
+        # El productor sigue ocupado (sin centinela): el reintento debe atenderse igualmente
+        for _ in range(50):
+            if delivered:
+                break
+            await asyncio.sleep(0.05)
+        assert delivered == [('ana', 1000)]
+        await queue.put(None)
+
+    retries, delivered, dead_letter = run_worker(monkeypatch, tmp_path, fetcher, feed)
+    assert fetcher.calls == ['ana', 'ana']
+    assert retries.recovered == 1
+    assert not dead_letter.exists()
+
+
+def test_miss_goes_straight_to_dead_letter(monkeypatch, tmp_path):
+    fetcher = ScriptedFetcher({'bea': ['miss'], 'carla': ['sorry']})
+
+    async def feed(queue, delivered):
+        for item in ('bea', 'carla', None):
+            await queue.put(item)
+
+    retries, delivered, dead_letter = run_worker(monkeypatch, tmp_path, fetcher, feed)
+    assert fetcher.calls == ['bea', 'carla']
+    assert delivered == [('bea', None), ('carla', None)]
+    assert dead_letter.read_text(encoding='utf-8').splitlines() == ['bea  # miss, 1 intentos']
+    assert retries.dead == {'miss': 1}
+
+
+class ThrottledPage:
+    """Página cuyo goto responde 429: el fetcher debe volver sin esperar al perfil"""
+    url = 'https://www.instagram.com/ana/'
+
+    async def goto(self, url, **kwargs):
+        return type('Response', (), {'status': 429})()
+
+    async def close(self):
+        pass
+
+
+class ThrottledContext:
+    async def new_page(self):
+        return ThrottledPage()
+
+
+def test_throttled_navigation_returns_without_waiting(monkeypatch):
+    async def never_called(page):
+        raise AssertionError("wait_for_profile_content tras un 429")
+
+    monkeypatch.setattr(scraper, 'RATE_LIMIT_ENABLED', False)
+    monkeypatch.setattr(scraper, 'wait_for_profile_content', never_called)
+    context = ThrottledContext()
+    assert asyncio.run(scraper.get_follower_count_playwright(context, 'ana', 1)) == ('ana', None, 'throttled')
+    _, details, failure = asyncio.run(scraper.get_profile_info_playwright(context, 'ana', 1))
+    assert failure == 'throttled' and details['num_followers'] is None
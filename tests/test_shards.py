@@ -0,0 +1,62 @@
+import asyncio
+
+import instagram_followers as scraper
+
+
+def test_share_rate_limits_is_idempotent_and_restorable():
+    base = (scraper.RATE_INITIAL, scraper.RATE_MAX, scraper.RATE_INITIAL_CONCURRENCY)
+    try:
+        scraper.share_rate_limits(4)
+        scraper.share_rate_limits(4)  # Un proceso del pool puede ejecutar dos shards
+        assert scraper.RATE_INITIAL == base[0] / 4
+        assert scraper.RATE_MAX == base[1] / 4
+        assert scraper.RATE_BURST >= 1.0
+        assert 1 <= scraper.RATE_INITIAL_CONCURRENCY <= base[2]
+    finally:
+        scraper.share_rate_limits(1)
+    assert (scraper.RATE_INITIAL, scraper.RATE_MAX, scraper.RATE_INITIAL_CONCURRENCY) == base
+
+
+def test_merge_shard_metrics(tmp_path):
+    shard = scraper.Metrics()
+    for seconds in (1.0, 2.0, 3.0):
+        shard.observe('profile_total', seconds)
+    resources = scraper.ResourceStats()
+    resources.begin('page')
+    resources._pages['page'].counts.update(blocked=3, allowed=2, bytes=1000)
+    asyncio.run(resources.end('page'))
+    snapshot = {
+        'metrics': shard.snapshot(),
+        'extraction_tiers': {'meta': 3},
+        'resources': resources.snapshot(),
+        'rate_control': {'enabled': True},
+        'profile_cache': {'hits': 3, 'misses': 1, 'saved_seconds': 2.0},
+    }
+    parent_cache = scraper.ProfileCache(str(tmp_path / "cache.sqlite"), 3600, 100)
+
+    scraper.metrics.reset()
+    scraper.extraction_tiers.clear()
+    scraper.resource_stats.reset()
+    try:
+        scraper.merge_shard_metrics(1, snapshot, parent_cache)
+        scraper.merge_shard_metrics(2, snapshot, parent_cache)
+        summary = scraper.metrics.summary()['profile_total']
+        assert (summary['count'], summary['sum']) == (6, 12.0)
+        assert scraper.extraction_tiers['meta'] == 6
+        assert scraper.resource_stats.summary()['blocked']['total'] == 6
+        assert set(scraper.shard_rate_control) == {'1', '2'}
+        assert (parent_cache.hits, parent_cache.misses, parent_cache.hit_rate) == (6, 2, 75.0)
+    finally:
+        parent_cache.close()
+        scraper.metrics.reset()
+        scraper.extraction_tiers.clear()
+        scraper.resource_stats.reset()
+        scraper.shard_rate_control.clear()
+
+
+def test_sharding_and_queue_are_rejected_where_they_cannot_apply():
+    assert scraper.phase2_distribution_conflict(False, 1, '', 'selenium') is None
+    assert scraper.phase2_distribution_conflict(False, 4, '', 'selenium') is None
+    assert scraper.phase2_distribution_conflict(True, 1, '', 'playwright') is None
+    assert '--shards' in scraper.phase2_distribution_conflict(True, 4, '', 'selenium')
+    assert '--queue' in scraper.phase2_distribution_conflict(False, 1, 'redis://localhost', 'playwright')